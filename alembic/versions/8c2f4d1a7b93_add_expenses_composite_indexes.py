@@ -0,0 +1,43 @@
+"""add expenses composite indexes
+
+Revision ID: 8c2f4d1a7b93
+Revises: 315dfae82a59
+Create Date: 2026-10-16 10:12:41.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2f4d1a7b93'
+down_revision: Union[str, Sequence[str], None] = '315dfae82a59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_expenses_user_id_created_at_id',
+        'expenses',
+        ['user_id', 'created_at', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_expenses_user_id_category_id_created_at',
+        'expenses',
+        ['user_id', 'category_id', 'created_at'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_expenses_user_id_price', 'expenses', ['user_id', 'price'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_user_id_price', table_name='expenses')
+    op.drop_index('ix_expenses_user_id_category_id_created_at', table_name='expenses')
+    op.drop_index('ix_expenses_user_id_created_at_id', table_name='expenses')
@@ -0,0 +1,65 @@
+"""add monthly category totals
+
+Revision ID: a41e9c6f02d8
+Revises: 8c2f4d1a7b93
+Create Date: 2026-10-16 11:03:27.514902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41e9c6f02d8'
+down_revision: Union[str, Sequence[str], None] = '8c2f4d1a7b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    totals = op.create_table('monthly_category_totals',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('max', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'year', 'month', 'category_id')
+    )
+
+    # backfill from existing expenses
+    expenses = sa.table(
+        'expenses',
+        sa.column('user_id', sa.Integer()),
+        sa.column('category_id', sa.Integer()),
+        sa.column('price', sa.Integer()),
+        sa.column('created_at', sa.DateTime()),
+    )
+    year = sa.extract('year', expenses.c.created_at)
+    month = sa.extract('month', expenses.c.created_at)
+
+    op.execute(
+        totals.insert().from_select(
+            ['user_id', 'year', 'month', 'category_id', 'total', 'count', 'max'],
+            sa.select(
+                expenses.c.user_id,
+                year,
+                month,
+                expenses.c.category_id,
+                sa.func.sum(expenses.c.price),
+                sa.func.count(),
+                sa.func.max(expenses.c.price),
+            ).group_by(expenses.c.user_id, year, month, expenses.c.category_id)
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('monthly_category_totals')
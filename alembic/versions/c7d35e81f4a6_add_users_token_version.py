@@ -0,0 +1,32 @@
+"""add users token version
+
+Revision ID: c7d35e81f4a6
+Revises: a41e9c6f02d8
+Create Date: 2026-10-16 13:41:08.337120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d35e81f4a6'
+down_revision: Union[str, Sequence[str], None] = 'a41e9c6f02d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'users',
+        sa.Column('token_version', sa.Integer(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('token_version')
@@ -0,0 +1,59 @@
+"""add expenses full-text search
+
+Revision ID: f5a7c2e9b314
+Revises: e3b9a05c6d17
+Create Date: 2026-10-16 18:24:09.731402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a7c2e9b314'
+down_revision: Union[str, Sequence[str], None] = 'e3b9a05c6d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FTS5 is SQLite only; other databases search with LIKE
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE expenses_fts USING fts5("
+        "name, content='expenses', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER expenses_fts_insert AFTER INSERT ON expenses BEGIN "
+        "INSERT INTO expenses_fts (rowid, name) VALUES (new.id, new.name); END"
+    )
+    op.execute(
+        "CREATE TRIGGER expenses_fts_delete AFTER DELETE ON expenses BEGIN "
+        "INSERT INTO expenses_fts (expenses_fts, rowid, name) "
+        "VALUES ('delete', old.id, old.name); END"
+    )
+    op.execute(
+        "CREATE TRIGGER expenses_fts_update AFTER UPDATE OF name ON expenses BEGIN "
+        "INSERT INTO expenses_fts (expenses_fts, rowid, name) "
+        "VALUES ('delete', old.id, old.name); "
+        "INSERT INTO expenses_fts (rowid, name) VALUES (new.id, new.name); END"
+    )
+
+    # index the existing expenses
+    op.execute("INSERT INTO expenses_fts (expenses_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute("DROP TRIGGER expenses_fts_update")
+    op.execute("DROP TRIGGER expenses_fts_delete")
+    op.execute("DROP TRIGGER expenses_fts_insert")
+    op.execute("DROP TABLE expenses_fts")
@@ -1,13 +1,27 @@
 # third party
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # local
-from app.core.security import create_access_token, get_current_user, verify_password
-from app.db.session import get_session
+from app.core.exception import UserAlreadyExistsException
+from app.core.password_hasher import password_hasher
+from app.core.rate_limit import rate_limit_by_ip
+from app.core.security import (
+    Principal,
+    create_access_token,
+    get_current_principal,
+    get_current_user,
+    password_needs_rehash,
+)
+from app.db.session import get_async_session
 from app.models.models import User
 from app.schemas.schemas import LoginRequest, Token, UserCreate, UserDTO
-from app.users.crud import create_user, get_user_by_email
+from app.users.crud import (
+    create_user,
+    get_user_by_email,
+    revoke_tokens,
+    update_password_hash,
+)
 
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -23,7 +37,7 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
         409: {"description": "User already exists"}
     }
 )
-def register(user: UserCreate, db: Session = Depends(get_session)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_session)):
     """
     Register a new user.
 
@@ -31,7 +45,13 @@ def register(user: UserCreate, db: Session = Depends(get_session)):
 
     Returns the created user.
     """
-    return create_user(db, user)
+    if await get_user_by_email(db, user.email):
+        raise UserAlreadyExistsException()
+
+    # bcrypt runs on the dedicated password hasher executor
+    hashed_password = await password_hasher.hash(user.password)
+
+    return await create_user(db, user, hashed_password)
 
 
 @router.post(
@@ -39,21 +59,31 @@ def register(user: UserCreate, db: Session = Depends(get_session)):
     response_model=Token,
     summary="Authenticate user",
     description="Authenticate user with email and password and return a JWT access token.",
+    dependencies=[Depends(rate_limit_by_ip("login"))],
     responses={
-        401: {"description": "Invalid credentials"}
-    }
+        401: {"description": "Invalid credentials"},
+        429: {
+            "description": "Too many login attempts, retry after the Retry-After delay"
+        },
+        503: {"description": "Too many authentication requests"},
+    },
 )
-def login(data: LoginRequest, db: Session = Depends(get_session)):
+async def login(data: LoginRequest, db: AsyncSession = Depends(get_async_session)):
     """
     Authenticate a user and return an access token.
 
+    Passwords hashed with a different bcrypt cost than the configured one
+    are rehashed after a successful login.
+
     Returns:
     - access_token
     - token_type
     """
-    user = get_user_by_email(db, data.email)
+    user = await get_user_by_email(db, data.email)
 
-    if not user or not verify_password(data.password, user.hashed_password):
+    if not user or not await password_hasher.verify(
+        data.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={
@@ -61,7 +91,11 @@ def login(data: LoginRequest, db: Session = Depends(get_session)):
             }
         )
 
-    token = create_access_token(str(user.id))
+    if password_needs_rehash(user.hashed_password):
+        hashed_password = await password_hasher.hash(data.password)
+        await update_password_hash(db, user, hashed_password)
+
+    token = create_access_token(str(user.id), user.role.value, user.token_version)
     return {"access_token": token, "token_type": "bearer"}
 
 
@@ -71,9 +105,30 @@ def login(data: LoginRequest, db: Session = Depends(get_session)):
     summary="Get current user",
     description="Retrieve information about the currently authenticated user."
 )
-def read_me(current_user: User = Depends(get_current_user)):
+async def read_me(current_user: User = Depends(get_current_user)):
     """
     Return information about the authenticated user.
     """
     return current_user
 
+
+@router.post(
+    "/revoke",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke all tokens",
+    description=(
+        "Invalidate every access token issued to the current user, including the one "
+        "used for this call."
+    )
+)
+async def revoke(
+    db: AsyncSession = Depends(get_async_session),
+    principal: Principal = Depends(get_current_principal)
+):
+    """
+    Log the current user out everywhere.
+
+    A new token has to be obtained via /auth/login afterwards.
+    """
+    await revoke_tokens(db, principal.id)
+    return None
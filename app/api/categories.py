@@ -1,11 +1,13 @@
 # third party
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # local
-from app.core.security import get_current_user
-from app.db.session import get_session
-from app.models.models import Category, User
+from app.core.security import Principal, get_current_principal
+from app.db.session import get_async_session
+from app.db.transactions import write_transaction
+from app.models.models import Category
 from app.schemas.schemas import CategoryCreateDTO, CategoryNestedDTO
 
 
@@ -18,15 +20,15 @@ router = APIRouter(prefix="/categories", tags=["Categories"])
     summary="Get categories",
     description="Retrieve all available expense categories"
 )
-def get_categories(
-    db: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+async def get_categories(
+    db: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Retrieve a list of all expense categories.
     """
-    categories = db.query(Category).all()
-    return categories
+    categories = await db.scalars(select(Category))
+    return categories.all()
 
 
 @router.post(
@@ -39,31 +41,31 @@ def get_categories(
         409: {"description": "Category already exists"}
     }
 )
-def create_category(
+async def create_category(
     dto: CategoryCreateDTO,
-    db: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Create a new category.
 
     Category names must be unique.
     """
-    existing = db.query(Category).filter(Category.name == dto.name).first()
 
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Category already exists"
-        )
+    async def work():
+        existing = await db.scalar(select(Category).filter(Category.name == dto.name))
 
-    category = Category(name=dto.name)
+        if existing:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Category already exists"
+            )
 
-    db.add(category)
-    db.commit()
-    db.refresh(category)
+        category = Category(name=dto.name)
+        db.add(category)
+        return category
 
-    return category
+    return await write_transaction(db, work)
 
 
 @router.delete(
@@ -75,26 +77,29 @@ def create_category(
         404: {"description": "Category not found"}
     }
 )
-def delete_category(
+async def delete_category(
     category_id: int,
-    db: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Delete a category.
 
     Returns 404 if the category does not exist.
     """
-    category = db.query(Category).filter(Category.id == category_id).first()
 
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Category not found"
-        )
+    async def work():
+        category = await db.get(Category, category_id)
 
-    db.delete(category)
-    db.commit()
+        if not category:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            )
+
+        await db.delete(category)
+
+    await write_transaction(db, work)
 
     return None
 
@@ -1,30 +1,45 @@
 # standard library
 from datetime import date
+from tempfile import SpooledTemporaryFile
 from typing import Literal
 
 # third-party
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 # local
-from app.core.security import get_current_user
-from app.db.session import get_session
+from app.core.etag import etag_matches
+from app.core.rate_limit import rate_limit_by_user
+from app.core.security import Principal, get_current_principal
+from app.db.session import get_async_session, get_session
+from app.expenses.chart_cache import chart_cache, chart_key
+from app.expenses.charts import chart_renderer
+from app.expenses.group_commit import group_commit
+from app.expenses.versions import data_etag, data_version
 from app.expenses.crud import (
+    batch_expenses,
     create_expense,
     delete_expense,
+    generate_export,
     generate_report,
-    generate_visualization,
     get_all_expenses,
     get_expense_by_id,
+    import_expenses,
     statistics,
     update_expense,
+    visualization_data,
 )
-from app.models.models import Category, User
+from app.models.models import Category
 from app.schemas.schemas import (
+    BatchRequestDTO,
+    BatchResponseDTO,
     ExpenseCreateDTO,
     ExpenseDTO,
     ExpenseUpdateDTO,
+    ImportResultDTO,
     PaginatedExpenseDTO,
 )
 
@@ -39,10 +54,16 @@ router = APIRouter(prefix="/expenses", tags=["Expenses"])
     summary="Retrieve user expenses",
     description="Retrieve a paginated list of expenses for the authenticated user with optional filtering and sorting."
 )
-def read_all_expenses_endpoint(
+async def read_all_expenses_endpoint(
+        request: Request,
         limit: int = Query(10, ge=1, le=100),
         offset: int = Query(0, ge=0),
-        sort_by: Literal["id", "name", "price", "created_at"] = "created_at",
+        cursor: str | None = Query(
+            None,
+            description="Opaque cursor returned as next_cursor by the previous page"),
+        sort_by: Literal[
+            "id", "name", "price", "created_at", "relevance"
+        ] = "created_at",
         order: Literal["asc", "desc"] = "desc",
         min_price: int | None = Query(None, ge=0),
         max_price: int | None = Query(None, ge=0),
@@ -56,8 +77,19 @@ def read_all_expenses_endpoint(
             json_schema_extra={"example": "2025-12-31"}),
         category_id: int | None = Query(None, ge=1, description="Filter expenses by category ID"),
         category_name: str | None = Query(None, min_length=1, description="Filter expenses by category name"),
-        db: Session = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        q: str | None = Query(
+            None,
+            min_length=1,
+            max_length=200,
+            description="Search expense names; every word has to match the start of a "
+                        "word in the name"),
+        include_total: Literal["exact", "estimate", "false"] = Query(
+            "exact",
+            description="Count matching expenses exactly, estimate them from monthly "
+                        "totals, or skip the count"),
+        if_none_match: str | None = Header(None),
+        db: AsyncSession = Depends(get_async_session),
+        current_user: Principal = Depends(get_current_principal)
 ):
     """
     Retrieve expenses belonging to the current user.
@@ -66,11 +98,30 @@ def read_all_expenses_endpoint(
     - filtering by price range
     - filtering by category
     - filtering by date range
+    - full-text search on names (q), optionally sorted by relevance
     - sorting results
-    - pagination
+    - offset pagination
+    - cursor pagination (pass next_cursor back as cursor)
+    - exact, estimated or no total (has_more is always set)
+
+    The weak ETag changes with every write of the user and with the
+    query string. A matching If-None-Match header returns 304 without
+    running the list query.
 
     Returns a paginated list of expenses.
     """
+    if cursor is not None and offset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor cannot be combined with offset"
+        )
+
+    if sort_by == "relevance" and q is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="sort_by=relevance requires q"
+        )
+
     if min_price is not None and max_price is not None and min_price > max_price:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -84,7 +135,7 @@ def read_all_expenses_endpoint(
         )
 
     if category_name is not None and category_id is not None:
-        category = db.query(Category).filter(Category.id == category_id).first()
+        category = await db.get(Category, category_id)
 
         if not category:
             raise HTTPException(
@@ -98,7 +149,17 @@ def read_all_expenses_endpoint(
                 detail="category_id does not match category_name"
             )
 
-    return get_all_expenses(
+    version = await data_version(db, current_user.id)
+    params = sorted(request.query_params.multi_items())
+    headers = {
+        "ETag": data_etag(current_user.id, version, "list", params),
+        "Cache-Control": "private, no-cache",
+    }
+
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    page = await get_all_expenses(
         db=db,
         current_user=current_user,
         limit=limit,
@@ -111,8 +172,15 @@ def read_all_expenses_endpoint(
         end_date=end_date,
         category_id=category_id,
         category_name=category_name,
+        cursor=cursor,
+        include_total=include_total,
+        q=q,
     )
 
+    # the items are already JSON-ready ExpenseDTO dicts; returning the
+    # response directly skips validating them again against response_model
+    return JSONResponse(page, headers=headers)
+
 
 @router.post(
     "/",
@@ -120,12 +188,95 @@ def read_all_expenses_endpoint(
     status_code=status.HTTP_201_CREATED,
     summary="Create new expense"
 )
-def create_expense_endpoint(
+async def create_expense_endpoint(
         dto: ExpenseCreateDTO,
+        db: AsyncSession = Depends(get_async_session),
+        current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Create an expense for the current user.
+
+    With group commit enabled, the expense is queued and committed together
+    with other concurrent creates; the response is sent once it is durable.
+    """
+    if group_commit.enabled:
+        return await group_commit.create(dto, current_user)
+
+    return await create_expense(db, dto, current_user)
+
+
+@router.post(
+    "/batch",
+    response_model=BatchResponseDTO,
+    status_code=status.HTTP_200_OK,
+    summary="Create, update and delete expenses in one request",
+    description="Apply up to 100 create, update and delete operations atomically."
+)
+async def batch_expenses_endpoint(
+        dto: BatchRequestDTO,
+        db: AsyncSession = Depends(get_async_session),
+        current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Apply a batch of expense operations, e.g. offline edits synced by a mobile client.
+
+    Each operation is one of:
+    - {"op": "create", "data": {...}}
+    - {"op": "update", "id": 1, "data": {...}}
+    - {"op": "delete", "id": 1}
+
+    Successful operations are committed together. Each result carries
+    the operation index, an HTTP-like status (201, 200, 204, 400, 404),
+    the resulting expense for creates and updates, or an error message.
+    """
+    return await batch_expenses(db, dto.operations, current_user)
+
+
+# uploads larger than this are spooled to a temporary file instead of memory
+IMPORT_SPOOL_SIZE = 1024 * 1024
+
+
+@router.post(
+    "/import",
+    response_model=ImportResultDTO,
+    status_code=status.HTTP_200_OK,
+    summary="Import expenses from CSV",
+    description="Bulk import expenses from a CSV request body, reporting row errors.",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"text/csv": {"schema": {"type": "string"}}}
+        }
+    },
+    responses={
+        400: {"description": "CSV file is missing required columns"}
+    }
+)
+async def import_expenses_endpoint(
+        request: Request,
         db: Session = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        current_user: Principal = Depends(get_current_principal)
 ):
-    return create_expense(db, dto, current_user)
+    """
+    Import expenses from a CSV file sent as the request body (text/csv).
+
+    Columns:
+    - name (required)
+    - category: category name (required)
+    - price (required)
+    - created_at: ISO date or datetime (optional, defaults to now)
+
+    Rows are validated like POST /expenses/ and committed in chunks.
+    Invalid rows are skipped and reported with their line number.
+    """
+    db.info["user_id"] = current_user.id
+
+    with SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+
+        return await run_in_threadpool(import_expenses, db, upload, current_user)
 
 
 @router.put(
@@ -134,13 +285,13 @@ def create_expense_endpoint(
     status_code=status.HTTP_200_OK,
     summary="Update an expense"
 )
-def update_expense_endpoint(
+async def update_expense_endpoint(
         expense_id: int,
         dto: ExpenseUpdateDTO,
-        db: Session = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_async_session),
+        current_user: Principal = Depends(get_current_principal)
 ):
-    return update_expense(db, expense_id, dto, current_user)
+    return await update_expense(db, expense_id, dto, current_user)
 
 
 @router.delete(
@@ -148,12 +299,12 @@ def update_expense_endpoint(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete an expense"
 )
-def delete_expense_endpoint(
+async def delete_expense_endpoint(
         expense_id: int,
-        db: Session = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_async_session),
+        current_user: Principal = Depends(get_current_principal)
 ):
-    delete_expense(db, expense_id, current_user)
+    await delete_expense(db, expense_id, current_user)
     return None
 
 
@@ -163,11 +314,11 @@ def delete_expense_endpoint(
     summary="Get monthly expense statistics",
     description="Calculate statistics for the authenticated user's expenses in a specific month",
     response_description="Monthly statistics for the selected period")
-def get_statistics(
+async def get_statistics(
         year: int,
         month: int,
-        db: Session = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_async_session),
+        current_user: Principal = Depends(get_current_principal)
 ):
     """
     Calculate statistics for user's expenses in a given month.
@@ -183,20 +334,31 @@ def get_statistics(
     - year: year of statistics (2000–2100)
     - month: month of statistics (1–12)
     """
-    return statistics(db, year, month, current_user)
+    return await statistics(db, year, month, current_user)
 
 
 @router.get(
     "/visualization/{year}/{month}",
     status_code=status.HTTP_200_OK,
     summary="Generate expense visualization",
-    description="Generate a pie chart showing the distribution of expenses by category for a given month."
+    description=(
+        "Generate a pie chart showing the distribution of expenses by category "
+        "for a given month."
+    ),
+    dependencies=[Depends(rate_limit_by_user("visualization"))],
+    responses={
+        429: {"description": "Too many requests, retry after the Retry-After delay"},
+        503: {
+            "description": "Chart renderer is busy, retry after the Retry-After delay"
+        },
+    },
 )
-def get_visualization_endpoint(
+async def get_visualization_endpoint(
         year: int,
         month: int,
-        db: Session = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        if_none_match: str | None = Header(None),
+        db: AsyncSession = Depends(get_async_session),
+        current_user: Principal = Depends(get_current_principal)
 ):
     """
     Generate a pie chart visualizing user's expenses by category.
@@ -207,27 +369,61 @@ def get_visualization_endpoint(
     - year: year of visualization (2000–2100)
     - month: month of visualization (1–12)
 
+    Rendering runs in a bounded process pool, so the request only waits
+    for its chart without holding an API worker thread.
+
+    Images are cached by a hash of the chart data, which is also returned
+    as the ETag. A matching If-None-Match header returns 304.
+
     Returns:
     PNG image containing the generated chart.
     """
-    image_stream = generate_visualization(db, year, month, current_user)
-    return StreamingResponse(image_stream, media_type="image/png")
+    labels, values = await visualization_data(db, year, month, current_user)
+
+    key = chart_key(labels, values, year, month)
+    headers = {"ETag": f'"{key}"', "Cache-Control": "private, no-cache"}
+
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    image = await chart_cache.get(key)
+    if image is None:
+        image = await chart_renderer.render(labels, values, year, month)
+        await chart_cache.put(key, image)
+
+    return Response(content=image, media_type="image/png", headers=headers)
+
+
+EXPORT_MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
 
 
 @router.get(
     "/export/",
-    summary="Export expenses to Excel",
-    description="Generate an Excel report containing data and summary statistics"
+    summary="Export expenses",
+    description=(
+        "Generate an Excel report containing data and summary statistics, "
+        "or stream raw rows as CSV or NDJSON"
+    ),
+    dependencies=[Depends(rate_limit_by_user("export"))],
+    responses={
+        429: {"description": "Too many requests, retry after the Retry-After delay"}
+    }
 )
 def generate_report_endpoint(
     category: str | None = Query(None),
     start_date: date | None = Query(None),
     end_date: date | None = Query(None),
+    export_format: Literal["xlsx", "csv", "ndjson"] = Query("xlsx", alias="format"),
+    gzip: bool = Query(False, description="Gzip compress csv and ndjson exports"),
     db: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
-    Export user's expenses to an Excel report.
+    Export user's expenses to an Excel report or a raw data stream.
 
     The generated Excel file contains two sheets:
 
@@ -250,17 +446,41 @@ def generate_report_endpoint(
     - start_date: include expenses from this date
     - end_date: include expenses up to this date
 
+    Formats:
+    - xlsx (default): the Excel report described above
+    - csv: one row per expense with a header row
+    - ndjson: one JSON object per line
+
+    csv and ndjson are streamed straight from the database and can be
+    gzip compressed with gzip=true. The Excel file is only sent once the
+    whole report has been built.
+
     Returns:
-    Excel file (.xlsx) with the generated report.
+    Excel file (.xlsx), CSV or NDJSON file with the exported expenses.
     """
+    # exports read from the replica unless the user has just written
+    db.info["user_id"] = current_user.id
+
+    if export_format == "xlsx":
+        file_stream = generate_report(db, category, start_date, end_date, current_user)
+        media_type = EXPORT_MEDIA_TYPES["xlsx"]
+        filename = "expenses_report.xlsx"
+    else:
+        file_stream = generate_export(
+            db, export_format, category, start_date, end_date, current_user, gzip
+        )
+        media_type = EXPORT_MEDIA_TYPES[export_format]
+        filename = f"expenses_report.{export_format}"
 
-    file_stream = generate_report(db, category, start_date, end_date, current_user)
+        if gzip:
+            media_type = "application/gzip"
+            filename += ".gz"
 
     return StreamingResponse(
         file_stream,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        media_type=media_type,
         headers={
-            "Content-Disposition": 'attachment; filename="expenses_report.xlsx"'
+            "Content-Disposition": f'attachment; filename="{filename}"'
         }
     )
 
@@ -272,10 +492,12 @@ def generate_report_endpoint(
     summary="Get expense by ID",
     description="Retrieve a single expense belonging to the authenticated user."
 )
-def read_expense_by_id_endpoint(
+async def read_expense_by_id_endpoint(
         expense_id: int,
-        db: Session = Depends(get_session),
-        current_user: User = Depends(get_current_user)
+        response: Response,
+        if_none_match: str | None = Header(None),
+        db: AsyncSession = Depends(get_async_session),
+        current_user: Principal = Depends(get_current_principal)
 ):
     """
     Retrieve a single expense by its ID.
@@ -285,8 +507,22 @@ def read_expense_by_id_endpoint(
     Parameters:
     - expense_id: unique identifier of the expense
 
+    The weak ETag changes with every write of the user. A matching
+    If-None-Match header returns 304 without loading the expense.
+
     Returns:
     Expense object with its details.
     """
-    return get_expense_by_id(db, expense_id, current_user)
+    version = await data_version(db, current_user.id)
+    headers = {
+        "ETag": data_etag(current_user.id, version, "expense", expense_id),
+        "Cache-Control": "private, no-cache",
+    }
+
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    expense = await get_expense_by_id(db, expense_id, current_user)
+    response.headers.update(headers)
+    return expense
 
@@ -0,0 +1,41 @@
+# third party
+from fastapi import APIRouter, Depends, HTTPException, status
+
+# local
+from app.core.password_hasher import password_hasher
+from app.core.security import Principal, get_current_principal
+from app.core.user_cache import user_cache
+from app.db.transactions import write_stats
+from app.expenses.group_commit import group_commit
+from app.models.models import UserRole
+
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get(
+    "/",
+    summary="Get runtime metrics",
+    description=(
+        "Counters of the group-commit writer, password hasher, user cache and write "
+        "transactions. Admins only."
+    ),
+    responses={
+        403: {"description": "Not an admin"}
+    }
+)
+async def get_metrics(current_user: Principal = Depends(get_current_principal)):
+    """
+    Return the in-process metrics of this worker.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required"
+        )
+
+    return {
+        "group_commit": group_commit.stats(),
+        "password_hasher": password_hasher.stats(),
+        "user_cache": user_cache.stats(),
+        "write_transactions": write_stats.stats(),
+    }
@@ -5,6 +5,7 @@ from fastapi import APIRouter
 from app.api.auth import router as auth_router
 from app.api.categories import router as categories_router
 from app.api.expenses import router as expenses_router
+from app.api.metrics import router as metrics_router
 
 
 api_router = APIRouter(prefix="/api/v1")
@@ -13,3 +14,4 @@ api_router.include_router(auth_router)
 api_router.include_router(categories_router)
 api_router.include_router(expenses_router)
 
+api_router.include_router(metrics_router)
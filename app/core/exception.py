@@ -18,9 +18,55 @@ class InvalidYearException(Exception):
     """Raised when the provided year is outside the allowed range."""
 
 
+class InvalidCursorException(Exception):
+    """Raised when a pagination cursor is malformed or does not match the sorting."""
+
+
 class CategoryNotFoundException(Exception):
     """Raised when the specified category does not exist."""
 
 
 class UserAlreadyExistsException(Exception):
-    """Raised when trying to create a user that already exists."""
\ No newline at end of file
+    """Raised when trying to create a user that already exists."""
+
+
+class ChartRendererBusyException(Exception):
+    """Raised when the chart rendering pool has too many pending renders."""
+
+
+class InvalidImportFileException(Exception):
+    """Raised when an uploaded import file is missing required columns."""
+
+
+class PasswordHasherBusyException(Exception):
+    """Raised when too many password hashes are already queued."""
+
+
+class RateLimitExceededException(Exception):
+    """Raised when a client has used up its request budget for a rate-limited route."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+def format_validation_errors(errors) -> list[dict]:
+    """Turn pydantic errors into the API error format: a message and the field."""
+    formatted_errors = []
+
+    for err in errors:
+        loc = err.get("loc", []) or []
+        field = loc[-1] if loc else None
+
+        ctx = err.get("ctx") or {}
+        if ctx and "error" in ctx:
+            message = str(ctx["error"])
+        else:
+            message = err.get("msg", "Invalid value")
+
+        formatted_errors.append({
+            "message": message,
+            "field": field
+        })
+
+    return formatted_errors
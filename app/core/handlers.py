@@ -1,3 +1,6 @@
+# standard library
+import math
+
 # third party
 from fastapi import FastAPI, Request, HTTPException, status
 from fastapi.responses import JSONResponse
@@ -6,12 +9,18 @@ from fastapi.exceptions import RequestValidationError
 # local
 from app.core.exception import (
     CategoryNotFoundException,
+    ChartRendererBusyException,
     DatabaseException,
     ExpenseNotFoundException,
+    InvalidCursorException,
+    InvalidImportFileException,
     InvalidMonthException,
     InvalidYearException,
     NoExpensesFoundException,
+    PasswordHasherBusyException,
+    RateLimitExceededException,
     UserAlreadyExistsException,
+    format_validation_errors,
 )
 
 
@@ -52,6 +61,22 @@ def register_exception_handlers(app: FastAPI):
             content={"detail": "Year must be between 2000 and 2100"}
         )
 
+    @app.exception_handler(InvalidCursorException)
+    async def invalid_cursor_handler(request: Request, exc: InvalidCursorException):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": "Invalid cursor"}
+        )
+
+    @app.exception_handler(InvalidImportFileException)
+    async def invalid_import_file_handler(
+        request: Request, exc: InvalidImportFileException
+    ):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": "CSV file must have name, category and price columns"}
+        )
+
     @app.exception_handler(CategoryNotFoundException)
     async def category_not_found_handler(request: Request, exc: CategoryNotFoundException):
         return JSONResponse(
@@ -66,30 +91,41 @@ def register_exception_handlers(app: FastAPI):
             content={"detail": "User already exists"}
         )
 
-    @app.exception_handler(RequestValidationError)
-    async def request_validation_handler(request: Request, exc: RequestValidationError):
-        errors = exc.errors()
-
-        formatted_errors = []
-
-        for err in errors:
-            loc = err.get("loc", []) or []
-            field = loc[-1] if loc else None
+    @app.exception_handler(ChartRendererBusyException)
+    async def chart_renderer_busy_handler(
+        request: Request, exc: ChartRendererBusyException
+    ):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Chart renderer is busy, try again later"},
+            headers={"Retry-After": "1"}
+        )
 
-            ctx = err.get("ctx") or {}
-            if ctx and "error" in ctx:
-                message = str(ctx["error"])
-            else:
-                message = err.get("msg", "Invalid value")
+    @app.exception_handler(PasswordHasherBusyException)
+    async def password_hasher_busy_handler(
+        request: Request, exc: PasswordHasherBusyException
+    ):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Too many authentication requests, try again later"},
+            headers={"Retry-After": "1"}
+        )
 
-            formatted_errors.append({
-                "message": message,
-                "field": field
-            })
+    @app.exception_handler(RateLimitExceededException)
+    async def rate_limit_exceeded_handler(
+        request: Request, exc: RateLimitExceededException
+    ):
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Too many requests, try again later"},
+            headers={"Retry-After": str(math.ceil(exc.retry_after))}
+        )
 
+    @app.exception_handler(RequestValidationError)
+    async def request_validation_handler(request: Request, exc: RequestValidationError):
         return JSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            content={"errors": formatted_errors}
+            content={"errors": format_validation_errors(exc.errors())}
         )
 
     @app.exception_handler(HTTPException)
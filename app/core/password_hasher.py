@@ -0,0 +1,107 @@
+# standard library
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from os import getenv
+
+# local
+from app.core.exception import PasswordHasherBusyException
+from app.core.security import hash_password, verify_password
+
+
+# threads dedicated to bcrypt, separate from the request threadpool
+PASSWORD_HASH_WORKERS = int(getenv("PASSWORD_HASH_WORKERS", "2"))
+# hashes allowed to be running or queued before new requests get 503
+PASSWORD_HASH_MAX_PENDING = int(getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+
+class PasswordHasher:
+    """Bounded executor running bcrypt away from the request threadpool.
+
+    A burst of logins or registrations queues here instead of occupying the
+    threads every other endpoint needs. Queue depth and wait times are tracked.
+    """
+
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor: ThreadPoolExecutor | None = None
+        self.lock = threading.Lock()
+
+        self.pending = 0
+        self.max_pending_seen = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hasher"
+                )
+            return self.executor
+
+    def shutdown(self) -> None:
+        with self.lock:
+            executor, self.executor = self.executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    async def run(self, func, *args):
+        with self.lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusyException()
+            self.pending += 1
+            self.max_pending_seen = max(self.max_pending_seen, self.pending)
+
+        submitted = time.perf_counter()
+
+        def timed():
+            waited = time.perf_counter() - submitted
+            with self.lock:
+                self.total_wait += waited
+            return func(*args)
+
+        try:
+            result = await asyncio.wrap_future(self.get_executor().submit(timed))
+        except BaseException:
+            with self.lock:
+                self.pending -= 1
+                self.failed += 1
+            raise
+
+        with self.lock:
+            self.pending -= 1
+            self.completed += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, password, hashed_password)
+
+    def stats(self) -> dict:
+        with self.lock:
+            finished = self.completed + self.failed
+            return {
+                "workers": self.workers,
+                "pending": self.pending,
+                "max_pending_seen": self.max_pending_seen,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "average_wait_seconds": self.total_wait / finished if finished else 0.0,
+            }
+
+
+password_hasher = PasswordHasher()
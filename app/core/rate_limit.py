@@ -0,0 +1,213 @@
+# standard library
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from os import getenv
+from pathlib import Path
+
+# third party
+from fastapi import Depends, Request
+from sqlalchemy.engine import make_url
+
+# local
+from app.core.exception import RateLimitExceededException
+from app.core.security import Principal, get_current_principal
+from app.db.session import BASE_DIR, DATABASE_URL, is_sqlite
+
+
+RATE_LIMIT_ENABLED = (
+    getenv("RATE_LIMIT_ENABLED", "true").lower() not in ("0", "false", "no")
+)
+# "memory" keeps buckets per process, "sqlite" shares them between uvicorn
+# workers through a small database file next to the application database
+RATE_LIMIT_BACKEND = getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MEMORY_KEYS = int(getenv("RATE_LIMIT_MEMORY_KEYS", "10000"))
+
+
+def database_dir(database_url: str) -> Path:
+    """Directory of a SQLite ``database_url``'s file, or ``BASE_DIR`` otherwise."""
+    database = make_url(database_url).database
+    if not is_sqlite(database_url) or not database or database == ":memory:":
+        return BASE_DIR
+    return Path(database).resolve().parent
+
+
+RATE_LIMIT_SQLITE_PATH = getenv(
+    "RATE_LIMIT_SQLITE_PATH", str(database_dir(DATABASE_URL) / "rate_limits.db")
+)
+
+
+def parse_limit(value: str) -> tuple[int, float]:
+    """Parse a ``"<requests>/<seconds>"`` limit into a capacity and a refill rate."""
+    requests, seconds = value.split("/")
+    capacity = int(requests)
+    return capacity, capacity / float(seconds)
+
+
+# burst size and refill period per route, overridable with RATE_LIMIT_<ROUTE>
+ROUTE_LIMITS = {
+    route: parse_limit(getenv(f"RATE_LIMIT_{route.upper()}", default))
+    for route, default in {
+        "login": "10/60",
+        "export": "10/60",
+        "visualization": "30/60",
+    }.items()
+}
+
+
+def take_token(
+    tokens: float, updated: float, capacity: int, rate: float, now: float
+) -> tuple[float, float]:
+    """Refill a bucket up to ``now`` and try to take one token.
+
+    Returns the remaining tokens and the seconds to wait, 0 when the token was taken.
+    """
+    tokens = min(capacity, tokens + (now - updated) * rate)
+
+    if tokens >= 1:
+        return tokens - 1, 0.0
+
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBackend:
+    """Token buckets held in this process, evicting the least recently used keys."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MEMORY_KEYS):
+        self.max_keys = max_keys
+        self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, rate: float, now: float) -> float:
+        with self.lock:
+            tokens, updated = self.buckets.get(key, (capacity, now))
+            tokens, retry_after = take_token(tokens, updated, capacity, rate, now)
+
+            self.buckets[key] = (tokens, now)
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+
+        return retry_after
+
+    def clear(self) -> None:
+        with self.lock:
+            self.buckets.clear()
+
+
+class SQLiteBackend:
+    """Token buckets stored in a SQLite file, shared by every process that opens it."""
+
+    def __init__(self, path: str = RATE_LIMIT_SQLITE_PATH):
+        self.path = path
+        self.connection: sqlite3.Connection | None = None
+        self.lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        if self.connection is None:
+            self.connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+        return self.connection
+
+    def take(self, key: str, capacity: int, rate: float, now: float) -> float:
+        with self.lock:
+            connection = self.connect()
+
+            # the write lock is taken up front so concurrent workers serialize on the
+            # bucket
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                tokens, updated = row if row is not None else (capacity, now)
+                tokens, retry_after = take_token(tokens, updated, capacity, rate, now)
+
+                connection.execute(
+                    "INSERT INTO rate_limit_buckets (key, tokens, updated) "
+                    "VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                    "tokens = excluded.tokens, updated = excluded.updated",
+                    (key, tokens, now),
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+        return retry_after
+
+    def clear(self) -> None:
+        with self.lock:
+            self.connect().execute("DELETE FROM rate_limit_buckets")
+
+
+def create_backend(name: str = RATE_LIMIT_BACKEND):
+    if name == "sqlite":
+        return SQLiteBackend()
+    if name == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unknown rate limit backend: {name}")
+
+
+class RateLimiter:
+    """Token-bucket limiter with one bucket per route and client."""
+
+    def __init__(
+        self,
+        backend=None,
+        limits: dict[str, tuple[int, float]] = ROUTE_LIMITS,
+        enabled: bool = RATE_LIMIT_ENABLED,
+    ):
+        self.backend = backend if backend is not None else create_backend()
+        self.limits = dict(limits)
+        self.enabled = enabled
+
+    def check(self, route: str, client: str) -> None:
+        if not self.enabled:
+            return
+
+        capacity, rate = self.limits[route]
+        retry_after = self.backend.take(
+            f"{route}:{client}", capacity, rate, time.time()
+        )
+
+        if retry_after > 0:
+            raise RateLimitExceededException(retry_after)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+rate_limiter = RateLimiter()
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit_by_ip(route: str):
+    """Dependency limiting anonymous requests, such as login, by client IP."""
+
+    def dependency(request: Request) -> None:
+        rate_limiter.check(route, client_ip(request))
+
+    return dependency
+
+
+def rate_limit_by_user(route: str):
+    """Dependency limiting authenticated requests by user id and client IP."""
+
+    def dependency(
+        request: Request, current_user: Principal = Depends(get_current_principal)
+    ) -> None:
+        rate_limiter.check(route, f"{current_user.id}:{client_ip(request)}")
+
+    return dependency
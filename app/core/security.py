@@ -1,4 +1,5 @@
 # standard library
+from dataclasses import dataclass
 from os import getenv
 from datetime import datetime, timedelta, timezone
 from typing import cast
@@ -9,20 +10,34 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jwt import PyJWTError
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # local
-from app.db.session import get_session
-from app.models.models import User
+from app.core.token_versions import token_versions
+from app.core.user_cache import user_cache
+from app.db.session import get_async_session
+from app.models.models import User, UserRole
 
 
 security = HTTPBearer()
 
 
 # password hashing configuration
+# "fast" uses the minimum bcrypt cost and is meant for test environments only
+PASSWORD_HASH_PROFILE = getenv("PASSWORD_HASH_PROFILE", "default")
+BCRYPT_ROUNDS = int(
+    getenv("BCRYPT_ROUNDS", "4" if PASSWORD_HASH_PROFILE == "fast" else "12")
+)
+
+# min and max equal to the default make hashes with any other cost
+# report needs_update, so they are rehashed on the next login
 pwd_context = CryptContext(
     schemes=["bcrypt"],
-    deprecated="auto"
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
 )
 
 
@@ -34,41 +49,93 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+
 SECRET_KEY = getenv("SECRET_KEY", "test_secret_key_for_jwt_should_be_longer_than_32_chars")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
 
-def create_access_token(subject: str) -> str:
+def create_access_token(
+    subject: str, role: str = UserRole.USER.value, token_version: int = 0
+) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    payload = {"sub": subject, "exp": expire}
+    payload = {"sub": subject, "role": role, "ver": token_version, "exp": expire}
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_session),
-) -> User:
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated caller built only from signed token claims."""
+    id: int
+    role: UserRole
+    token_version: int
 
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_session),
+) -> Principal:
+    """Authenticate the caller from the token alone, without loading the user row.
+
+    Tokens older than the user's current token version are rejected. The
+    version is cached per process (see TokenVersions), the session is only
+    used to load it.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
     )
 
-    token = credentials.credentials
-
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except PyJWTError:
+        payload = jwt.decode(
+            credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM]
+        )
+        principal = Principal(
+            id=int(payload["sub"]),
+            role=UserRole(payload.get("role", UserRole.USER.value)),
+            token_version=int(payload.get("ver", 0)),
+        )
+    except (PyJWTError, KeyError, TypeError, ValueError):
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).one_or_none()
+    current_version = token_versions.current(principal.id)
+    if current_version is None:
+        current_version = await db.run_sync(token_versions.load, principal.id)
 
-    if user is None:
+    if principal.token_version < current_version:
         raise credentials_exception
 
-    return cast(User, user)
+    # lets the routing session keep this user's reads on the primary after a write
+    db.info["user_id"] = principal.id
 
+    return principal
+
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_session),
+) -> User:
+    """Load the profile of the authenticated caller.
+
+    The token, including its revocation, is checked by get_current_principal
+    first; only the user row is cached here.
+    """
+    # identity and role are cached, skipping the users query on most requests
+    cached_user = user_cache.get(principal.id)
+    if cached_user is not None:
+        return cached_user
+
+    user = await db.scalar(select(User).filter(User.id == principal.id))
+
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+
+    user_cache.put(user)
+
+    return cast(User, user)
@@ -0,0 +1,102 @@
+# standard library
+import threading
+import time
+from os import getenv
+
+# third party
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+# local
+from app.models.models import User
+
+
+# version given to deleted users, newer than any token ever issued
+REVOKED = 2 ** 31
+
+# how long a version read from the database is trusted; a revocation made
+# through another worker process is enforced here after at most this long
+TOKEN_VERSION_TTL_SECONDS = float(getenv("TOKEN_VERSION_TTL_SECONDS", "10"))
+
+
+class TokenVersions:
+    """In-memory table of the current token version of recently authenticated users.
+
+    A user's version is read from the users table when they first show up
+    and again once the entry is older than the TTL, so token checks query
+    the database at most once per user and TTL. Changes committed through
+    this process apply at once. A missing row means the user was deleted
+    and counts as REVOKED.
+    """
+
+    def __init__(self, ttl: float = TOKEN_VERSION_TTL_SECONDS):
+        self.ttl = ttl
+        self.entries: dict[int, tuple[float, int]] = {}
+        self.lock = threading.Lock()
+
+    def current(self, user_id: int) -> int | None:
+        """The known version of a user, or None when it has to be loaded."""
+        with self.lock:
+            entry = self.entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def load(self, db: Session, user_id: int) -> int:
+        version = db.scalar(select(User.token_version).where(User.id == user_id))
+        return self.set(user_id, REVOKED if version is None else version)
+
+    def set(self, user_id: int, version: int) -> int:
+        now = time.monotonic()
+        with self.lock:
+            # versions only grow, a stale read must not undo a newer revocation
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] >= now:
+                version = max(version, entry[1])
+            self.entries[user_id] = (now + self.ttl, version)
+
+            # drop expired users once the table grows, instead of on every check
+            if len(self.entries) > 10_000:
+                self.entries = {
+                    key: entry for key, entry in self.entries.items() if entry[0] > now
+                }
+
+        return version
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+token_versions = TokenVersions()
+
+
+@event.listens_for(User, "before_update")
+def bump_version_on_role_change(mapper, connection, target: User):
+    # the role is a signed claim, so old tokens must stop working
+    if inspect(target).attrs.role.history.has_changes():
+        target.token_version = (target.token_version or 0) + 1
+
+
+@event.listens_for(User, "after_update")
+def remember_version_change(mapper, connection, target: User):
+    if inspect(target).attrs.token_version.history.has_changes():
+        session = object_session(target)
+        session.info.setdefault("token_versions", {})[target.id] = target.token_version
+
+
+@event.listens_for(User, "after_delete")
+def remember_deleted_user(mapper, connection, target: User):
+    session = object_session(target)
+    session.info.setdefault("token_versions", {})[target.id] = REVOKED
+
+
+@event.listens_for(Session, "after_commit")
+def apply_committed_versions(session: Session):
+    for user_id, version in session.info.pop("token_versions", {}).items():
+        token_versions.set(user_id, version)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_rolled_back_versions(session: Session):
+    session.info.pop("token_versions", None)
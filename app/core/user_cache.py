@@ -0,0 +1,118 @@
+# standard library
+import threading
+import time
+from collections import OrderedDict
+from os import getenv
+
+# third party
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+# local
+from app.models.models import User
+
+
+# security-sensitive deployments can set USER_CACHE_ENABLED=false so every
+# request re-reads the user row
+USER_CACHE_ENABLED = (
+    getenv("USER_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+)
+USER_CACHE_SIZE = int(getenv("USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL_SECONDS = float(getenv("USER_CACHE_TTL_SECONDS", "60"))
+
+
+class UserCache:
+    """LRU cache of authenticated user identity and role, keyed by user id.
+
+    Entries expire after a TTL, which also bounds staleness across worker
+    processes; changes made through this process invalidate entries on commit.
+    """
+
+    def __init__(
+            self,
+            enabled: bool = USER_CACHE_ENABLED,
+            max_size: int = USER_CACHE_SIZE,
+            ttl: float = USER_CACHE_TTL_SECONDS
+    ):
+        self.enabled = enabled
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[int, tuple[float, str, object]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> User | None:
+        if not self.enabled:
+            return None
+
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[user_id]
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(user_id)
+            self.hits += 1
+
+        _, email, role = entry
+        # a fresh detached instance per request, never shared between threads
+        return User(id=user_id, email=email, role=role)
+
+    def put(self, user: User) -> None:
+        if not self.enabled:
+            return
+
+        with self.lock:
+            self.entries[user.id] = (time.monotonic() + self.ttl, user.email, user.role)
+            self.entries.move_to_end(user.id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+user_cache = UserCache()
+
+
+# invalidate on flush, and again once the change is committed, so a request
+# reading the old row in between cannot leave a stale entry behind
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def user_changed(mapper, connection, target: User):
+    user_cache.invalidate(target.id)
+
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_committed_users(session: Session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_rolled_back_users(session: Session):
+    session.info.pop("changed_user_ids", None)
@@ -0,0 +1,135 @@
+# standard library
+import threading
+import time
+from collections.abc import Callable
+from os import getenv
+
+# third party
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+
+# local
+from app.db.shards import SHARDED_TABLES
+
+
+# how long a user's reads stay on the primary after they committed a write,
+# long enough to cover the replica lag
+READ_YOUR_WRITES_SECONDS = float(getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+
+class ReadYourWrites:
+    """Remembers which users wrote recently, so their reads skip the lagging replica.
+
+    The table lives in this process only; with several workers a user may
+    briefly read from the replica on a worker that did not handle the write.
+    """
+
+    def __init__(self, window: float = READ_YOUR_WRITES_SECONDS):
+        self.window = window
+        self.until: dict[int, float] = {}
+        self.lock = threading.Lock()
+
+    def mark(self, user_id: int) -> None:
+        now = time.monotonic()
+        with self.lock:
+            self.until[user_id] = now + self.window
+
+            # drop expired users once the table grows, instead of on every read
+            if len(self.until) > 10_000:
+                self.until = {
+                    key: until for key, until in self.until.items() if until > now
+                }
+
+    def is_recent(self, user_id: int | None) -> bool:
+        if user_id is None:
+            return False
+        return self.until.get(user_id, 0) > time.monotonic()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.until.clear()
+
+
+read_your_writes = ReadYourWrites()
+
+
+def is_catalog(mapper) -> bool:
+    return inspect(mapper).local_table.name not in SHARDED_TABLES
+
+
+class RoutingSession(Session):
+    """Session sending reads to the replica engine and everything else to the primary.
+
+    A session sticks to the primary once it has written, so it always reads
+    back its own changes. Reads of a user that committed within the
+    read-your-writes window also go to the primary; the user is taken from
+    ``session.info["user_id"]``.
+
+    With sharding enabled, ``shards`` maps the user to the engine of their
+    shard, which then serves all of the session's reads and writes, except
+    for writes to catalog tables, which go to the primary.
+    """
+
+    def __init__(
+            self,
+            *args,
+            primary: Engine,
+            replica: Engine | None = None,
+            shards: Callable[..., Engine] | None = None,
+            **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.replica = replica if replica is not None else primary
+        self.shards = shards
+        self.shard_engine: Engine | None = None
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        user_id = self.info.get("user_id")
+
+        if self.shards is not None and user_id is not None:
+            # users and categories live in the catalog, which shard
+            # connections only attach read-only
+            if mapper is not None and self._flushing and is_catalog(mapper):
+                return self.primary
+
+            if self.shard_engine is None:
+                self.shard_engine = self.shards(user_id)
+            return self.shard_engine
+
+        if self.wrote or self._flushing or isinstance(clause, (UpdateBase, TextClause)):
+            self.wrote = True
+            return self.primary
+
+        if read_your_writes.is_recent(user_id):
+            return self.primary
+
+        return self.replica
+
+    def shard_moved(self) -> bool:
+        """Whether the user's shard changed since this session was routed to one.
+
+        Only reliable while holding the write lock of that shard, which
+        move_user takes as well. The routing is reset, so after a rollback
+        the session is sent to the new shard.
+        """
+        if self.shard_engine is None:
+            return False
+
+        # bypasses the placement cache, the lock makes the catalog authoritative
+        if self.shards(self.info["user_id"], fresh=True) is self.shard_engine:
+            return False
+
+        self.shard_engine = None
+        return True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def remember_writer(session: RoutingSession):
+    user_id = session.info.get("user_id")
+    if session.wrote and user_id is not None:
+        read_your_writes.mark(user_id)
@@ -1,22 +1,214 @@
 # standard library
+from os import getenv
 from pathlib import Path
 
 # third party
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+# local
+from app.db.routing import RoutingSession
+from app.db.shards import ShardSet, placements
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-DATABASE_URL = f"sqlite:///{BASE_DIR/ 'new.sqlite'}"
 
-engine = create_engine(DATABASE_URL, echo=False)
+# async drivers used for the async engine when ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def async_database_url(database_url: str) -> str:
+    """Return the same database URL with the async driver of its dialect."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    drivername = f"{backend}+{ASYNC_DRIVERS[backend]}"
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+DATABASE_URL = getenv("DATABASE_URL", f"sqlite:///{BASE_DIR/ 'new.sqlite'}")
+# same database through an async driver, used by the async endpoints
+ASYNC_DATABASE_URL = getenv("ASYNC_DATABASE_URL", async_database_url(DATABASE_URL))
+
+# optional replica for read-only work; pointing it at DATABASE_URL gives reads
+# a connection pool of their own on the same SQLite file
+READ_DATABASE_URL = getenv("READ_DATABASE_URL")
+ASYNC_READ_DATABASE_URL = getenv(
+    "ASYNC_READ_DATABASE_URL",
+    async_database_url(READ_DATABASE_URL) if READ_DATABASE_URL else None
+)
+
+# number of SQLite files expenses are spread over by user, 0 keeps everything
+# in DATABASE_URL; users and categories always stay there (the catalog)
+SHARD_COUNT = int(getenv("SHARD_COUNT", "0"))
+SHARD_DIR = getenv("SHARD_DIR", str(BASE_DIR / "shards"))
+
+# "tuned" applies the pragmas below to every new SQLite connection, "default"
+# keeps SQLite's own settings (rollback journal, full sync, 2 MiB cache)
+SQLITE_PROFILE = getenv("SQLITE_PROFILE", "tuned")
+
+# WAL lets readers keep working while a writer commits
+SQLITE_JOURNAL_MODE = getenv("SQLITE_JOURNAL_MODE", "WAL")
+# NORMAL is durable in WAL mode except for the last commits on power loss
+SQLITE_SYNCHRONOUS = getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+# negative values are in KiB, so 64 MiB of page cache per connection
+SQLITE_CACHE_SIZE = int(getenv("SQLITE_CACHE_SIZE", "-65536"))
+SQLITE_MMAP_SIZE = int(getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_TEMP_STORE = getenv("SQLITE_TEMP_STORE", "MEMORY")
+# how long a writer waits for the lock before failing with "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+DB_POOL_SIZE = int(getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(getenv("DB_POOL_TIMEOUT", "30"))
+
+
+def sqlite_pragmas(profile: str = SQLITE_PROFILE) -> dict:
+    """Return the pragmas applied to new connections for a tuning profile."""
+    if profile == "default":
+        return {}
+
+    if profile == "tuned":
+        return {
+            "journal_mode": SQLITE_JOURNAL_MODE,
+            "synchronous": SQLITE_SYNCHRONOUS,
+            "cache_size": SQLITE_CACHE_SIZE,
+            "mmap_size": SQLITE_MMAP_SIZE,
+            "temp_store": SQLITE_TEMP_STORE,
+            "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+        }
+
+    raise ValueError(f"Unknown SQLite profile: {profile}")
+
+
+def configure_sqlite(engine: Engine, pragmas: dict) -> None:
+    """Run the given pragmas on every connection the engine opens."""
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def is_sqlite(database_url: str) -> bool:
+    return make_url(database_url).get_backend_name() == "sqlite"
+
+
+def create_app_engine(
+    database_url: str = DATABASE_URL, profile: str = SQLITE_PROFILE
+) -> Engine:
+    """Create an engine with the configured pool and, for SQLite, the tuning profile."""
+    # sessions may be used from several threadpool threads within one request
+    connect_args = {"check_same_thread": False} if is_sqlite(database_url) else {}
+
+    engine = create_engine(
+        database_url,
+        echo=False,
+        connect_args=connect_args,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT
+    )
+    if is_sqlite(database_url):
+        configure_sqlite(engine, sqlite_pragmas(profile))
+    return engine
+
+
+def create_async_app_engine(
+    database_url: str = ASYNC_DATABASE_URL, profile: str = SQLITE_PROFILE
+) -> AsyncEngine:
+    """Async counterpart of create_app_engine, with the same pool and pragmas."""
+    engine = create_async_engine(
+        database_url,
+        echo=False,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT
+    )
+    if is_sqlite(database_url):
+        configure_sqlite(engine.sync_engine, sqlite_pragmas(profile))
+    return engine
+
+
+# the sync engine serves scripts, Alembic and the streaming export/import
+# endpoints, which run in worker threads anyway
+engine = create_app_engine()
+read_engine = create_app_engine(READ_DATABASE_URL) if READ_DATABASE_URL else engine
+
+async_engine = create_async_app_engine()
+async_read_engine = (
+    create_async_app_engine(ASYNC_READ_DATABASE_URL)
+    if ASYNC_READ_DATABASE_URL
+    else async_engine
+)
+
+if SHARD_COUNT and not is_sqlite(DATABASE_URL):
+    raise ValueError("SHARD_COUNT requires a SQLite DATABASE_URL")
+
+shard_set = ShardSet(
+    SHARD_COUNT,
+    SHARD_DIR,
+    make_url(DATABASE_URL).database,
+    create_app_engine,
+    create_async_app_engine,
+)
+
+
+def user_shard_engine(user_id: int, fresh: bool = False) -> Engine:
+    override = placements.override(engine, user_id, fresh)
+    return shard_set.engine(shard_set.shard_of(user_id, override))
+
+
+def async_user_shard_engine(user_id: int, fresh: bool = False) -> Engine:
+    # runs inside the async session's greenlet, so the sync facade of the
+    # async engines can be used
+    override = placements.override(async_engine.sync_engine, user_id, fresh)
+    return shard_set.async_engine(shard_set.shard_of(user_id, override)).sync_engine
+
+
+def write_engine_for(user_id: int, fresh: bool = False) -> Engine:
+    """Engine receiving a user's writes: their shard, or the primary if unsharded."""
+    return user_shard_engine(user_id, fresh) if shard_set.enabled else engine
+
+
+# scripts always work on the primary
 Session = sessionmaker(bind=engine)
+# request sessions send reads to the replica, or everything to the user's shard
+RequestSession = sessionmaker(
+    class_=RoutingSession,
+    primary=engine,
+    replica=read_engine,
+    shards=user_shard_engine if shard_set.enabled else None
+)
+
+# instances stay usable after commit, lazy loads are not possible in async code
+AsyncSessionLocal = async_sessionmaker(
+    sync_session_class=RoutingSession,
+    primary=async_engine.sync_engine,
+    replica=async_read_engine.sync_engine,
+    shards=async_user_shard_engine if shard_set.enabled else None,
+    expire_on_commit=False
+)
 
 
 def get_session():
-    db = Session()
+    db = RequestSession()
     try:
         yield db
     finally:
         db.close()
 
+
+async def get_async_session():
+    async with AsyncSessionLocal() as db:
+        yield db
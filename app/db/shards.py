@@ -0,0 +1,304 @@
+# standard library
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from os import getenv
+from pathlib import Path
+
+# third party
+from sqlalchemy import MetaData, delete, event, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# local
+from app.expenses.search import create_expense_search
+from app.models.models import (
+    Base,
+    Expense,
+    MonthlyCategoryTotal,
+    UserDataVersion,
+    UserShard,
+)
+
+
+# every shard allocates expense ids from its own range, so ids stay unique
+# across shards and a user can be moved without renumbering its expenses
+SHARD_ID_SPAN = 2 ** 40
+
+# tables holding per-user data; everything else stays in the catalog database
+SHARDED_TABLES = ("expenses", "monthly_category_totals", "user_data_versions")
+
+# how long a process trusts a cached placement; moves made by another
+# process, e.g. scripts/rebalance_shards.py, are seen after this long
+SHARD_PLACEMENT_TTL_SECONDS = float(getenv("SHARD_PLACEMENT_TTL_SECONDS", "5"))
+
+
+def hash_shard(user_id: int, count: int) -> int:
+    """Stable placement of a user among ``count`` shards, identical in every process."""
+    return zlib.crc32(str(user_id).encode()) % count
+
+
+def attach_catalog(engine: Engine, catalog_path: str) -> None:
+    """Attach the catalog to every shard connection so expenses can join its tables.
+
+    The catalog is attached read-only: BEGIN IMMEDIATE write-locks every
+    writable attached database, which would make writers of all shards
+    wait for each other on the catalog file.
+    """
+    catalog_uri = Path(catalog_path).resolve().as_uri() + "?mode=ro"
+
+    @event.listens_for(engine, "connect")
+    def attach(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("ATTACH DATABASE ? AS catalog", (catalog_uri,))
+        finally:
+            cursor.close()
+
+
+class ShardSet:
+    """SQLite shard files holding expenses and rollups, next to a shared catalog.
+
+    Users live in the shard given by their id hash unless the catalog's
+    user_shards table says otherwise. Engines are created on first use.
+    """
+
+    def __init__(
+            self,
+            count: int,
+            directory: str,
+            catalog_path: str,
+            create_engine: Callable[[str], Engine],
+            create_async_engine: Callable[[str], AsyncEngine] | None = None
+    ):
+        self.count = count
+        self.directory = Path(directory)
+        self.catalog_path = catalog_path
+        self.create_engine = create_engine
+        self.create_async_engine = create_async_engine
+        self.engines: dict[int, Engine] = {}
+        self.async_engines: dict[int, AsyncEngine] = {}
+        self.lock = threading.RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.count > 0
+
+    def path(self, shard: int) -> Path:
+        return self.directory / f"shard_{shard}.sqlite"
+
+    def shard_of(self, user_id: int, override: int | None = None) -> int:
+        return override if override is not None else hash_shard(user_id, self.count)
+
+    def engine(self, shard: int) -> Engine:
+        """Return the engine of a shard, creating its file and tables on first use."""
+        with self.lock:
+            if shard not in self.engines:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                engine = self.create_engine(f"sqlite:///{self.path(shard)}")
+                attach_catalog(engine, self.catalog_path)
+                self.engines[shard] = engine
+                self.create_shard(shard)
+            return self.engines[shard]
+
+    def async_engine(self, shard: int) -> AsyncEngine:
+        with self.lock:
+            if shard not in self.async_engines:
+                # the sync engine creates the shard tables
+                self.engine(shard)
+                engine = self.create_async_engine(
+                    f"sqlite+aiosqlite:///{self.path(shard)}"
+                )
+                attach_catalog(engine.sync_engine, self.catalog_path)
+                self.async_engines[shard] = engine
+            return self.async_engines[shard]
+
+    def existing_shards(self) -> list[int]:
+        """Indexes of the shard files on disk, even those beyond the current count."""
+        return sorted(
+            int(path.stem.removeprefix("shard_"))
+            for path in self.directory.glob("shard_*.sqlite")
+        )
+
+    def create_shard(self, shard: int) -> None:
+        """Create the sharded tables in a shard file and start its expense id range."""
+        metadata = MetaData()
+        tables = {
+            name: table.to_metadata(metadata)
+            for name, table in Base.metadata.tables.items()
+        }
+        tables["expenses"].dialect_options["sqlite"]["autoincrement"] = True
+
+        with self.engine(shard).begin() as conn:
+            metadata.create_all(conn, tables=[tables[name] for name in SHARDED_TABLES])
+            # copied tables lose the create_all hook of the search index
+            create_expense_search(conn)
+            conn.exec_driver_sql(
+                "INSERT INTO sqlite_sequence (name, seq) "
+                "SELECT 'expenses', ? WHERE NOT EXISTS "
+                "(SELECT 1 FROM sqlite_sequence WHERE name = 'expenses')",
+                (shard * SHARD_ID_SPAN,),
+            )
+
+    def dispose(self) -> None:
+        for engine in self.engines.values():
+            engine.dispose()
+        self.engines.clear()
+
+    async def dispose_async(self) -> None:
+        for engine in self.async_engines.values():
+            await engine.dispose()
+        self.async_engines.clear()
+
+
+def user_override(catalog: Engine, user_id: int) -> int | None:
+    with catalog.connect() as conn:
+        return conn.execute(
+            select(UserShard.shard).where(UserShard.user_id == user_id)
+        ).scalar()
+
+
+class PlacementCache:
+    """Per-process cache of user_shards lookups, so routing needs no catalog query.
+
+    Writers look the placement up again once they hold their shard's lock
+    (see RoutingSession.shard_moved), so a stale entry never misplaces a
+    write. Reads may go to the old shard for up to the TTL after a move
+    made by another process; move_user forgets the user in its own process.
+    """
+
+    def __init__(self, ttl: float = SHARD_PLACEMENT_TTL_SECONDS):
+        self.ttl = ttl
+        self.entries: dict[int, tuple[float, int | None]] = {}
+        self.lock = threading.Lock()
+
+    def override(
+        self, catalog: Engine, user_id: int, fresh: bool = False
+    ) -> int | None:
+        """The user's override shard, read from the catalog if ``fresh`` or uncached."""
+        now = time.monotonic()
+        if not fresh:
+            with self.lock:
+                entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        override = user_override(catalog, user_id)
+
+        with self.lock:
+            self.entries[user_id] = (now + self.ttl, override)
+            # drop expired users once the table grows, instead of on every lookup
+            if len(self.entries) > 10_000:
+                self.entries = {
+                    key: entry for key, entry in self.entries.items() if entry[0] > now
+                }
+
+        return override
+
+    def forget(self, user_id: int) -> None:
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+placements = PlacementCache()
+
+
+def users_in_shard(shards: ShardSet, shard: int) -> list[int]:
+    with shards.engine(shard).connect() as conn:
+        return list(conn.execute(select(Expense.user_id).distinct()).scalars())
+
+
+def move_user(shards: ShardSet, user_id: int, source: int, target: int) -> int:
+    """Move a user's expenses, rollup rows and data version from one shard to another.
+
+    The source shard is write-locked for the whole move, so no expense of
+    the user can be written there in between. The placement is recorded in
+    the catalog in the same transaction that deletes the source rows, and
+    the copy replaces whatever the target holds for the user, so a move
+    interrupted after the copy can simply be run again. Writers that looked
+    the placement up before the move check it again once they hold the
+    shard's lock (see begin_write) and follow the user.
+    Returns the number of expenses moved.
+    """
+    expenses = Expense.__table__
+    rollup = MonthlyCategoryTotal.__table__
+    versions = UserDataVersion.__table__
+    # the placement goes through a writable alias of the read-only catalog
+    catalog_rw = {"schema_translate_map": {None: "catalog_rw"}}
+
+    with shards.engine(source).connect() as src:
+        src.exec_driver_sql("ATTACH DATABASE ? AS catalog_rw", (shards.catalog_path,))
+        src.commit()
+
+        try:
+            with src.begin():
+                # also write-locks the catalog, so the placement is recorded
+                # in the same transaction that deletes the source rows
+                src.exec_driver_sql("BEGIN IMMEDIATE")
+
+                # the version moves along, so ETags handed out before the
+                # move stay valid
+                user_rows = {
+                    table: [
+                        dict(row._mapping)
+                        for row in src.execute(
+                            select(table).where(table.c.user_id == user_id)
+                        )
+                    ]
+                    for table in (expenses, rollup, versions)
+                }
+
+                # rows left in the target by an interrupted move are replaced,
+                # the source stays authoritative until this transaction commits
+                with shards.engine(target).begin() as dst:
+                    for table, rows in user_rows.items():
+                        dst.execute(delete(table).where(table.c.user_id == user_id))
+                        if rows:
+                            dst.execute(insert(table), rows)
+
+                if target == hash_shard(user_id, shards.count):
+                    stmt = delete(UserShard).where(UserShard.user_id == user_id)
+                else:
+                    stmt = sqlite_insert(UserShard).values(
+                        user_id=user_id, shard=target
+                    )
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[UserShard.user_id], set_={"shard": target}
+                    )
+                src.execute(stmt, execution_options=catalog_rw)
+
+                for table in user_rows:
+                    src.execute(delete(table).where(table.c.user_id == user_id))
+        finally:
+            src.exec_driver_sql("DETACH DATABASE catalog_rw")
+            src.commit()
+
+    placements.forget(user_id)
+
+    return len(user_rows[expenses])
+
+
+def rebalance(shards: ShardSet, catalog: Engine) -> list[tuple[int, int, int, int]]:
+    """Move every user found outside its placement (hash or override) back into it.
+
+    Run after changing the shard count. Returns (user id, source, target, expenses)
+    per move.
+    """
+    with catalog.connect() as conn:
+        overrides = dict(conn.execute(select(UserShard.user_id, UserShard.shard)).all())
+
+    moves = []
+    for source in shards.existing_shards():
+        for user_id in users_in_shard(shards, source):
+            target = shards.shard_of(user_id, overrides.get(user_id))
+            if target != source:
+                moved = move_user(shards, user_id, source, target)
+                moves.append((user_id, source, target, moved))
+
+    return moves
@@ -0,0 +1,168 @@
+# standard library
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from os import getenv
+from typing import TypeVar
+
+# third party
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+# local
+from app.core.exception import DatabaseException
+from app.db.routing import RoutingSession
+
+
+# attempts of a write transaction before giving up with DatabaseException
+WRITE_RETRY_ATTEMPTS = int(getenv("WRITE_RETRY_ATTEMPTS", "8"))
+# backoff before retry n is random in [0, min(max, base * 2**n)) milliseconds
+WRITE_RETRY_BASE_DELAY_MS = float(getenv("WRITE_RETRY_BASE_DELAY_MS", "10"))
+WRITE_RETRY_MAX_DELAY_MS = float(getenv("WRITE_RETRY_MAX_DELAY_MS", "1000"))
+
+# takes the write lock up front, so a transaction never fails halfway when
+# upgrading from a read lock, which SQLite reports without waiting
+BEGIN_IMMEDIATE = text("BEGIN IMMEDIATE")
+
+T = TypeVar("T")
+
+
+def is_lock_error(exc: Exception) -> bool:
+    """Whether an error means SQLite was busy or locked, so a retry may succeed."""
+    if not isinstance(exc, OperationalError):
+        return False
+
+    code = getattr(exc.orig, "sqlite_errorcode", None)
+    if code is not None:
+        # extended codes (e.g. SQLITE_BUSY_SNAPSHOT) keep the primary code in the
+        # low byte
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+    message = str(exc.orig).lower()
+    return "database is locked" in message or "database table is locked" in message
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff in seconds before the given retry."""
+    ceiling = min(WRITE_RETRY_MAX_DELAY_MS, WRITE_RETRY_BASE_DELAY_MS * 2 ** attempt)
+    return random.uniform(0, ceiling) / 1000
+
+
+class WriteStats:
+    """Counters of write transactions, their retries and their lock waits."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        self.transactions = 0
+        self.retries = 0
+        self.failures = 0
+        self.lock_wait = 0.0
+        self.max_lock_wait = 0.0
+
+    def record(self, retries: int, lock_wait: float, failed: bool) -> None:
+        with self.lock:
+            self.transactions += 1
+            self.retries += retries
+            self.failures += failed
+            self.lock_wait += lock_wait
+            self.max_lock_wait = max(self.max_lock_wait, lock_wait)
+
+    def stats(self) -> dict:
+        with self.lock:
+            average = self.lock_wait / self.transactions if self.transactions else 0.0
+            return {
+                "transactions": self.transactions,
+                "retries": self.retries,
+                "failures": self.failures,
+                "average_lock_wait_ms": average * 1000,
+                "max_lock_wait_ms": self.max_lock_wait * 1000,
+            }
+
+
+write_stats = WriteStats()
+
+
+def begin_write(db: Session) -> None:
+    """Open the write transaction of a session, with BEGIN IMMEDIATE on SQLite.
+
+    With sharding, the user's placement is checked again once the lock is
+    held: move_user needs the same lock, so a move committed while this
+    transaction waited is seen here, and the transaction starts over on the
+    user's new shard instead of writing rows nobody would read.
+    """
+    # a transaction opened by earlier reads would make BEGIN IMMEDIATE fail
+    if db.in_transaction():
+        db.commit()
+
+    while True:
+        # the text clause also routes the session to the primary
+        conn = db.connection(bind_arguments={"clause": BEGIN_IMMEDIATE})
+        if conn.dialect.name == "sqlite":
+            conn.execute(BEGIN_IMMEDIATE)
+
+        if not (isinstance(db, RoutingSession) and db.shard_moved()):
+            return
+        db.rollback()
+
+
+async def write_transaction(
+        db: AsyncSession,
+        work: Callable[[], Awaitable[T]],
+        attempts: int = WRITE_RETRY_ATTEMPTS
+) -> T:
+    """Run ``work`` in one write transaction and commit it, retrying on SQLite locks.
+
+    On SQLite the transaction starts with BEGIN IMMEDIATE. Lock waits are
+    retried with jittered backoff; ``work`` is then called again on a
+    rolled-back session, so it has to load everything it changes itself.
+    Any other database error, or running out of attempts, raises
+    DatabaseException. The transaction is rolled back on every error.
+    """
+    lock_wait = 0.0
+
+    for attempt in range(1, attempts + 1):
+        started = time.perf_counter()
+        locked = None
+        try:
+            await db.run_sync(begin_write)
+            locked = time.perf_counter()
+
+            result = await work()
+            await db.commit()
+        except SQLAlchemyError as exc:
+            await db.rollback()
+
+            if not is_lock_error(exc):
+                lock_wait += (locked or time.perf_counter()) - started
+                write_stats.record(attempt - 1, lock_wait, failed=True)
+                raise DatabaseException() from exc
+
+            # the whole failed attempt was spent on the lock
+            lock_wait += time.perf_counter() - started
+            if attempt == attempts:
+                write_stats.record(attempt - 1, lock_wait, failed=True)
+                raise DatabaseException() from exc
+
+            delay = backoff_delay(attempt)
+            lock_wait += delay
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            # e.g. a 404 or 409 raised by work; the write lock must not be
+            # held until the session is closed
+            await db.rollback()
+            lock_wait += (locked or time.perf_counter()) - started
+            write_stats.record(attempt - 1, lock_wait, failed=True)
+            raise
+
+        lock_wait += locked - started
+        write_stats.record(attempt - 1, lock_wait, failed=False)
+        return result
@@ -0,0 +1,187 @@
+# standard library
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import suppress
+from os import getenv
+from pathlib import Path
+
+# third party
+from fastapi.concurrency import run_in_threadpool
+
+# local
+from app.expenses.charts import CHART_DPI, CHART_FIGSIZE
+
+
+# number of PNGs kept in process memory
+CHART_CACHE_ENTRIES = int(getenv("CHART_CACHE_ENTRIES", "256"))
+# optional directory for the on-disk tier, disabled when empty
+CHART_CACHE_DIR = getenv("CHART_CACHE_DIR", "")
+CHART_CACHE_DIR_MAX_BYTES = int(
+    getenv("CHART_CACHE_DIR_MAX_BYTES", str(50 * 1024 * 1024))
+)
+# eviction frees the directory down to this share of the cap, so the
+# directory is only rescanned once in a while
+CHART_CACHE_DIR_LOW_WATER = 0.9
+
+logger = logging.getLogger(__name__)
+
+# bump when the chart layout changes so old images are not served
+CHART_VERSION = 1
+
+
+def chart_key(labels: list[str], values: list[int], year: int, month: int) -> str:
+    """Hash the chart data and every parameter that affects the rendered image."""
+    payload = json.dumps(
+        {
+            "version": CHART_VERSION,
+            "labels": labels,
+            "values": values,
+            "year": year,
+            "month": month,
+            "figsize": CHART_FIGSIZE,
+            "dpi": CHART_DPI,
+        },
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ChartCache:
+    """Content-addressed PNG cache: an in-memory LRU and an optional capped directory.
+
+    Keys are derived from the chart data, so changed data simply produces a new
+    key and entries never need to be invalidated; old ones age out.
+
+    Disk I/O runs in the threadpool and its errors only cost a cache miss.
+    The directory size is tracked as files are written; the directory is
+    only scanned when the cap is exceeded, which also picks up files
+    written by other processes sharing it.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = CHART_CACHE_ENTRIES,
+            directory: str | Path | None = CHART_CACHE_DIR or None,
+            max_bytes: int = CHART_CACHE_DIR_MAX_BYTES
+    ):
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory else None
+        self.max_bytes = max_bytes
+        self.memory: OrderedDict[str, bytes] = OrderedDict()
+        self.disk_used = 0
+        self.lock = threading.Lock()
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.disk_used = sum(size for _, size, _ in self.disk_entries())
+
+    async def get(self, key: str) -> bytes | None:
+        with self.lock:
+            image = self.memory.get(key)
+            if image is not None:
+                self.memory.move_to_end(key)
+                return image
+
+        if self.directory is None:
+            return None
+
+        image = await run_in_threadpool(self.read_disk, key)
+        if image is not None:
+            self.remember(key, image)
+
+        return image
+
+    async def put(self, key: str, image: bytes) -> None:
+        self.remember(key, image)
+
+        if self.directory is not None:
+            await run_in_threadpool(self.write_disk, key, image)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.memory.clear()
+            self.disk_used = 0
+
+        if self.directory is not None:
+            for path in self.directory.glob("*.png"):
+                path.unlink(missing_ok=True)
+
+    def remember(self, key: str, image: bytes) -> None:
+        with self.lock:
+            self.memory[key] = image
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_entries:
+                self.memory.popitem(last=False)
+
+    def read_disk(self, key: str) -> bytes | None:
+        path = self.directory / f"{key}.png"
+        try:
+            image = path.read_bytes()
+            # the modification time doubles as the last access time for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.warning("Could not read cached chart %s", path, exc_info=True)
+            return None
+
+        return image
+
+    def write_disk(self, key: str, image: bytes) -> None:
+        if len(image) > self.max_bytes:
+            return
+
+        path = self.directory / f"{key}.png"
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(image)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.warning("Could not cache chart %s", path, exc_info=True)
+            with suppress(OSError):
+                tmp_path.unlink(missing_ok=True)
+            return
+
+        with self.lock:
+            self.disk_used += len(image)
+            over = self.disk_used > self.max_bytes
+
+        if over:
+            self.evict_disk()
+
+    def disk_entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob("*.png"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict_disk(self) -> None:
+        """Delete least recently used files until the directory is under low water."""
+        try:
+            entries = self.disk_entries()
+            used = sum(size for _, size, _ in entries)
+
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if used <= self.max_bytes * CHART_CACHE_DIR_LOW_WATER:
+                    break
+                path.unlink(missing_ok=True)
+                used -= size
+        except OSError:
+            logger.warning(
+                "Could not evict cached charts from %s", self.directory, exc_info=True
+            )
+            return
+
+        with self.lock:
+            self.disk_used = used
+
+
+chart_cache = ChartCache()
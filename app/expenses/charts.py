@@ -0,0 +1,135 @@
+# standard library
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from os import getenv
+
+# third party
+from fastapi.concurrency import run_in_threadpool
+
+# local
+from app.core.exception import ChartRendererBusyException
+
+
+# number of worker processes, 0 renders in the request threadpool instead
+CHART_POOL_WORKERS = int(getenv("CHART_POOL_WORKERS", "2"))
+# renders allowed to be running or queued before new requests get 503
+CHART_POOL_MAX_PENDING = int(getenv("CHART_POOL_MAX_PENDING", "8"))
+
+# render parameters, part of the chart cache key
+CHART_FIGSIZE = (5, 5)
+CHART_DPI = 150
+
+
+def warm_up() -> None:
+    """Import matplotlib once per worker process so the first render is not slowed."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401
+
+
+def ping() -> None:
+    return None
+
+
+def render_pie_chart(
+    labels: list[str], values: list[int], year: int, month: int
+) -> bytes:
+    """Render the monthly pie chart of pre-aggregated category totals as PNG bytes."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    total_sum = sum(values)
+
+    # highlight the largest category
+    max_index = values.index(max(values))
+    explode = [0.08 if i == max_index else 0 for i in range(len(values))]
+
+    # color palette
+    cmap = plt.get_cmap("tab20")
+    colors = cmap(np.linspace(0, 1, len(labels)))
+
+    fig, ax = plt.subplots(figsize=CHART_FIGSIZE)
+
+    ax.pie(
+        values,
+        labels=labels,
+        autopct=lambda pct: f"{pct:.1f}%\n({int(pct / 100. * total_sum)})",
+        startangle=90,
+        explode=explode,
+        colors=colors,
+        wedgeprops={"width": 0.4, "edgecolor": "white", "linewidth": 1.2},
+        textprops={"fontsize": 10}
+    )
+
+    # chart title
+    ax.set_title(
+        f"Expenses distribution\n{month:02}/{year}",
+        fontsize=14,
+        weight="bold"
+    )
+
+    # keep pie chart proportions equal
+    ax.axis("equal")
+
+    image_stream = io.BytesIO()
+    fig.savefig(image_stream, format="png", bbox_inches="tight", dpi=CHART_DPI)
+    plt.close(fig)
+
+    return image_stream.getvalue()
+
+
+class ChartRenderer:
+    """Bounded process pool rendering charts away from the API process and its GIL."""
+
+    def __init__(
+        self,
+        workers: int = CHART_POOL_WORKERS,
+        max_pending: int = CHART_POOL_MAX_PENDING,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.executor: ProcessPoolExecutor | None = None
+
+    def start(self) -> None:
+        if self.workers <= 0 or self.executor is not None:
+            return
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=get_context("spawn"),
+            initializer=warm_up
+        )
+
+        # spawn every worker now so the first requests do not pay for it
+        wait([self.executor.submit(ping) for _ in range(self.workers)])
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    async def render(
+        self, labels: list[str], values: list[int], year: int, month: int
+    ) -> bytes:
+        if self.pending >= self.max_pending:
+            raise ChartRendererBusyException()
+
+        self.pending += 1
+        try:
+            if self.executor is None:
+                return await run_in_threadpool(
+                    render_pie_chart, labels, values, year, month
+                )
+
+            future = self.executor.submit(render_pie_chart, labels, values, year, month)
+            return await asyncio.wrap_future(future)
+        finally:
+            self.pending -= 1
+
+
+chart_renderer = ChartRenderer()
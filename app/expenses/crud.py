@@ -1,41 +1,145 @@
 # standard library
+import base64
+import csv
 import io
-from datetime import date, datetime, time
+import json
+import zlib
+from datetime import date, datetime, time, timezone
+from itertools import islice
 
 # third party
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from sqlalchemy import func
+from pydantic import ValidationError
+from sqlalchemy import and_, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
 # local
 from app.core.exception import (
     CategoryNotFoundException,
     ExpenseNotFoundException,
+    InvalidCursorException,
+    InvalidImportFileException,
     InvalidMonthException,
     InvalidYearException,
     NoExpensesFoundException,
+    format_validation_errors,
 )
-from app.models.models import Category, Expense, User
-from app.schemas.schemas import ExpenseCreateDTO, ExpenseUpdateDTO
-
-
-def get_all_expenses(db: Session,
-                     current_user: User,
-                     limit: int,
-                     offset: int,
-                     sort_by: str,
-                     order: str,
-                     min_price: int | None,
-                     max_price: int | None,
-                     start_date: date | None,
-                     end_date: date | None,
-                     category_id: int | None,
-                     category_name: str | None
-                     ):
+from app.core.security import Principal
+from app.db.transactions import begin_write, write_transaction
+from app.expenses import rollup, versions
+from app.expenses.search import expenses_fts, fts_query, like_filter, search_terms
+from app.expenses.streaming import stream_from_thread
+from app.models.models import Category, Expense, MonthlyCategoryTotal
+from app.schemas.schemas import ExpenseCreateDTO, ExpenseDTO, ExpenseUpdateDTO
+
+
+def encode_cursor(sort_by: str, order: str, value, expense_id: int) -> str:
+    """Build an opaque keyset cursor pointing just after the given row."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+
+    payload = json.dumps([sort_by, order, value, expense_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, order: str):
+    """Return the (value, id) pair stored in a cursor created for the same sorting."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort_by, cursor_order, value, expense_id = json.loads(
+            base64.urlsafe_b64decode(padded)
+        )
+        if sort_by == "created_at":
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        raise InvalidCursorException()
+
+    # the value is bound into the keyset filter, so it must fit the column
+    if sort_by in ("id", "price"):
+        valid_value = is_int64(value)
+    elif sort_by == "name":
+        valid_value = isinstance(value, str)
+    else:
+        valid_value = True
+
+    if (
+        cursor_sort_by != sort_by
+        or cursor_order != order
+        or not valid_value
+        or not is_int64(expense_id)
+    ):
+        raise InvalidCursorException()
+
+    return value, expense_id
+
+
+def is_int64(value) -> bool:
+    if isinstance(value, bool) or not isinstance(value, int):
+        return False
+    return -2 ** 63 <= value < 2 ** 63
+
+
+EXPENSE_LIST_COLUMNS = (
+    Expense.id,
+    Expense.name,
+    Expense.price,
+    Expense.created_at,
+    Category.id.label("category_id"),
+    Category.name.label("category_name"),
+)
+
+
+def expense_list_item(row) -> dict:
+    """Build the JSON-ready ExpenseDTO dict of a listed row.
+
+    created_at is naive, so isoformat() matches the pydantic serialization
+    of ExpenseDTO exactly and the page can be returned without re-validation.
+    """
+    return {
+        "id": row.id,
+        "name": row.name,
+        "price": row.price,
+        "created_at": row.created_at.isoformat(),
+        "category": {"id": row.category_id, "name": row.category_name},
+    }
+
+
+async def get_all_expenses(db: AsyncSession,
+                           current_user: Principal,
+                           limit: int,
+                           offset: int,
+                           sort_by: str,
+                           order: str,
+                           min_price: int | None,
+                           max_price: int | None,
+                           start_date: date | None,
+                           end_date: date | None,
+                           category_id: int | None,
+                           category_name: str | None,
+                           cursor: str | None = None,
+                           include_total: str = "exact",
+                           q: str | None = None
+                           ):
+    """Return a page of the user's expenses.
+
+    ``include_total`` picks how ``total`` is filled: "exact" counts the
+    matching rows, "estimate" reads the rollup table (see
+    estimate_expense_count) and "false" leaves it out. ``has_more`` is
+    always known, from the extra row fetched past the page.
+
+    ``q`` keeps expenses whose name has a word starting with every term
+    of it, looked up in the FTS5 index on SQLite. ``sort_by="relevance"``
+    then orders by rank and pages with offset only; other databases fall
+    back to substring matching sorted by created_at.
+    """
+    # plain column tuples skip the identity map and attribute instrumentation
+    # of full Expense instances, which dominate the cost of a large page
     query = (
-        db.query(Expense)
-        .options(joinedload(Expense.category))
+        select(*EXPENSE_LIST_COLUMNS)
+        .join(Expense.category)
         .filter(Expense.user_id == current_user.id)
     )
 
@@ -54,12 +158,40 @@ def get_all_expenses(db: Session,
         query = query.filter(Expense.created_at <= end_dt)
 
     if category_name is not None:
-        query = query.join(Category).filter(Category.name == category_name)
+        query = query.filter(Category.name == category_name)
 
     # filter by category
     if category_id is not None:
         query = query.filter(Expense.category_id == category_id)
 
+    # full-text search on names
+    ranked = False
+    search_filter = None
+    if q is not None:
+        terms = search_terms(q)
+        if terms and db.get_bind().dialect.name == "sqlite":
+            fts_match = expenses_fts.c.expenses_fts.match(fts_query(terms))
+            # the matching ids are looked up once; as a plain join, SQLite
+            # would run the match again for every expense of the user
+            search_filter = Expense.id.in_(
+                select(expenses_fts.c.rowid).filter(fts_match)
+            )
+            ranked = sort_by == "relevance"
+        else:
+            search_filter = like_filter(terms)
+
+    # the count always uses the id lookup, never the ranking join
+    filters = query.whereclause
+    if search_filter is not None:
+        filters = and_(filters, search_filter)
+
+    if ranked:
+        # rank is only known on a joined match, which then drives the query
+        query = query.join(expenses_fts, expenses_fts.c.rowid == Expense.id)
+        query = query.filter(fts_match)
+    elif search_filter is not None:
+        query = query.filter(search_filter)
+
     # dynamic sorting
     columns = {
         "id": Expense.id,
@@ -68,124 +200,310 @@ def get_all_expenses(db: Session,
         "created_at": Expense.created_at
     }
 
-    column = columns.get(sort_by) or Expense.created_at
-
-    if order == "desc":
-        query = query.order_by(column.desc(), Expense.id.desc())
+    if ranked:
+        # bm25 ranks are negative, the best matches come first
+        query = query.order_by(expenses_fts.c.rank, Expense.id.desc())
     else:
-        query = query.order_by(column.asc(), Expense.id.asc())
-
-    total = query.order_by(None).count()
+        if sort_by not in columns:
+            sort_by = "created_at"
+        column = columns[sort_by]
+
+        if order == "desc":
+            query = query.order_by(column.desc(), Expense.id.desc())
+        else:
+            query = query.order_by(column.asc(), Expense.id.asc())
+
+    total = None
+    if include_total == "exact":
+        # the count only needs categories when filtering by their name
+        count_query = select(func.count()).select_from(Expense)
+        if category_name is not None:
+            count_query = count_query.join(Expense.category)
+        total = await db.scalar(count_query.where(filters))
+    elif include_total == "estimate":
+        total = await estimate_expense_count(
+            db, current_user, start_date, end_date, category_id, category_name
+        )
 
-    items = (
+    # keyset pagination: seek past the last row of the previous page
+    # instead of skipping rows with OFFSET
+    if cursor is not None:
+        # ranks change as expenses are added, they cannot anchor a page
+        if ranked:
+            raise InvalidCursorException()
+        value, last_id = decode_cursor(cursor, sort_by, order)
+        if order == "desc":
+            query = query.filter(tuple_(column, Expense.id) < tuple_(value, last_id))
+        else:
+            query = query.filter(tuple_(column, Expense.id) > tuple_(value, last_id))
+        offset = 0
+
+    # fetch one extra row to know whether another page exists
+    rows = (await db.execute(
         query
         .offset(offset)
-        .limit(limit)
-        .all()
-    )
+        .limit(limit + 1)
+    )).all()
+
+    next_cursor = None
+    has_more = len(rows) > limit
+    if has_more:
+        rows = rows[:limit]
+        if not ranked:
+            last = rows[-1]
+            next_cursor = encode_cursor(sort_by, order, getattr(last, sort_by), last.id)
 
     return {
-        "items": items,
+        "items": [expense_list_item(row) for row in rows],
         "total": total,
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": next_cursor,
+        "has_more": has_more
     }
 
 
-def get_expense_by_id(db: Session, expense_id: int, current_user: User):
-    expense = db.query(Expense).filter(Expense.id == expense_id, Expense.user_id == current_user.id).first()
+async def estimate_expense_count(db: AsyncSession,
+                                 current_user: Principal,
+                                 start_date: date | None,
+                                 end_date: date | None,
+                                 category_id: int | None,
+                                 category_name: str | None
+                                 ) -> int:
+    """Estimate the number of listed expenses from the rollup table.
+
+    Reads at most one row per month and category instead of the expenses.
+    Date filters are widened to whole months, price filters and the search
+    are ignored, so the estimate is exact without those filters and an
+    upper bound otherwise.
+    """
+    query = (
+        select(func.coalesce(func.sum(MonthlyCategoryTotal.count), 0))
+        .filter(MonthlyCategoryTotal.user_id == current_user.id)
+    )
+
+    month = tuple_(MonthlyCategoryTotal.year, MonthlyCategoryTotal.month)
+    if start_date is not None:
+        query = query.filter(month >= tuple_(start_date.year, start_date.month))
+    if end_date is not None:
+        query = query.filter(month <= tuple_(end_date.year, end_date.month))
+
+    if category_name is not None:
+        query = (
+            query.join(Category, MonthlyCategoryTotal.category_id == Category.id)
+            .filter(Category.name == category_name)
+        )
+    if category_id is not None:
+        query = query.filter(MonthlyCategoryTotal.category_id == category_id)
+
+    return await db.scalar(query)
+
+
+async def get_expense_by_id(db: AsyncSession, expense_id: int, current_user: Principal):
+    expense = await db.scalar(
+        select(Expense)
+        .options(joinedload(Expense.category))
+        .filter(Expense.id == expense_id, Expense.user_id == current_user.id)
+    )
     if not expense:
         raise ExpenseNotFoundException()
 
     return expense
 
 
-def create_expense(db: Session, dto: ExpenseCreateDTO, current_user: User):
-    category = db.query(Category).filter(Category.id == dto.category_id).first()
-    if not category:
-        raise CategoryNotFoundException()
-
-    expense = Expense(
+def new_expense(
+    dto: ExpenseCreateDTO, category: Category, current_user: Principal
+) -> Expense:
+    return Expense(
         name=dto.name,
         price=dto.price,
         category=category,
         user_id=current_user.id
     )
 
-    db.add(expense)
-    db.commit()
-    db.refresh(expense)
 
-    return expense
-
-
-def update_expense(db: Session, expense_id: int, dto: ExpenseUpdateDTO, current_user: User):
-    expense = get_expense_by_id(db, expense_id, current_user)
+def apply_expense_update(
+    expense: Expense, dto: ExpenseUpdateDTO, category: Category | None
+):
     if dto.name is not None:
         expense.name = dto.name
-    if dto.category_id is not None:
-        category = db.query(Category).filter(Category.id == dto.category_id).first()
-        if not category:
-            raise CategoryNotFoundException()
+    if category is not None:
         expense.category = category
     if dto.price is not None:
         expense.price = dto.price
 
-    db.commit()
-    db.refresh(expense)
 
-    return expense
+async def create_expense(
+    db: AsyncSession, dto: ExpenseCreateDTO, current_user: Principal
+):
+
+    async def work():
+        category = await db.get(Category, dto.category_id)
+        if not category:
+            raise CategoryNotFoundException()
 
+        expense = new_expense(dto, category, current_user)
+        db.add(expense)
+        return expense
 
-def delete_expense(db: Session, expense_id: int, current_user: User):
-    expense = get_expense_by_id(db, expense_id, current_user)
-    db.delete(expense)
-    db.commit()
+    expense = await write_transaction(db, work)
+    await db.refresh(expense, ["created_at"])
 
     return expense
 
 
-def statistics(db: Session, year: int, month: int, current_user: User):
+async def update_expense(
+    db: AsyncSession, expense_id: int, dto: ExpenseUpdateDTO, current_user: Principal
+):
+
+    async def work():
+        expense = await get_expense_by_id(db, expense_id, current_user)
+
+        category = None
+        if dto.category_id is not None:
+            category = await db.get(Category, dto.category_id)
+            if not category:
+                raise CategoryNotFoundException()
+
+        apply_expense_update(expense, dto, category)
+        return expense
+
+    return await write_transaction(db, work)
+
+
+async def delete_expense(db: AsyncSession, expense_id: int, current_user: Principal):
+
+    async def work():
+        expense = await get_expense_by_id(db, expense_id, current_user)
+        await db.delete(expense)
+        return expense
+
+    return await write_transaction(db, work)
+
+
+async def batch_expenses(db: AsyncSession, operations: list, current_user: Principal):
+    """Apply a list of create, update and delete operations in a single transaction.
+
+    Categories and the expenses being changed are fetched with one query each
+    up front. Operations that fail (unknown expense or category) are reported
+    in their result and skipped, the rest are committed together.
+    """
+
+    async def work():
+        category_ids = {
+            operation.data.category_id
+            for operation in operations
+            if operation.op != "delete" and operation.data.category_id is not None
+        }
+        categories = {
+            category.id: category
+            for category in await db.scalars(
+                select(Category).filter(Category.id.in_(category_ids))
+            )
+        }
+
+        expense_ids = {
+            operation.id for operation in operations if operation.op != "create"
+        }
+        expenses = {
+            expense.id: expense
+            for expense in await db.scalars(
+                select(Expense)
+                .options(joinedload(Expense.category))
+                .filter(Expense.id.in_(expense_ids), Expense.user_id == current_user.id)
+            )
+        }
+
+        results = []
+        changed = []
+
+        for index, operation in enumerate(operations):
+            result = {"index": index, "op": operation.op}
+            results.append(result)
+
+            category = None
+            if operation.op != "delete" and operation.data.category_id is not None:
+                category = categories.get(operation.data.category_id)
+                if category is None:
+                    result.update(status=400, error="Category not found")
+                    continue
+
+            if operation.op == "create":
+                expense = new_expense(operation.data, category, current_user)
+                db.add(expense)
+                result["status"] = 201
+                changed.append((result, expense))
+                continue
+
+            expense = expenses.get(operation.id)
+            if expense is None:
+                result.update(status=404, error="Expense not found")
+                continue
+
+            if operation.op == "update":
+                apply_expense_update(expense, operation.data, category)
+                result["status"] = 200
+                changed.append((result, expense))
+            else:
+                await db.delete(expense)
+                # a later operation on the same id sees it as gone
+                del expenses[operation.id]
+                result["status"] = 204
+
+        # a single flush assigns ids and defaults for the whole batch; the
+        # response is built before the commit expires the instances
+        await db.flush()
+        for result, expense in changed:
+            result["expense"] = ExpenseDTO.model_validate(expense)
+
+        return {"results": results}
+
+    return await write_transaction(db, work)
+
+
+async def monthly_category_totals(
+    db: AsyncSession, year: int, month: int, current_user: Principal
+):
+    """Return (category name, total, count, max) rows of a month from the rollup."""
     if month < 1 or month > 12:
         raise InvalidMonthException()
 
     if year < 2000 or year > 2100:
         raise InvalidYearException()
 
-    result = db.query(
-        func.sum(Expense.price),
-        func.avg(Expense.price),
-        func.max(Expense.price),
-        func.count(Expense.id)
-    ).filter(
-        func.strftime("%m", Expense.created_at) == f"{month:02}",
-        func.strftime("%Y", Expense.created_at) == str(year),
-        Expense.user_id == current_user.id
-    ).one()
-
-    total, average, max_expense, count = result
-
-    total = total or 0
-    average = round(average or 0, 2)
-    max_expense = max_expense or 0
-    count = count or 0
-
-    category_stats = (
-        db.query(Category.name, func.sum(Expense.price))
-        .join(Expense, Expense.category_id == Category.id)
+    # totals are read from the incrementally maintained rollup table,
+    # one row per category instead of one row per expense
+    result = await db.execute(
+        select(
+            Category.name,
+            MonthlyCategoryTotal.total,
+            MonthlyCategoryTotal.count,
+            MonthlyCategoryTotal.max
+        )
+        .join(MonthlyCategoryTotal, MonthlyCategoryTotal.category_id == Category.id)
         .filter(
-            func.strftime("%m", Expense.created_at) == f"{month:02}",
-            func.strftime("%Y", Expense.created_at) == str(year),
-            Expense.user_id == current_user.id
+            MonthlyCategoryTotal.user_id == current_user.id,
+            MonthlyCategoryTotal.year == year,
+            MonthlyCategoryTotal.month == month
         )
-        .group_by(Category.name)
-        .all()
+        .order_by(Category.name)
     )
+    return result.all()
 
-    by_category = [
-        {"category": name, "total": category_total or 0}
-        for name, category_total in category_stats
-    ]
+
+async def statistics(db: AsyncSession, year: int, month: int, current_user: Principal):
+    category_stats = await monthly_category_totals(db, year, month, current_user)
+
+    total = count = max_expense = 0
+    by_category = []
+
+    for name, category_total, category_count, category_max in category_stats:
+        total += category_total
+        count += category_count
+        max_expense = max(max_expense, category_max)
+        by_category.append({"category": name, "total": category_total})
+
+    average = round(total / count, 2) if count else 0
 
     return {
         "total": total,
@@ -196,96 +514,46 @@ def statistics(db: Session, year: int, month: int, current_user: User):
     }
 
 
-def generate_visualization(db: Session, year: int, month: int, current_user: User):
-    import matplotlib
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
-    import numpy as np
-
-    if month < 1 or month > 12:
-        raise InvalidMonthException()
-
-    if year < 2000 or year > 2100:
-        raise InvalidYearException()
-
-    expenses = (db.query(Expense)
-                .options(joinedload(Expense.category))
-                .filter(
-        func.strftime("%m", Expense.created_at) == f"{month:02}",
-        func.strftime("%Y", Expense.created_at) == str(year),
-        Expense.user_id == int(current_user.id)
-    )
-                .all()
-                )
+async def visualization_data(
+    db: AsyncSession, year: int, month: int, current_user: Principal
+):
+    """Return chart labels and values: expense totals per category for a month."""
+    category_stats = await monthly_category_totals(db, year, month, current_user)
 
-    if not expenses:
+    if not category_stats:
         raise NoExpensesFoundException()
 
-    # group expenses by category
-    categories = {}
-    for expense in expenses:
-        name = expense.category.name
-        categories[name] = categories.get(name, 0) + expense.price
-
-    # prepare data for chart
-    labels = list(categories.keys())
-    values = list(categories.values())
-    total_sum = sum(values)
-
-    # highlight the largest category
-    max_index = values.index(max(values))
-    explode = [0.08 if i == max_index else 0 for i in range(len(values))]
-
-    # color palette
-    cmap = plt.get_cmap("tab20")
-    colors = cmap(np.linspace(0, 1, len(labels)))
-
-    fig, ax = plt.subplots(figsize=(5, 5))
-
-    ax.pie(
-        values,
-        labels=labels,
-        autopct=lambda pct: f"{pct:.1f}%\n({int(pct / 100. * total_sum)})",
-        startangle=90,
-        explode=explode,
-        colors=colors,
-        wedgeprops={"width": 0.4, "edgecolor": "white", "linewidth": 1.2},
-        textprops={"fontsize": 10}
-    )
+    labels = [name for name, _, _, _ in category_stats]
+    values = [category_total for _, category_total, _, _ in category_stats]
 
-    # chart title
-    ax.set_title(
-        f"Expenses distribution\n{month:02}/{year}",
-        fontsize=14,
-        weight="bold"
-    )
+    return labels, values
 
-    # keep pie chart proportions equal
-    ax.axis("equal")
 
-    image_stream = io.BytesIO()
-    fig.savefig(image_stream, format="png", bbox_inches="tight", dpi=150)
-    plt.close(fig)
-    image_stream.seek(0)
+# rows pulled from the database per round trip while exporting
+REPORT_BATCH_SIZE = 1000
+# rows pulled per round trip for the plain text formats
+EXPORT_BATCH_SIZE = 5000
 
-    return image_stream
+EXPORT_COLUMNS = ["id", "name", "category", "price", "created_at"]
 
 
-def generate_report(
+def report_query(
         db: Session,
         category: str | None,
         start_date: date | None,
         end_date: date | None,
-        current_user: User
+        current_user: Principal
 ):
     query = (
-        db.query(Expense)
-        .options(joinedload(Expense.category))
+        db.query(
+            Expense.id, Expense.name, Category.name, Expense.price, Expense.created_at
+        )
+        .join(Category, Expense.category_id == Category.id)
         .filter(Expense.user_id == int(current_user.id))
     )
 
     if category:
-        query = query.join(Category).filter(Category.name == category)
+        query = query.filter(Category.name == category)
 
     if start_date:
         start_dt = datetime.combine(start_date, time.min)
@@ -295,33 +563,30 @@ def generate_report(
         end_dt = datetime.combine(end_date, time.max)
         query = query.filter(Expense.created_at <= end_dt)
 
-    expenses = query.order_by(Expense.created_at.asc()).all()
+    return query.order_by(Expense.created_at.asc(), Expense.id.asc())
 
-    if not expenses:
-        raise NoExpensesFoundException()
 
-    wb = Workbook()
+def styled_cell(ws, value, **styles):
+    cell = WriteOnlyCell(ws, value=value)
+    for name, style in styles.items():
+        setattr(cell, name, style)
+    return cell
 
-    # =========================
-    # SHEET 1 — DATA
-    # =========================
-    ws_data = wb.active
-    ws_data.title = "Data"
 
-    headers = ["ID", "Name", "Category", "Price", "Created At"]
-    ws_data.append(headers)
+def write_report(output, rows, start_date: date | None, end_date: date | None):
+    """Write the Excel report for the given rows in a single pass.
 
-    for col in range(1, len(headers) + 1):
-        ws_data.cell(row=1, column=col).font = Font(bold=True)
+    The write-only workbook keeps rows on disk instead of in memory and the
+    summary totals are accumulated while the data sheet is written. openpyxl
+    only builds the ZIP in save(), so nothing reaches ``output`` before all
+    rows have been read.
+    """
+    wb = Workbook(write_only=True)
 
-    for exp in expenses:
-        ws_data.append([
-            exp.id,
-            exp.name,
-            getattr(exp.category, "name", None),
-            exp.price,
-            exp.created_at
-        ])
+    # =========================
+    # SHEET 1 — DATA
+    # =========================
+    ws_data = wb.create_sheet("Data")
 
     ws_data.column_dimensions["A"].width = 8
     ws_data.column_dimensions["B"].width = 22
@@ -329,71 +594,85 @@ def generate_report(
     ws_data.column_dimensions["D"].width = 14
     ws_data.column_dimensions["E"].width = 20
 
-    for row in ws_data.iter_rows(min_row=2, min_col=4, max_col=4):
-        for cell in row:
-            cell.number_format = "#,##0.00"
+    headers = ["ID", "Name", "Category", "Price", "Created At"]
+    ws_data.append([
+        styled_cell(ws_data, header, font=Font(bold=True)) for header in headers
+    ])
+
+    total = 0
+    count = 0
+    max_value = None
+    category_totals = {}
+
+    for expense_id, name, category_name, price, created_at in rows:
+        ws_data.append([
+            expense_id,
+            name,
+            category_name,
+            styled_cell(ws_data, price, number_format="#,##0.00"),
+            created_at
+        ])
+
+        total += price
+        count += 1
+        max_value = price if max_value is None else max(max_value, price)
+        category_totals[category_name] = category_totals.get(category_name, 0) + price
 
     # =========================
     # SHEET 2 — SUMMARY
     # =========================
     ws_summary = wb.create_sheet("Summary")
 
+    ws_summary.column_dimensions["A"].width = 22
+    ws_summary.column_dimensions["B"].width = 16
+
     # Nagłówek
-    ws_summary["A1"] = "EXPENSE REPORT SUMMARY"
-    ws_summary.merge_cells("A1:B1")
-    ws_summary["A1"].font = Font(size=16, bold=True)
-    ws_summary["A1"].alignment = Alignment(horizontal="center")
-    ws_summary["A1"].fill = PatternFill(
-        start_color="DDDDDD",
-        end_color="DDDDDD",
-        fill_type="solid"
-    )
+    ws_summary.merged_cells.add("A1:B1")
+    ws_summary.append([
+        styled_cell(
+            ws_summary,
+            "EXPENSE REPORT SUMMARY",
+            font=Font(size=16, bold=True),
+            alignment=Alignment(horizontal="center"),
+            fill=PatternFill(
+                start_color="DDDDDD", end_color="DDDDDD", fill_type="solid"
+            )
+        )
+    ])
 
     # Report period
     period_text = f"Period: {start_date or '---'} - {end_date or '---'}"
-    ws_summary["A2"] = period_text
-    ws_summary.merge_cells("A2:B2")
-    ws_summary["A2"].alignment = Alignment(horizontal="center")
+    ws_summary.merged_cells.add("A2:B2")
+    ws_summary.append([
+        styled_cell(ws_summary, period_text, alignment=Alignment(horizontal="center"))
+    ])
+    ws_summary.append([])
 
     # Basic statistics
-    total = sum(exp.price for exp in expenses)
-    count = len(expenses)
     average = total / count if count else 0
-    max_value = max(exp.price for exp in expenses)
-
-    summary_rows = [
-        ("Total", total),
-        ("Average", average),
-        ("Max", max_value),
-        ("Count", count),
-    ]
-
-    for idx, (label, value) in enumerate(summary_rows, start=4):
-        ws_summary[f"A{idx}"] = label
-        ws_summary[f"B{idx}"] = value
-        ws_summary[f"A{idx}"].font = Font(bold=True)
 
-    # Currency format (Total, Average, Max)
-    for row in ws_summary.iter_rows(min_row=4, max_row=6, min_col=2, max_col=2):
-        for cell in row:
-            cell.number_format = "#,##0.00"
-
-    # Borders for summary table
     thin = Side(style="thin")
     border = Border(left=thin, right=thin, top=thin, bottom=thin)
 
-    for row in ws_summary.iter_rows(min_row=4, max_row=7, min_col=1, max_col=2):
-        for cell in row:
-            cell.border = border
+    summary_rows = [
+        ("Total", total, "#,##0.00"),
+        ("Average", average, "#,##0.00"),
+        ("Max", max_value, "#,##0.00"),
+        ("Count", count, "General"),
+    ]
 
-    # Category section
-    ws_summary["A9"] = "By Category"
-    ws_summary["A9"].font = Font(size=12, bold=True)
+    for label, value, number_format in summary_rows:
+        ws_summary.append([
+            styled_cell(ws_summary, label, font=Font(bold=True), border=border),
+            styled_cell(ws_summary, value, number_format=number_format, border=border)
+        ])
 
-    category_totals = {}
-    for exp in expenses:
-        name = exp.category.name
-        category_totals[name] = category_totals.get(name, 0) + exp.price
+    # Category section
+    ws_summary.append([])
+    ws_summary.append([
+        styled_cell(ws_summary, "By Category", font=Font(size=12, bold=True))
+    ])
+    ws_summary.append([])
 
     # Sort categories by total descending
     sorted_categories = sorted(
@@ -402,27 +681,276 @@ def generate_report(
         reverse=True
     )
 
-    row_start = 11
-
     for idx, (cat, value) in enumerate(sorted_categories):
-        ws_summary[f"A{row_start + idx}"] = cat
-        ws_summary[f"B{row_start + idx}"] = value
-        ws_summary[f"B{row_start + idx}"].number_format = "#,##0.00"
+        styles = {"border": border}
 
         # Highlight the largest category
         if idx == 0:
-            ws_summary[f"A{row_start + idx}"].font = Font(bold=True)
-            ws_summary[f"B{row_start + idx}"].font = Font(bold=True)
-
-        ws_summary[f"A{row_start + idx}"].border = border
-        ws_summary[f"B{row_start + idx}"].border = border
+            styles["font"] = Font(bold=True)
 
-    ws_summary.column_dimensions["A"].width = 22
-    ws_summary.column_dimensions["B"].width = 16
+        ws_summary.append([
+            styled_cell(ws_summary, cat, **styles),
+            styled_cell(ws_summary, value, number_format="#,##0.00", **styles)
+        ])
 
-    output = io.BytesIO()
     wb.save(output)
-    output.seek(0)
 
-    return output
 
+def generate_report(
+        db: Session,
+        category: str | None,
+        start_date: date | None,
+        end_date: date | None,
+        current_user: Principal
+):
+    """Return an iterator streaming the Excel report as it is saved.
+
+    Rows are pulled in batches by a background producer using its own session,
+    because the request session is closed before the response body is sent.
+    Memory stays flat, but the first byte is only sent once every row has
+    been written to the workbook (see write_report); csv and ndjson exports
+    start right away.
+    """
+    query = report_query(db, category, start_date, end_date, current_user)
+
+    if query.first() is None:
+        raise NoExpensesFoundException()
+
+    bind = db.get_bind()
+
+    def produce(output):
+        report_db = Session(bind=bind)
+        try:
+            rows = query.with_session(report_db).yield_per(REPORT_BATCH_SIZE)
+            write_report(output, rows, start_date, end_date)
+        finally:
+            report_db.close()
+
+    return stream_from_thread(produce)
+
+
+def csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+
+    for partition in rows:
+        writer.writerows(
+            (expense_id, name, category_name, price, created_at.isoformat())
+            for expense_id, name, category_name, price, created_at in partition
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def ndjson_chunks(rows):
+    for partition in rows:
+        yield "".join(
+            json.dumps({
+                "id": expense_id,
+                "name": name,
+                "category": category_name,
+                "price": price,
+                "created_at": created_at.isoformat()
+            }, ensure_ascii=False) + "\n"
+            for expense_id, name, category_name, price, created_at in partition
+        ).encode()
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 selects the gzip container
+
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
+
+
+def generate_export(
+        db: Session,
+        export_format: str,
+        category: str | None,
+        start_date: date | None,
+        end_date: date | None,
+        current_user: Principal,
+        compress: bool = False
+):
+    """Return an iterator streaming expenses as CSV or NDJSON, optionally gzipped.
+
+    Rows come straight from the database cursor in partitions and are
+    encoded as they arrive, without building a workbook.
+    """
+    query = report_query(db, category, start_date, end_date, current_user)
+
+    if query.first() is None:
+        raise NoExpensesFoundException()
+
+    bind = db.get_bind()
+    encode = csv_chunks if export_format == "csv" else ndjson_chunks
+
+    def chunks():
+        export_db = Session(bind=bind)
+        try:
+            statement = query.statement.execution_options(yield_per=EXPORT_BATCH_SIZE)
+            rows = export_db.execute(statement).partitions()
+            yield from encode(rows)
+        finally:
+            export_db.close()
+
+    if compress:
+        return gzip_chunks(chunks())
+
+    return chunks()
+
+
+# rows validated and committed together when importing
+IMPORT_CHUNK_SIZE = 1000
+# rows per multi-row INSERT, keeps the bound parameters under SQLite's limit
+IMPORT_INSERT_BATCH_SIZE = 100
+
+IMPORT_REQUIRED_COLUMNS = {"name", "category", "price"}
+
+
+def batched(iterable, size: int):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def is_utf8(value: str) -> bool:
+    try:
+        value.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def read_import_rows(reader: csv.DictReader):
+    """Yield the line number and row of every CSV record.
+
+    A record the csv module cannot parse (e.g. a field over the size limit)
+    is yielded as a list of errors instead, and reading goes on after it.
+    """
+    rows = iter(reader)
+    # line numbers start at 2, line 1 is the header
+    line = 2
+    while True:
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            row = [{"message": f"Unreadable CSV record: {exc}", "field": None}]
+        yield line, row
+        line += 1
+
+
+def validate_import_row(row: dict, categories: dict[str, int], current_user: Principal):
+    """Validate one CSV row against the ExpenseCreateDTO rules.
+
+    Returns a dict ready for inserting, or a list of errors in the API error format.
+    """
+    # undecodable bytes are kept as lone surrogates by the reader, see import_expenses
+    for key, value in row.items():
+        if isinstance(value, str) and not is_utf8(value):
+            return [{"message": "Invalid UTF-8 text", "field": key or None}]
+
+    category_id = categories.get((row.get("category") or "").strip())
+    if category_id is None:
+        return [{"message": "Category not found", "field": "category"}]
+
+    try:
+        dto = ExpenseCreateDTO(
+            name=row.get("name"), category_id=category_id, price=row.get("price")
+        )
+    except ValidationError as exc:
+        return format_validation_errors(exc.errors())
+
+    created_at = (row.get("created_at") or "").strip()
+    if created_at:
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except ValueError:
+            return [
+                {"message": "Invalid date, expected ISO format", "field": "created_at"}
+            ]
+    else:
+        # same clock as the func.now() column default used for single inserts
+        created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    return {
+        "name": dto.name,
+        "price": dto.price,
+        "category_id": dto.category_id,
+        "user_id": current_user.id,
+        "created_at": created_at,
+    }
+
+
+def import_expenses(db: Session, file, current_user: Principal):
+    """Import expenses from a CSV file (name, category, price, optional created_at).
+
+    Categories are resolved by name once up front. Rows are validated in
+    chunks, valid rows of a chunk are written with multi-row INSERTs and
+    committed together, and invalid rows are reported without stopping the import.
+    """
+    # invalid UTF-8 must fail only the rows containing it, not the whole decode
+    text = io.TextIOWrapper(
+        file, encoding="utf-8-sig", errors="surrogateescape", newline=""
+    )
+    reader = csv.DictReader(text)
+
+    try:
+        columns = {column.strip() for column in reader.fieldnames or []}
+    except csv.Error:
+        raise InvalidImportFileException()
+    if not IMPORT_REQUIRED_COLUMNS <= columns:
+        raise InvalidImportFileException()
+
+    categories = {
+        name: category_id for category_id, name in db.query(Category.id, Category.name)
+    }
+
+    imported = 0
+    errors = []
+
+    for chunk in batched(read_import_rows(reader), IMPORT_CHUNK_SIZE):
+        rows = []
+        for line, row in chunk:
+            if isinstance(row, list):
+                errors.append({"row": line, "errors": row})
+                continue
+
+            row = {(key or "").strip(): value for key, value in row.items()}
+            result = validate_import_row(row, categories, current_user)
+            if isinstance(result, list):
+                errors.append({"row": line, "errors": result})
+            else:
+                rows.append(result)
+
+        if not rows:
+            continue
+
+        begin_write(db)
+        for batch in batched(rows, IMPORT_INSERT_BATCH_SIZE):
+            db.execute(insert(Expense).values(batch))
+
+        # core inserts skip the ORM events, so the rollup and the data version are
+        # updated here
+        rollup.add_rows_to_rollup(db.connection(), rows)
+        versions.bump_data_versions(db.connection(), [current_user.id])
+        db.commit()
+
+        imported += len(rows)
+
+    return {
+        "imported": imported,
+        "failed": len(errors),
+        "errors": errors
+    }
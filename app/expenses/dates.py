@@ -0,0 +1,63 @@
+# standard library
+from datetime import date, datetime, timedelta
+
+# third party
+from sqlalchemy import Integer, and_, cast, extract
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def bucket_start(unit: str, moment: date) -> datetime:
+    """Return the start of the year, month, ISO week (Monday) or day of ``moment``."""
+    day = datetime(moment.year, moment.month, moment.day)
+
+    if unit == "year":
+        return day.replace(month=1, day=1)
+    if unit == "month":
+        return day.replace(day=1)
+    if unit == "week":
+        return day - timedelta(days=day.weekday())
+    if unit == "day":
+        return day
+
+    raise ValueError(f"Unknown date bucket: {unit}")
+
+
+def bucket_range(unit: str, moment: date) -> tuple[datetime, datetime]:
+    """Return the half-open [start, next start) range of the bucket of ``moment``."""
+    start = bucket_start(unit, moment)
+
+    if unit == "year":
+        end = start.replace(year=start.year + 1)
+    elif unit == "month":
+        end = (
+            start.replace(year=start.year + 1, month=1)
+            if start.month == 12
+            else start.replace(month=start.month + 1)
+        )
+    elif unit == "week":
+        end = start + timedelta(weeks=1)
+    else:
+        end = start + timedelta(days=1)
+
+    return start, end
+
+
+def month_range(year: int, month: int) -> tuple[datetime, datetime]:
+    """Return the half-open [first_of_month, first_of_next_month) range for a month."""
+    return bucket_range("month", date(year, month, 1))
+
+
+def in_bucket(column, unit: str, moment: date) -> ColumnElement:
+    """Filter rows whose timestamp falls into the bucket containing ``moment``.
+
+    Plain range predicates work on every database and can use an index on
+    the column, so they are preferred over truncating the column.
+    """
+    start, end = bucket_range(unit, moment)
+    return and_(column >= start, column < end)
+
+
+def date_part(column, part: str) -> ColumnElement:
+    """Extract year or month as an integer on every supported database."""
+    # SQLite compiles extract() to strftime, PostgreSQL returns a numeric
+    return cast(extract(part, column), Integer)
@@ -0,0 +1,260 @@
+# standard library
+import asyncio
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from os import getenv
+
+# third party
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+# local
+from app.core.exception import CategoryNotFoundException, DatabaseException
+from app.core.security import Principal
+from app.db.routing import read_your_writes
+from app.db.session import write_engine_for
+from app.db.transactions import (
+    WRITE_RETRY_ATTEMPTS,
+    backoff_delay,
+    begin_write,
+    is_lock_error,
+    write_stats,
+)
+from app.expenses.crud import new_expense
+from app.models.models import Category, Expense
+from app.schemas.schemas import ExpenseCreateDTO
+
+
+GROUP_COMMIT_ENABLED = (
+    getenv("GROUP_COMMIT_ENABLED", "false").lower() in ("1", "true", "yes")
+)
+# a batch is committed once it has this many expenses ...
+GROUP_COMMIT_MAX_BATCH = int(getenv("GROUP_COMMIT_MAX_BATCH", "100"))
+# ... or once its first expense waited this long
+GROUP_COMMIT_MAX_DELAY_MS = float(getenv("GROUP_COMMIT_MAX_DELAY_MS", "5"))
+
+STOP = object()
+
+
+class GroupCommitWriter:
+    """Single writer thread inserting queued expenses in batched transactions.
+
+    Every caller waits for the commit of the batch holding its expense, so
+    a response is only sent once the expense is durable, but a burst of
+    creates costs one transaction (and one fsync) per batch instead of per
+    expense.
+    """
+
+    def __init__(
+            self,
+            enabled: bool = GROUP_COMMIT_ENABLED,
+            max_batch: int = GROUP_COMMIT_MAX_BATCH,
+            max_delay_ms: float = GROUP_COMMIT_MAX_DELAY_MS,
+            bind_for: Callable[..., Engine] | None = None,
+            attempts: int = WRITE_RETRY_ATTEMPTS
+    ):
+        self.enabled = enabled
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        # engine receiving a user's expenses, the primary or the user's shard
+        self.bind_for = bind_for or write_engine_for
+        self.attempts = attempts
+        self.queue: queue.Queue = queue.Queue()
+        self.thread: threading.Thread | None = None
+        self.lock = threading.Lock()
+
+        self.batches = 0
+        self.expenses = 0
+        self.max_batch_seen = 0
+        self.total_flush = 0.0
+        self.max_flush = 0.0
+        self.total_wait = 0.0
+
+    def start(self) -> None:
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name="group-commit", daemon=True
+                )
+                self.thread.start()
+
+    def shutdown(self) -> None:
+        with self.lock:
+            thread, self.thread = self.thread, None
+
+        if thread is not None:
+            # expenses queued before the stop marker are still committed
+            self.queue.put(STOP)
+            thread.join()
+
+    async def create(self, dto: ExpenseCreateDTO, current_user: Principal) -> Expense:
+        self.start()
+
+        future: Future = Future()
+        self.queue.put((dto, current_user, future, time.perf_counter()))
+        return await asyncio.wrap_future(future)
+
+    def collect(self) -> tuple[list, bool]:
+        """Block for the first queued expense, then gather more until full or due."""
+        first = self.queue.get()
+        if first is STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_delay
+
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is STOP:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def run(self) -> None:
+        while True:
+            batch, stopping = self.collect()
+            if batch:
+                self.write(batch)
+            if stopping:
+                return
+
+    def write(self, batch: list) -> None:
+        """Commit a batch per engine.
+
+        No error may escape, or the thread and all waiting callers would hang.
+        """
+        try:
+            groups: dict[Engine, list] = {}
+            for item in batch:
+                groups.setdefault(self.bind_for(item[1].id), []).append(item)
+        except Exception as exc:
+            self.fail(batch, exc)
+            return
+
+        for bind, items in groups.items():
+            try:
+                self.commit_retrying(bind, items)
+            except Exception as exc:
+                self.fail(items, exc)
+
+    def commit_retrying(self, bind: Engine, items: list) -> None:
+        """Commit a group, retrying on SQLite locks like write_transaction does."""
+        lock_wait = 0.0
+
+        for attempt in range(1, self.attempts + 1):
+            started = time.perf_counter()
+            try:
+                self.commit(bind, items)
+            except SQLAlchemyError as exc:
+                lock_wait += time.perf_counter() - started
+                if not is_lock_error(exc) or attempt == self.attempts:
+                    write_stats.record(attempt - 1, lock_wait, failed=True)
+                    raise
+
+                delay = backoff_delay(attempt)
+                lock_wait += delay
+                time.sleep(delay)
+                continue
+
+            write_stats.record(attempt - 1, lock_wait, failed=False)
+            return
+
+    @staticmethod
+    def fail(items: list, exc: Exception) -> None:
+        error = DatabaseException() if isinstance(exc, SQLAlchemyError) else exc
+        for _, _, future, _ in items:
+            if not future.done():
+                future.set_exception(error)
+
+    def commit(self, bind: Engine, items: list) -> None:
+        started = time.perf_counter()
+
+        with Session(bind=bind, expire_on_commit=False) as db:
+            begin_write(db)
+
+            # users moved to another shard while this batch waited for the lock
+            # of their old one are routed again once this batch is committed
+            moved = [
+                item for item in items
+                if self.bind_for(item[1].id, fresh=True) is not bind
+            ]
+            items = [item for item in items if item not in moved]
+
+            category_ids = {dto.category_id for dto, _, _, _ in items}
+            categories = {
+                category.id: category
+                for category in db.scalars(
+                    select(Category).where(Category.id.in_(category_ids))
+                )
+            }
+
+            pending = []
+            rejected = []
+            for dto, current_user, future, queued in items:
+                category = categories.get(dto.category_id)
+                if category is None:
+                    rejected.append(future)
+                    continue
+
+                expense = new_expense(dto, category, current_user)
+                db.add(expense)
+                pending.append((expense, current_user, future, queued))
+
+            db.commit()
+
+        finished = time.perf_counter()
+
+        # expenses rejected for an unknown category are not counted
+        with self.lock:
+            self.batches += 1
+            self.expenses += len(pending)
+            self.max_batch_seen = max(self.max_batch_seen, len(pending))
+            self.total_flush += finished - started
+            self.max_flush = max(self.max_flush, finished - started)
+            self.total_wait += sum(started - queued for _, _, _, queued in pending)
+
+        # futures are only resolved once the commit succeeded, a locked
+        # database retries the whole group
+        for future in rejected:
+            future.set_exception(CategoryNotFoundException())
+        for expense, current_user, future, _ in pending:
+            read_your_writes.mark(current_user.id)
+            future.set_result(expense)
+
+        if moved:
+            self.write(moved)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "queued": self.queue.qsize(),
+                "batches": self.batches,
+                "expenses": self.expenses,
+                "average_batch_size": (
+                    self.expenses / self.batches if self.batches else 0.0
+                ),
+                "max_batch_size": self.max_batch_seen,
+                "average_flush_ms": (
+                    self.total_flush / self.batches * 1000 if self.batches else 0.0
+                ),
+                "max_flush_ms": self.max_flush * 1000,
+                "average_queue_wait_ms": (
+                    self.total_wait / self.expenses * 1000 if self.expenses else 0.0
+                ),
+            }
+
+
+group_commit = GroupCommitWriter()
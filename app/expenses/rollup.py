@@ -0,0 +1,281 @@
+# standard library
+from datetime import datetime
+
+# third party
+from sqlalchemy import delete, event, func, inspect, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+# local
+from app.expenses.dates import date_part, in_bucket
+from app.models.models import Expense, MonthlyCategoryTotal
+
+
+rollup = MonthlyCategoryTotal.__table__
+
+
+def rollup_filter(user_id: int, year: int, month: int, category_id: int) -> list:
+    return [
+        rollup.c.user_id == user_id,
+        rollup.c.year == year,
+        rollup.c.month == month,
+        rollup.c.category_id == category_id,
+    ]
+
+
+def add_totals_to_rollup(
+        connection: Connection,
+        user_id: int,
+        year: int,
+        month: int,
+        category_id: int,
+        total: int,
+        count: int,
+        max_price: int
+):
+    """Merge pre-aggregated totals into a monthly bucket, creating it if needed."""
+    if connection.dialect.name == "postgresql":
+        upsert, greatest = postgresql_insert, func.greatest
+    else:
+        # two-argument max() is SQLite's scalar maximum
+        upsert, greatest = sqlite_insert, func.max
+
+    stmt = upsert(rollup).values(
+        user_id=user_id,
+        year=year,
+        month=month,
+        category_id=category_id,
+        total=total,
+        count=count,
+        max=max_price
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            rollup.c.user_id,
+            rollup.c.year,
+            rollup.c.month,
+            rollup.c.category_id,
+        ],
+        set_={
+            "total": rollup.c.total + stmt.excluded.total,
+            "count": rollup.c.count + stmt.excluded.count,
+            "max": greatest(rollup.c.max, stmt.excluded.max),
+        },
+    )
+    connection.execute(stmt)
+
+
+def add_to_rollup(
+        connection: Connection,
+        user_id: int,
+        created_at: datetime,
+        category_id: int,
+        price: int
+):
+    """Add a single expense to its monthly bucket."""
+    year, month = created_at.year, created_at.month
+    add_totals_to_rollup(connection, user_id, year, month, category_id, price, 1, price)
+
+
+def add_rows_to_rollup(connection: Connection, rows: list[dict]):
+    """Add expense rows inserted without the ORM (bulk inserts) to the rollup.
+
+    One upsert is issued per bucket.
+    """
+    buckets = {}
+    for row in rows:
+        created_at = row["created_at"]
+        key = (row["user_id"], created_at.year, created_at.month, row["category_id"])
+        total, count, max_price = buckets.get(key, (0, 0, row["price"]))
+        buckets[key] = (total + row["price"], count + 1, max(max_price, row["price"]))
+
+    for (user_id, year, month, category_id), totals in buckets.items():
+        add_totals_to_rollup(connection, user_id, year, month, category_id, *totals)
+
+
+def remove_from_rollup(
+    connection: Connection,
+    user_id: int,
+    created_at: datetime,
+    category_id: int,
+    price: int,
+):
+    """Remove a single expense from its monthly bucket.
+
+    The bucket is dropped once it is empty. When the removed expense held the
+    bucket maximum, the maximum is recomputed from the remaining raw rows.
+    """
+    conditions = rollup_filter(user_id, created_at.year, created_at.month, category_id)
+
+    connection.execute(
+        update(rollup)
+        .where(*conditions)
+        .values(total=rollup.c.total - price, count=rollup.c.count - 1)
+    )
+
+    row = connection.execute(
+        select(rollup.c.count, rollup.c.max).where(*conditions)
+    ).first()
+    if row is None:
+        return
+
+    count, current_max = row
+
+    if count <= 0:
+        connection.execute(delete(rollup).where(*conditions))
+    elif price >= current_max:
+        new_max = connection.execute(
+            select(func.max(Expense.price)).where(
+                Expense.user_id == user_id,
+                Expense.category_id == category_id,
+                in_bucket(Expense.created_at, "month", created_at)
+            )
+        ).scalar()
+        connection.execute(update(rollup).where(*conditions).values(max=new_max or 0))
+
+
+def committed_value(target: Expense, name: str):
+    """Return the value an attribute had before the current flush."""
+    history = inspect(target).attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, name)
+
+
+def committed_category_id(target: Expense):
+    # assigning expense.category only records history on the relationship,
+    # the foreign key column is synchronized silently during the flush
+    history = inspect(target).attrs.category.history
+    if history.deleted and history.deleted[0] is not None:
+        return history.deleted[0].id
+    return committed_value(target, "category_id")
+
+
+def expense_created_at(connection: Connection, target: Expense) -> datetime:
+    # created_at is a SQL default; fetch it when the INSERT did not return it
+    if "created_at" in inspect(target).unloaded:
+        return connection.execute(
+            select(Expense.created_at).where(Expense.id == target.id)
+        ).scalar_one()
+    return target.created_at
+
+
+@event.listens_for(Expense, "after_insert")
+def expense_inserted(mapper, connection: Connection, target: Expense):
+    add_to_rollup(
+        connection,
+        target.user_id,
+        expense_created_at(connection, target),
+        target.category_id,
+        target.price,
+    )
+
+
+@event.listens_for(Expense, "after_update")
+def expense_updated(mapper, connection: Connection, target: Expense):
+    old = (
+        committed_value(target, "user_id"),
+        committed_value(target, "created_at"),
+        committed_category_id(target),
+        committed_value(target, "price"),
+    )
+    new = (target.user_id, target.created_at, target.category_id, target.price)
+
+    if old == new:
+        return
+
+    remove_from_rollup(connection, *old)
+    add_to_rollup(connection, *new)
+
+
+@event.listens_for(Expense, "after_delete")
+def expense_deleted(mapper, connection: Connection, target: Expense):
+    remove_from_rollup(
+        connection,
+        committed_value(target, "user_id"),
+        committed_value(target, "created_at"),
+        committed_category_id(target),
+        committed_value(target, "price"),
+    )
+
+
+def aggregated_expenses(user_id: int | None = None):
+    """Aggregate raw expenses into the same shape as the rollup table."""
+    year = date_part(Expense.created_at, "year")
+    month = date_part(Expense.created_at, "month")
+
+    query = (
+        select(
+            Expense.user_id,
+            year,
+            month,
+            Expense.category_id,
+            func.sum(Expense.price),
+            func.count(Expense.id),
+            func.max(Expense.price)
+        )
+        .group_by(Expense.user_id, year, month, Expense.category_id)
+    )
+
+    if user_id is not None:
+        query = query.where(Expense.user_id == user_id)
+
+    return query
+
+
+def rebuild_rollup(db: Session, user_id: int | None = None) -> int:
+    """Recompute the rollup table from raw expenses, for one user or everybody.
+
+    Returns the number of buckets written. The caller is responsible for committing.
+    """
+    clear = delete(rollup)
+    if user_id is not None:
+        clear = clear.where(rollup.c.user_id == user_id)
+    db.execute(clear)
+
+    result = db.execute(
+        insert(rollup).from_select(
+            ["user_id", "year", "month", "category_id", "total", "count", "max"],
+            aggregated_expenses(user_id)
+        )
+    )
+
+    return result.rowcount
+
+
+def check_rollup(db: Session, user_id: int | None = None) -> list[dict]:
+    """Compare the rollup table with raw expenses and return the mismatching buckets."""
+    expected = {
+        tuple(row[:4]): tuple(row[4:])
+        for row in db.execute(aggregated_expenses(user_id))
+    }
+
+    query = select(
+        rollup.c.user_id,
+        rollup.c.year,
+        rollup.c.month,
+        rollup.c.category_id,
+        rollup.c.total,
+        rollup.c.count,
+        rollup.c.max
+    )
+    if user_id is not None:
+        query = query.where(rollup.c.user_id == user_id)
+
+    actual = {tuple(row[:4]): tuple(row[4:]) for row in db.execute(query)}
+
+    mismatches = []
+    for key in sorted(expected.keys() | actual.keys()):
+        if expected.get(key) != actual.get(key):
+            mismatches.append({
+                "user_id": key[0],
+                "year": key[1],
+                "month": key[2],
+                "category_id": key[3],
+                "expected": expected.get(key),
+                "actual": actual.get(key),
+            })
+
+    return mismatches
@@ -0,0 +1,83 @@
+# standard library
+import re
+
+# third party
+from sqlalchemy import DDL, and_, column, event, false, table
+from sqlalchemy.sql.elements import ColumnElement
+
+# local
+from app.models.models import Expense
+
+
+# external content FTS5 index over expenses.name: the names are stored once,
+# in expenses, and the triggers keep the index in sync with every write
+EXPENSE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5("
+    "name, content='expenses', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_insert "
+    "AFTER INSERT ON expenses BEGIN "
+    "INSERT INTO expenses_fts (rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_delete "
+    "AFTER DELETE ON expenses BEGIN "
+    "INSERT INTO expenses_fts (expenses_fts, rowid, name) "
+    "VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_fts_update "
+    "AFTER UPDATE OF name ON expenses BEGIN "
+    "INSERT INTO expenses_fts (expenses_fts, rowid, name) "
+    "VALUES ('delete', old.id, old.name); "
+    "INSERT INTO expenses_fts (rowid, name) VALUES (new.id, new.name); END",
+)
+
+# FTS5 also creates expenses_fts_data, _idx, _docsize and _config
+EXPENSE_SEARCH_TABLES = (
+    "expenses_fts",
+    "expenses_fts_data",
+    "expenses_fts_idx",
+    "expenses_fts_docsize",
+    "expenses_fts_config",
+)
+
+expenses_fts = table(
+    "expenses_fts", column("rowid"), column("rank"), column("expenses_fts")
+)
+
+# the alembic migration creates the index for existing databases; this
+# covers metadata.create_all, used by the tests and new shard files
+for statement in EXPENSE_SEARCH_DDL:
+    event.listen(
+        Expense.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+# the triggers go away with the table, the index would otherwise outlive it
+event.listen(
+    Expense.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS expenses_fts").execute_if(dialect="sqlite"),
+)
+
+
+def create_expense_search(conn) -> None:
+    """Create the search index and its triggers on a SQLite database with expenses."""
+    for statement in EXPENSE_SEARCH_DDL:
+        conn.exec_driver_sql(statement)
+
+
+def search_terms(q: str) -> list[str]:
+    """Split a search string into words, dropping FTS5 operators and punctuation."""
+    return re.findall(r"\w+", q)
+
+
+def fts_query(terms: list[str]) -> str:
+    """Build an FTS5 query matching names that contain a word starting with every term.
+
+    Every term is quoted, so user input never reaches FTS5 as syntax.
+    """
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def like_filter(terms: list[str]) -> ColumnElement:
+    """Search without FTS5 (e.g. on PostgreSQL): a case-insensitive match per term."""
+    if not terms:
+        return false()
+    return and_(*(Expense.name.ilike(f"%{term}%") for term in terms))
+
@@ -0,0 +1,96 @@
+# standard library
+import io
+import queue
+import threading
+from collections.abc import Callable, Iterator
+
+
+# size of the chunks handed to the response and how many may wait unsent
+CHUNK_SIZE = 64 * 1024
+MAX_PENDING_CHUNKS = 8
+
+
+class StreamCancelled(Exception):
+    """Raised inside the producer once the consumer stopped reading."""
+
+
+class QueueWriter(io.RawIOBase):
+    """Write-only, non-seekable file handing fixed-size chunks to a bounded queue."""
+
+    def __init__(self, chunks: queue.Queue, cancelled: threading.Event):
+        super().__init__()
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.buffer += data
+        if len(self.buffer) >= CHUNK_SIZE:
+            self.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        if self.buffer:
+            put(self.chunks, self.cancelled, bytes(self.buffer))
+            self.buffer.clear()
+
+
+DONE = object()
+
+
+def put(chunks: queue.Queue, cancelled: threading.Event, item) -> None:
+    # block while the consumer is slow, but give up once it has gone away
+    while True:
+        if cancelled.is_set():
+            raise StreamCancelled()
+        try:
+            chunks.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def stream_from_thread(produce: Callable[[io.RawIOBase], None]) -> Iterator[bytes]:
+    """Run ``produce(writer)`` in a background thread, yielding its output as it comes.
+
+    The queue between the two sides is bounded, so memory stays flat no matter
+    how much the producer writes. Exceptions raised by the producer are
+    re-raised in the consumer.
+    """
+    chunks: queue.Queue = queue.Queue(maxsize=MAX_PENDING_CHUNKS)
+    cancelled = threading.Event()
+    writer = QueueWriter(chunks, cancelled)
+
+    def run():
+        try:
+            produce(writer)
+            writer.flush()
+        except StreamCancelled:
+            return
+        except Exception as exc:
+            try:
+                put(chunks, cancelled, exc)
+            except StreamCancelled:
+                return
+        try:
+            put(chunks, cancelled, DONE)
+        except StreamCancelled:
+            return
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = chunks.get()
+            if item is DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
+        thread.join()
@@ -0,0 +1,74 @@
+# standard library
+import hashlib
+
+# third party
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+# local
+from app.expenses.rollup import committed_value
+from app.models.models import Expense, UserDataVersion
+
+
+versions = UserDataVersion.__table__
+
+
+def bump_data_versions(connection: Connection, user_ids) -> None:
+    """Increment the data version of every given user, creating missing counters."""
+    postgresql = connection.dialect.name == "postgresql"
+    upsert = postgresql_insert if postgresql else sqlite_insert
+
+    for user_id in sorted(set(user_ids)):
+        stmt = upsert(versions).values(user_id=user_id, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[versions.c.user_id],
+            set_={"version": versions.c.version + 1}
+        )
+        connection.execute(stmt)
+
+
+def changed_users(session: Session) -> set[int]:
+    """Users whose expenses are inserted, changed or deleted by the pending flush."""
+    user_ids = set()
+
+    for expense in session.new:
+        if isinstance(expense, Expense):
+            user_ids.add(expense.user_id)
+
+    for expense in session.deleted:
+        if isinstance(expense, Expense):
+            user_ids.add(committed_value(expense, "user_id"))
+
+    for expense in session.dirty:
+        if isinstance(expense, Expense) and session.is_modified(expense):
+            # an expense moved to another user changes both listings
+            user_ids.update((committed_value(expense, "user_id"), expense.user_id))
+
+    return user_ids
+
+
+@event.listens_for(Session, "after_flush")
+def expenses_flushed(session: Session, flush_context):
+    # one bump per user and flush, in the transaction that wrote the expenses
+    user_ids = changed_users(session)
+    if user_ids:
+        bind_arguments = {"mapper": UserDataVersion.__mapper__}
+        bump_data_versions(session.connection(bind_arguments=bind_arguments), user_ids)
+
+
+async def data_version(db: AsyncSession, user_id: int) -> int:
+    """Current data version of a user; 0 until their expenses first change."""
+    version = await db.scalar(
+        select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+    )
+    return version or 0
+
+
+def data_etag(user_id: int, version: int, *parts) -> str:
+    """Weak ETag of a response, derived only from the data version and request."""
+    digest = hashlib.sha256(repr((user_id, version, parts)).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
@@ -10,7 +10,16 @@ from fastapi.responses import Response
 # local
 from app.api.router import api_router
 from app.core.handlers import register_exception_handlers
-from app.db.session import engine
+from app.core.password_hasher import password_hasher
+from app.db.session import (
+    async_engine,
+    async_read_engine,
+    engine,
+    read_engine,
+    shard_set,
+)
+from app.expenses.charts import chart_renderer
+from app.expenses.group_commit import group_commit
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -20,9 +29,20 @@ load_dotenv(BASE_DIR / ".env")
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     print("Starting app ...")
+    chart_renderer.start()
     yield
+    print("Stopping chart renderer ...")
+    chart_renderer.shutdown()
+    password_hasher.shutdown()
+    print("Flushing queued expenses ...")
+    group_commit.shutdown()
     print("Closing database connections ...")
     engine.dispose()
+    read_engine.dispose()
+    await async_engine.dispose()
+    await async_read_engine.dispose()
+    shard_set.dispose()
+    await shard_set.dispose_async()
 
 
 app = FastAPI(
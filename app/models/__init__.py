@@ -1,2 +1,9 @@
-from .models import Base, User, Expense, Category
-
+from .models import (
+    Base,
+    User,
+    Expense,
+    Category,
+    MonthlyCategoryTotal,
+    UserDataVersion,
+    UserShard,
+)
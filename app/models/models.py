@@ -2,7 +2,7 @@
 from enum import Enum
 
 # third party
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy import Enum as SqlEnum
 from sqlalchemy.orm import declarative_base, relationship
 
@@ -34,6 +34,40 @@ class Expense(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     user = relationship("User", back_populates="expenses")
 
+    # every query is scoped to a single user, so user_id leads each index
+    __table_args__ = (
+        Index("ix_expenses_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index(
+            "ix_expenses_user_id_category_id_created_at",
+            "user_id",
+            "category_id",
+            "created_at",
+        ),
+        Index("ix_expenses_user_id_price", "user_id", "price"),
+    )
+
+
+class MonthlyCategoryTotal(Base):
+    """Expense aggregates per user, month and category, kept in sync on every write."""
+    __tablename__ = "monthly_category_totals"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+
+    total = Column(Integer, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+    max = Column(Integer, nullable=False, default=0)
+
+
+class UserDataVersion(Base):
+    """Counter bumped whenever any expense of a user changes, used for ETags."""
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
 
 class UserRole(str, Enum):
     USER = "user"
@@ -47,6 +81,15 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     role = Column(SqlEnum(UserRole), default=UserRole.USER, nullable=False)
+    # bumped to revoke every token issued before, see app.core.token_versions
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
 
     expenses = relationship("Expense", back_populates="user")
 
+
+class UserShard(Base):
+    """Shard of a user moved away from its hash placement, see app.db.shards."""
+    __tablename__ = "user_shards"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    shard = Column(Integer, nullable=False)
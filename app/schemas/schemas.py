@@ -1,6 +1,7 @@
 # standard library
 import re
 from datetime import datetime
+from typing import Annotated, Literal
 
 # third party
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
@@ -57,9 +58,66 @@ class ExpenseDTO(BaseModel):
 
 class PaginatedExpenseDTO(BaseModel):
     items: list[ExpenseDTO]
-    total: int
+    # None when the client asked for include_total=false
+    total: int | None
     limit: int
     offset: int
+    next_cursor: str | None = None
+    has_more: bool = False
+
+
+class BatchCreateOperationDTO(BaseModel):
+    op: Literal["create"]
+    data: ExpenseCreateDTO
+
+
+class BatchUpdateOperationDTO(BaseModel):
+    op: Literal["update"]
+    id: int
+    data: ExpenseUpdateDTO
+
+
+class BatchDeleteOperationDTO(BaseModel):
+    op: Literal["delete"]
+    id: int
+
+
+BatchOperationDTO = Annotated[
+    BatchCreateOperationDTO | BatchUpdateOperationDTO | BatchDeleteOperationDTO,
+    Field(discriminator="op")
+]
+
+
+class BatchRequestDTO(BaseModel):
+    operations: list[BatchOperationDTO] = Field(min_length=1, max_length=100)
+
+
+class BatchResultDTO(BaseModel):
+    index: int
+    op: str
+    status: int
+    expense: ExpenseDTO | None = None
+    error: str | None = None
+
+
+class BatchResponseDTO(BaseModel):
+    results: list[BatchResultDTO]
+
+
+class ErrorDTO(BaseModel):
+    message: str
+    field: str | None = None
+
+
+class ImportRowErrorDTO(BaseModel):
+    row: int
+    errors: list[ErrorDTO]
+
+
+class ImportResultDTO(BaseModel):
+    imported: int
+    failed: int
+    errors: list[ImportRowErrorDTO]
 
 
 class UserCreate(BaseModel):
@@ -1,33 +1,56 @@
 # third party
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # local
 from app.core.exception import UserAlreadyExistsException
-from app.core.security import hash_password
+from app.db.transactions import write_transaction
 from app.models.models import User
 from app.schemas.schemas import UserCreate
 
 
-def create_user(db: Session, user: UserCreate) -> User:
-    existing_user = db.query(User).filter(User.email == user.email).first()
+async def create_user(db: AsyncSession, user: UserCreate, hashed_password: str) -> User:
 
-    if existing_user:
-        raise UserAlreadyExistsException()
+    async def work():
+        existing_user = await get_user_by_email(db, user.email)
 
-    hashed_pw = hash_password(user.password)
+        if existing_user:
+            raise UserAlreadyExistsException()
 
-    db_user = User(
-        email=user.email,
-        hashed_password=hashed_pw
-    )
+        db_user = User(
+            email=user.email,
+            hashed_password=hashed_password
+        )
 
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+        db.add(db_user)
+        return db_user
+
+    db_user = await write_transaction(db, work)
+    await db.refresh(db_user)
 
     return db_user
 
 
-def get_user_by_email(db: Session, email: str) -> User | None:
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
+    return await db.scalar(select(User).filter(User.email == email))
+
+
+async def update_password_hash(
+    db: AsyncSession, user: User, hashed_password: str
+) -> None:
+
+    async def work():
+        db_user = await db.get(User, user.id)
+        db_user.hashed_password = hashed_password
+
+    await write_transaction(db, work)
+
+
+async def revoke_tokens(db: AsyncSession, user_id: int) -> None:
+
+    async def work():
+        user = await db.get(User, user_id)
+        if user is not None:
+            user.token_version += 1
 
+    await write_transaction(db, work)
@@ -0,0 +1,145 @@
+# standard library
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# third party
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import joinedload
+
+# local
+from app.core.security import Principal
+from app.db.session import create_app_engine, create_async_app_engine
+from app.expenses.crud import get_all_expenses
+from app.models.models import Base, Category, Expense, User, UserRole
+from app.schemas.schemas import ExpenseDTO, PaginatedExpenseDTO
+
+
+LIST_ARGS = dict(
+    offset=0, sort_by="created_at", order="desc", min_price=None, max_price=None,
+    start_date=None, end_date=None, category_id=None, category_name=None
+)
+
+
+def populate(path: Path, rows: int) -> None:
+    engine = create_app_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    start = datetime(2024, 1, 1)
+
+    with engine.begin() as conn:
+        conn.execute(
+            Category.__table__.insert(),
+            [{"id": i, "name": f"Category {i}"} for i in range(1, 11)]
+        )
+        conn.execute(
+            User.__table__.insert(),
+            [
+                {
+                    "id": 1,
+                    "email": "user@example.com",
+                    "hashed_password": "x",
+                    "role": "USER",
+                }
+            ]
+        )
+        conn.execute(
+            Expense.__table__.insert(),
+            [
+                {
+                    "name": f"expense {i}",
+                    "price": random.randint(1, 500),
+                    "category_id": random.randint(1, 10),
+                    "created_at": start + timedelta(
+                        seconds=random.randrange(365 * 86400),
+                        microseconds=random.randrange(10 ** 6)
+                    ),
+                    "user_id": 1,
+                }
+                for i in range(rows)
+            ]
+        )
+
+    engine.dispose()
+
+
+async def orm_page(db, current_user: Principal, limit: int) -> bytes:
+    """The previous list path: Expense instances validated through ExpenseDTO."""
+    query = (
+        select(Expense)
+        .options(joinedload(Expense.category))
+        .filter(Expense.user_id == current_user.id)
+        .order_by(Expense.created_at.desc(), Expense.id.desc())
+    )
+    count = select(func.count()).select_from(query.order_by(None).subquery())
+    total = await db.scalar(count)
+    items = (await db.scalars(query.limit(limit + 1))).all()
+
+    page = PaginatedExpenseDTO(
+        items=[ExpenseDTO.model_validate(expense) for expense in items[:limit]],
+        total=total, limit=limit, offset=0
+    )
+    return JSONResponse(page.model_dump(mode="json")).body
+
+
+async def projection_page(db, current_user: Principal, limit: int) -> bytes:
+    page = await get_all_expenses(db, current_user, limit=limit, **LIST_ARGS)
+    return JSONResponse(page).body
+
+
+async def measure(session_factory, render, limit: int, pages: int) -> float:
+    principal = Principal(id=1, role=UserRole.USER, token_version=0)
+
+    started = time.perf_counter()
+    for _ in range(pages):
+        async with session_factory() as db:
+            await render(db, principal, limit)
+    return (time.perf_counter() - started) / pages
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.sqlite"
+        populate(path, args.rows)
+
+        engine = create_async_app_engine(f"sqlite+aiosqlite:///{path}")
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+        # warm up the pool and the statement caches
+        await measure(session_factory, orm_page, args.limit, 20)
+        await measure(session_factory, projection_page, args.limit, 20)
+
+        orm = await measure(session_factory, orm_page, args.limit, args.pages)
+        projection = await measure(
+            session_factory, projection_page, args.limit, args.pages
+        )
+
+        await engine.dispose()
+
+    print(f"{args.rows} expenses, {args.limit} per page, {args.pages} pages")
+    print(f"orm + ExpenseDTO   {orm * 1000:7.2f} ms/page")
+    print(
+        f"column projection  {projection * 1000:7.2f} ms/page  "
+        f"({orm / projection:.1f}x)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare the ORM and column-projection expense list paths."
+    )
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# standard library
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# third party
+from sqlalchemy import func, select
+
+# local
+from app.db.session import create_app_engine
+from app.expenses.search import expenses_fts, fts_query, search_terms
+from app.models.models import Base, Category, Expense, User
+
+
+WORDS = (
+    "uber taxi rent groceries coffee lunch dinner netflix spotify gym fuel parking "
+    "train flight hotel insurance pharmacy books cinema concert gift electricity "
+    "water internet phone laundry haircut bakery market pizza sushi burger tea "
+    "snacks toys shoes jacket repair plumber garden pet vet"
+).split()
+MONTHS = (
+    "january february march april may june july august september october november "
+    "december"
+).split()
+
+
+def random_name() -> str:
+    words = random.sample(WORDS, random.randint(1, 3))
+    if random.random() < 0.3:
+        words.append(random.choice(MONTHS))
+    return " ".join(words)
+
+
+def populate(engine, rows: int, users: int, chunk_size: int = 50_000) -> None:
+    with engine.begin() as conn:
+        conn.execute(Category.__table__.insert(), [{"id": 1, "name": "Food"}])
+        conn.execute(
+            User.__table__.insert(),
+            [
+                {
+                    "id": i,
+                    "email": f"user{i}@example.com",
+                    "hashed_password": "x",
+                    "role": "USER",
+                }
+                for i in range(1, users + 1)
+            ],
+        )
+
+    start = datetime(2023, 1, 1)
+    span = int(timedelta(days=3 * 365).total_seconds())
+
+    for offset in range(0, rows, chunk_size):
+        batch = [
+            {
+                "name": random_name(),
+                "price": random.randint(1, 500),
+                "created_at": start + timedelta(seconds=random.randrange(span)),
+                "category_id": 1,
+                "user_id": random.randint(1, users),
+            }
+            for _ in range(min(chunk_size, rows - offset))
+        ]
+        # the insert trigger indexes every name as it is written
+        with engine.begin() as conn:
+            conn.execute(Expense.__table__.insert(), batch)
+
+
+def like_query(user_id: int, q: str, limit: int):
+    query = select(Expense.id).where(Expense.user_id == user_id)
+    for term in search_terms(q):
+        query = query.where(Expense.name.like(f"%{term}%"))
+    return query.order_by(Expense.created_at.desc(), Expense.id.desc()).limit(limit)
+
+
+def fts_search_query(user_id: int, q: str, limit: int, ranked: bool):
+    """The search of get_all_expenses: matching ids looked up once, or a join driven
+    by the index for ranking.
+    """
+    fts_match = expenses_fts.c.expenses_fts.match(fts_query(search_terms(q)))
+    query = select(Expense.id).where(Expense.user_id == user_id)
+    if ranked:
+        query = query.join(expenses_fts, expenses_fts.c.rowid == Expense.id)
+        query = query.where(fts_match)
+        return query.order_by(expenses_fts.c.rank, Expense.id.desc()).limit(limit)
+    query = query.where(Expense.id.in_(select(expenses_fts.c.rowid).where(fts_match)))
+    return query.order_by(Expense.created_at.desc(), Expense.id.desc()).limit(limit)
+
+
+def count_query(query):
+    return select(func.count()).select_from(query.order_by(None).limit(None).subquery())
+
+
+def measure(conn, query, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(query).all()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare LIKE and FTS5 search over expense names."
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_app_engine(f"sqlite:///{Path(tmp) / 'bench.sqlite'}")
+        Base.metadata.create_all(bind=engine)
+
+        started = time.perf_counter()
+        populate(engine, args.rows, args.users)
+        elapsed = time.perf_counter() - started
+        print(f"{args.rows} expenses for {args.users} users, indexed in {elapsed:.1f}s")
+        print(f"{'query':18} {'LIKE page':>10} {'FTS page':>10} {'FTS ranked':>11} "
+              f"{'LIKE count':>11} {'FTS count':>10}  (ms)")
+
+        with engine.connect() as conn:
+            for q in ("uber", "rent march", "pizza sushi", "netfl"):
+                like = like_query(1, q, args.limit)
+                fts = fts_search_query(1, q, args.limit, ranked=False)
+                ranked = fts_search_query(1, q, args.limit, ranked=True)
+                timings = (
+                    measure(conn, like, args.repeat),
+                    measure(conn, fts, args.repeat),
+                    measure(conn, ranked, args.repeat),
+                    measure(conn, count_query(like), args.repeat),
+                    measure(conn, count_query(fts), args.repeat),
+                )
+                print(f"{q:18} " + " ".join(f"{timing:10.2f}" for timing in timings))
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
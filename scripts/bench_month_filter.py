@@ -0,0 +1,114 @@
+# standard library
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# third party
+from sqlalchemy import create_engine, func, select
+
+# local
+from app.expenses.dates import month_range
+from app.models.models import Base, Category, Expense, User
+
+
+YEAR = 2025
+MONTH = 5
+
+
+def populate(engine, rows: int, users: int, chunk_size: int = 50_000) -> None:
+    with engine.begin() as conn:
+        conn.execute(Category.__table__.insert(), [{"id": 1, "name": "Food"}])
+        conn.execute(
+            User.__table__.insert(),
+            [
+                {
+                    "id": i,
+                    "email": f"user{i}@example.com",
+                    "hashed_password": "x",
+                    "role": "USER",
+                }
+                for i in range(1, users + 1)
+            ],
+        )
+
+    start = datetime(YEAR - 2, 1, 1)
+    span = int(timedelta(days=3 * 365).total_seconds())
+
+    for offset in range(0, rows, chunk_size):
+        batch = [
+            {
+                "name": "expense",
+                "price": random.randint(1, 500),
+                "created_at": start + timedelta(seconds=random.randrange(span)),
+                "category_id": 1,
+                "user_id": random.randint(1, users),
+            }
+            for _ in range(min(chunk_size, rows - offset))
+        ]
+        with engine.begin() as conn:
+            conn.execute(Expense.__table__.insert(), batch)
+
+
+def strftime_query(user_id: int):
+    return select(func.sum(Expense.price), func.count(Expense.id)).where(
+        func.strftime("%m", Expense.created_at) == f"{MONTH:02}",
+        func.strftime("%Y", Expense.created_at) == str(YEAR),
+        Expense.user_id == user_id
+    )
+
+
+def range_query(user_id: int):
+    start_dt, end_dt = month_range(YEAR, MONTH)
+    return select(func.sum(Expense.price), func.count(Expense.id)).where(
+        Expense.user_id == user_id,
+        Expense.created_at >= start_dt,
+        Expense.created_at < end_dt
+    )
+
+
+def measure(engine, build_query, user_ids: list[int]) -> tuple[float, list]:
+    results = []
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        for user_id in user_ids:
+            results.append(tuple(conn.execute(build_query(user_id)).one()))
+    return time.perf_counter() - started, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare strftime and date-range month filters."
+    )
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.sqlite'}")
+        Base.metadata.create_all(bind=engine)
+
+        print(f"Populating {args.rows:,} rows for {args.users:,} users ...")
+        populate(engine, args.rows, args.users)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+
+        user_ids = [random.randint(1, args.users) for _ in range(args.queries)]
+
+        strftime_time, strftime_results = measure(engine, strftime_query, user_ids)
+        range_time, range_results = measure(engine, range_query, user_ids)
+
+        assert strftime_results == range_results, "filters returned different results"
+
+        print(f"strftime filter:   {strftime_time / args.queries * 1000:8.2f} ms/query")
+        print(f"date range filter: {range_time / args.queries * 1000:8.2f} ms/query")
+        print(f"speedup:           {strftime_time / range_time:8.1f}x")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# standard library
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# third party
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+# local
+from app.db.session import create_app_engine
+from app.models.models import Base, Category, Expense, User
+
+
+def populate(engine, rows: int, users: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(Category.__table__.insert(), [{"id": 1, "name": "Food"}])
+        conn.execute(
+            User.__table__.insert(),
+            [
+                {
+                    "id": i,
+                    "email": f"user{i}@example.com",
+                    "hashed_password": "x",
+                    "role": "USER",
+                }
+                for i in range(1, users + 1)
+            ],
+        )
+        conn.execute(
+            Expense.__table__.insert(),
+            [{"name": "expense", "price": random.randint(1, 500), "category_id": 1,
+              "user_id": random.randint(1, users)} for _ in range(rows)]
+        )
+
+
+def reader(session_factory, users: int, stop: threading.Event, counts: dict) -> None:
+    while not stop.is_set():
+        with session_factory() as db:
+            try:
+                (
+                    db.query(Expense)
+                    .filter(Expense.user_id == random.randint(1, users))
+                    .order_by(Expense.created_at.desc(), Expense.id.desc())
+                    .limit(20)
+                    .all()
+                )
+                counts["reads"] += 1
+            except OperationalError:
+                counts["errors"] += 1
+
+
+def writer(session_factory, users: int, stop: threading.Event, counts: dict) -> None:
+    while not stop.is_set():
+        with session_factory() as db:
+            try:
+                expense = Expense(name="bench", price=random.randint(1, 500),
+                                  category_id=1, user_id=random.randint(1, users))
+                db.add(expense)
+                db.commit()
+                counts["writes"] += 1
+            except OperationalError:
+                db.rollback()
+                counts["errors"] += 1
+
+
+def run_profile(profile: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_app_engine(
+            f"sqlite:///{Path(tmp) / 'bench.sqlite'}", profile=profile
+        )
+        Base.metadata.create_all(bind=engine)
+        populate(engine, args.rows, args.users)
+
+        session_factory = sessionmaker(bind=engine)
+        stop = threading.Event()
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+
+        thread_args = (session_factory, args.users, stop, counts)
+        workers = [reader] * args.readers + [writer] * args.writers
+        threads = [threading.Thread(target=work, args=thread_args) for work in workers]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        engine.dispose()
+
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare read/write throughput of the SQLite tuning profiles."
+    )
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, "
+          f"{args.seconds:.0f}s per profile")
+
+    for profile in ("default", "tuned"):
+        counts = run_profile(profile, args)
+        print(
+            f"{profile:8} reads/s: {counts['reads'] / args.seconds:8.0f}  "
+            f"writes/s: {counts['writes'] / args.seconds:8.0f}  "
+            f"errors: {counts['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# standard library
+import argparse
+import sys
+
+# local
+from app.db.session import engine, shard_set
+from app.db.shards import move_user, rebalance, user_override, users_in_shard
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Move users between expense shards. Without arguments, moves every "
+                    "user found outside its placement, e.g. after changing SHARD_COUNT."
+    )
+    parser.add_argument("--user-id", type=int, default=None, help="move a single user")
+    parser.add_argument(
+        "--to", type=int, default=None, help="target shard for --user-id"
+    )
+    args = parser.parse_args()
+
+    if not shard_set.enabled:
+        sys.exit("Sharding is disabled, set SHARD_COUNT")
+
+    if args.user_id is not None:
+        if args.to is None:
+            sys.exit("--user-id requires --to")
+
+        sources = [
+            shard
+            for shard in shard_set.existing_shards()
+            if args.user_id in users_in_shard(shard_set, shard)
+        ]
+        if not sources:
+            sources = [
+                shard_set.shard_of(args.user_id, user_override(engine, args.user_id))
+            ]
+
+        for source in sources:
+            if source != args.to:
+                moved = move_user(shard_set, args.user_id, source, args.to)
+                print(f"user={args.user_id}: shard {source} -> {args.to}, "
+                      f"{moved} expenses")
+        return
+
+    moves = rebalance(shard_set, engine)
+    for user_id, source, target, moved in moves:
+        print(f"user={user_id}: shard {source} -> {target}, {moved} expenses")
+    print(f"{len(moves)} users moved")
+
+
+if __name__ == "__main__":
+    main()
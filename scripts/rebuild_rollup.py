@@ -0,0 +1,46 @@
+# standard library
+import argparse
+import sys
+
+# local
+from app.db.session import Session
+from app.expenses.rollup import check_rollup, rebuild_rollup
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild or verify the monthly_category_totals rollup table."
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="only compare the rollup with raw expenses"
+    )
+    parser.add_argument(
+        "--user-id", type=int, default=None, help="limit the operation to a single user"
+    )
+    args = parser.parse_args()
+
+    db = Session()
+
+    try:
+        if args.check:
+            mismatches = check_rollup(db, args.user_id)
+            for mismatch in mismatches:
+                print(
+                    f"user={mismatch['user_id']} "
+                    f"{mismatch['year']}-{mismatch['month']:02} "
+                    f"category={mismatch['category_id']}: "
+                    f"expected={mismatch['expected']} actual={mismatch['actual']}"
+                )
+            print(f"{len(mismatches)} mismatching buckets")
+            sys.exit(1 if mismatches else 0)
+
+        written = rebuild_rollup(db, args.user_id)
+        db.commit()
+        print(f"Rollup rebuilt: {written} buckets written")
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,8 @@ from datetime import datetime, timedelta
 # local
 from app.core.security import hash_password
 from app.db.session import Session
-from app.models.models import Category, Expense, User
+from app.expenses import rollup  # noqa: F401 - keeps monthly_category_totals in sync
+from app.models.models import Category, Expense, MonthlyCategoryTotal, User
 
 
 def get_or_create_category(db: Session, name: str) -> Category:
@@ -34,6 +35,7 @@ def random_date_in_month(year: int, month: int) -> datetime:
 
 def seed() -> None:
     db = Session()
+    db.query(MonthlyCategoryTotal).delete()
     db.query(Expense).delete()
     db.query(Category).delete()
     db.query(User).delete()
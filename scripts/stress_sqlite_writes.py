@@ -0,0 +1,138 @@
+# standard library
+import argparse
+import asyncio
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+# third party
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+# local
+from app.core.exception import DatabaseException
+from app.core.security import Principal
+from app.db.session import configure_sqlite, create_app_engine, sqlite_pragmas
+from app.db.transactions import write_stats
+from app.expenses.crud import create_expense, delete_expense, update_expense
+from app.models.models import Base, Category, User, UserRole
+from app.schemas.schemas import ExpenseCreateDTO, ExpenseUpdateDTO
+
+
+def populate(path: Path, users: int) -> None:
+    engine = create_app_engine(f"sqlite:///{path}", profile="tuned")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            Category.__table__.insert(),
+            [{"id": 1, "name": "Food"}, {"id": 2, "name": "Travel"}]
+        )
+        conn.execute(
+            User.__table__.insert(),
+            [
+                {
+                    "id": i,
+                    "email": f"user{i}@example.com",
+                    "hashed_password": "x",
+                    "role": "USER",
+                }
+                for i in range(1, users + 1)
+            ]
+        )
+    engine.dispose()
+
+
+async def write_many(
+        path: Path, worker: int, writes: int, users: int, busy_timeout_ms: int
+) -> dict:
+    # a busy timeout well below the default makes writers give up on the lock, so
+    # the retries get exercised
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    pragmas = {**sqlite_pragmas("tuned"), "busy_timeout": busy_timeout_ms}
+    configure_sqlite(engine.sync_engine, pragmas)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    principal = Principal(id=worker % users + 1, role=UserRole.USER, token_version=0)
+    moved = ExpenseUpdateDTO(category_id=2)
+    counts = {"writes": 0, "failed": 0}
+
+    for i in range(writes):
+        async with session_factory() as db:
+            try:
+                # create, update and delete every third expense, all of them
+                # touching the rollup
+                dto = ExpenseCreateDTO(name="stress", category_id=1, price=i + 1)
+                expense = await create_expense(db, dto, principal)
+                counts["writes"] += 1
+                if i % 3 == 0:
+                    await update_expense(db, expense.id, moved, principal)
+                    await delete_expense(db, expense.id, principal)
+                    counts["writes"] += 2
+            except DatabaseException:
+                counts["failed"] += 1
+
+    await engine.dispose()
+    return {**counts, "retries": write_stats.retries}
+
+
+def worker_main(args: tuple) -> dict:
+    return asyncio.run(write_many(*args))
+
+
+def run_stress(
+        path: Path,
+        processes: int,
+        writes: int,
+        users: int = 10,
+        busy_timeout_ms: int = 200
+) -> dict:
+    """Hammer one SQLite file with expense writes from several processes, summed up."""
+    populate(path, users)
+
+    started = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        jobs = [
+            (path, worker, writes, users, busy_timeout_ms)
+            for worker in range(processes)
+        ]
+        results = pool.map(worker_main, jobs)
+
+    totals = {
+        key: sum(result[key] for result in results)
+        for key in ("writes", "failed", "retries")
+    }
+    totals["seconds"] = time.perf_counter() - started
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Write expenses to one SQLite file from several processes."
+    )
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument(
+        "--writes", type=int, default=200, help="expenses created per process"
+    )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--busy-timeout-ms", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        totals = run_stress(
+            Path(tmp) / "stress.sqlite",
+            args.processes,
+            args.writes,
+            args.users,
+            args.busy_timeout_ms
+        )
+
+    print(
+        f"{args.processes} processes  writes: {totals['writes']}  "
+        f"failed: {totals['failed']}  retries: {totals['retries']}  "
+        f"writes/s: {totals['writes'] / totals['seconds']:.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
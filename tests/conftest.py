@@ -1,36 +1,88 @@
 # standard library
+import asyncio
 import os
 import sys
+import tempfile
 from datetime import datetime
 
 # add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+# render charts in the request threadpool instead of spawning worker processes
+os.environ.setdefault("CHART_POOL_WORKERS", "0")
+# minimum bcrypt cost keeps password hashing cheap in tests
+os.environ.setdefault("PASSWORD_HASH_PROFILE", "fast")
+
 # third party
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 # local
 from app.main import app
-from app.db.session import get_session
+from app.core.rate_limit import rate_limiter
+from app.core.token_versions import token_versions
+from app.db.routing import RoutingSession, read_your_writes
+from app.core.user_cache import user_cache
+from app.db.session import (
+    async_database_url,
+    configure_sqlite,
+    create_app_engine,
+    get_async_session,
+    get_session,
+    is_sqlite,
+    sqlite_pragmas,
+)
 from app.models.models import Base, Category, Expense
 
 
-engine = create_engine(
-    "sqlite:///:memory:",
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+# the sync fixtures and the async endpoints need to see the same database,
+# so it lives in a temporary file instead of memory; set TEST_DATABASE_URL to
+# run the suite against another database, e.g. a local PostgreSQL
+TEST_DATABASE_URL = os.getenv(
+    "TEST_DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.sqlite')}"
 )
 
+engine = create_app_engine(TEST_DATABASE_URL)
+
+# every TestClient runs its own event loop, so async connections are not pooled;
+# the replica is the same database behind its own engine, like READ_DATABASE_URL
+# pointing at DATABASE_URL, so tests can tell where a statement was routed
+TEST_ASYNC_DATABASE_URL = async_database_url(TEST_DATABASE_URL)
+async_engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+async_read_engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+if is_sqlite(TEST_DATABASE_URL):
+    configure_sqlite(async_engine.sync_engine, sqlite_pragmas())
+    configure_sqlite(async_read_engine.sync_engine, sqlite_pragmas())
+
 TestingSessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine
 )
 
+# the production session class, so the endpoints are tested with its routing
+TestingAsyncSessionLocal = async_sessionmaker(
+    sync_session_class=RoutingSession,
+    primary=async_engine.sync_engine,
+    replica=async_read_engine.sync_engine,
+    expire_on_commit=False
+)
+
+
+def pytest_collection_modifyitems(config, items):
+    if is_sqlite(TEST_DATABASE_URL):
+        return
+
+    skip = pytest.mark.skip(reason="checks SQLite specific behaviour")
+    for item in items:
+        if "sqlite_only" in item.keywords:
+            item.add_marker(skip)
+
 
 @pytest.fixture
 def db():
@@ -50,12 +102,55 @@ def client(db):
     def override_get_db():
         yield db
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
+
     app.dependency_overrides[get_session] = override_get_db
+    app.dependency_overrides[get_async_session] = override_get_async_db
+    user_cache.clear()
+    token_versions.clear()
+    rate_limiter.clear()
+    read_your_writes.clear()
 
     with TestClient(app) as c:
         yield c
 
     app.dependency_overrides.clear()
+    user_cache.clear()
+    token_versions.clear()
+    rate_limiter.clear()
+    read_your_writes.clear()
+
+
+@pytest.fixture
+def replica_statements():
+    """Statements the async endpoints send to the replica engine."""
+    statements = []
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        statements.append(statement)
+
+    replica = async_read_engine.sync_engine
+    event.listen(replica, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(replica, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def run_async(db):
+    """Call an async crud function with a fresh AsyncSession on the test database."""
+
+    def run(func, *args, **kwargs):
+        async def main():
+            async with TestingAsyncSessionLocal() as async_db:
+                return await func(async_db, *args, **kwargs)
+
+        return asyncio.run(main())
+
+    return run
 
 
 @pytest.fixture
@@ -2,3 +2,24 @@ def test_api_docs(client):
     response = client.get("/api/v1/docs")
     assert response.status_code == 200
 
+
+# -----------------------
+# Async endpoints
+# -----------------------
+def test_database_endpoints_do_not_use_threadpool():
+    import inspect
+
+    from fastapi.routing import APIRoute
+
+    from app.main import app
+
+    # the streaming export keeps the sync session and runs in a worker thread
+    sync_paths = {"/api/v1/expenses/export/"}
+
+    for route in app.routes:
+        if (
+            isinstance(route, APIRoute)
+            and route.path.startswith("/api/v1")
+            and route.path not in sync_paths
+        ):
+            assert inspect.iscoroutinefunction(route.endpoint), route.path
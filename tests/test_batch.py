@@ -0,0 +1,136 @@
+# local
+from app.expenses.rollup import check_rollup
+from app.models.models import Expense
+
+
+# -----------------------
+# Authorization
+# -----------------------
+class TestBatchAuthorization:
+
+    def test_batch_without_token(self, client):
+        response = client.post(
+            "/api/v1/expenses/batch",
+            json={"operations": [{"op": "delete", "id": 1}]}
+        )
+
+        assert response.status_code == 403
+
+
+# -----------------------
+# Operations
+# -----------------------
+class TestBatchOperations:
+
+    def test_batch_mixed_operations(
+        self, client, auth_headers, db, test_expenses, test_category
+    ):
+        expense1, expense2 = test_expenses
+        coffee = {"name": "coffee", "category_id": test_category.id, "price": 10}
+
+        response = client.post(
+            "/api/v1/expenses/batch",
+            headers=auth_headers,
+            json={
+                "operations": [
+                    {"op": "create", "data": coffee},
+                    {"op": "update", "id": expense1.id, "data": {"price": 150}},
+                    {"op": "delete", "id": expense2.id},
+                ]
+            }
+        )
+
+        assert response.status_code == 200
+
+        results = response.json()["results"]
+        assert [result["status"] for result in results] == [201, 200, 204]
+        assert results[0]["expense"]["name"] == "coffee"
+        assert results[0]["expense"]["category"]["name"] == test_category.name
+        assert results[1]["expense"]["price"] == 150
+        assert results[2]["expense"] is None
+
+        names = {expense.name for expense in db.query(Expense).all()}
+        assert names == {"coffee", "fruits"}
+        assert check_rollup(db) == []
+
+    def test_batch_reports_failed_items(
+        self, client, auth_headers, db, test_expenses, test_category
+    ):
+        expense1, expense2 = test_expenses
+
+        response = client.post(
+            "/api/v1/expenses/batch",
+            headers=auth_headers,
+            json={
+                "operations": [
+                    {
+                        "op": "create",
+                        "data": {"name": "coffee", "category_id": 999, "price": 10}
+                    },
+                    {"op": "update", "id": 999, "data": {"price": 1}},
+                    {"op": "delete", "id": expense1.id},
+                    {"op": "delete", "id": expense1.id},
+                ]
+            }
+        )
+
+        assert response.status_code == 200
+
+        results = response.json()["results"]
+        assert [result["status"] for result in results] == [400, 404, 204, 404]
+        assert results[0]["error"] == "Category not found"
+        assert results[1]["error"] == "Expense not found"
+
+        assert db.query(Expense).count() == 1
+
+    def test_batch_cannot_touch_other_users_expenses(
+        self, client, auth_headers, db, test_category
+    ):
+        from app.models.models import User
+
+        other = User(email="other@example.com", hashed_password="x")
+        db.add(other)
+        db.commit()
+
+        expense = Expense(
+            name="secret", category_id=test_category.id, price=5, user_id=other.id
+        )
+        db.add(expense)
+        db.commit()
+
+        response = client.post(
+            "/api/v1/expenses/batch",
+            headers=auth_headers,
+            json={"operations": [{"op": "delete", "id": expense.id}]}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["results"][0]["status"] == 404
+        assert db.query(Expense).count() == 1
+
+
+# -----------------------
+# Validation
+# -----------------------
+class TestBatchValidation:
+
+    def test_batch_empty(self, client, auth_headers):
+        response = client.post(
+            "/api/v1/expenses/batch",
+            headers=auth_headers,
+            json={"operations": []}
+        )
+
+        assert response.status_code == 422
+
+    def test_batch_invalid_operation(self, client, auth_headers, test_category):
+        data = {"name": "x", "category_id": test_category.id, "price": -1}
+
+        response = client.post(
+            "/api/v1/expenses/batch",
+            headers=auth_headers,
+            json={"operations": [{"op": "create", "data": data}]}
+        )
+
+        assert response.status_code == 422
+        assert "errors" in response.json()
@@ -0,0 +1,172 @@
+# standard library
+import asyncio
+
+# third party
+import pytest
+
+# local
+from app.core.etag import etag_matches
+from app.expenses import charts
+from app.expenses.chart_cache import ChartCache, chart_cache, chart_key
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    calls = []
+    render = charts.render_pie_chart
+
+    def counting_render(*args):
+        calls.append(args)
+        return render(*args)
+
+    chart_cache.clear()
+    monkeypatch.setattr(charts, "render_pie_chart", counting_render)
+
+    yield calls
+
+    chart_cache.clear()
+
+
+# -----------------------
+# Keys
+# -----------------------
+class TestChartKey:
+
+    def test_same_data_same_key(self):
+        assert chart_key(["Food"], [10], 2025, 5) == chart_key(["Food"], [10], 2025, 5)
+
+    def test_changed_data_changes_key(self):
+        key = chart_key(["Food"], [10], 2025, 5)
+
+        assert chart_key(["Food"], [11], 2025, 5) != key
+        assert chart_key(["Rent"], [10], 2025, 5) != key
+        assert chart_key(["Food"], [10], 2025, 6) != key
+
+
+# -----------------------
+# Cache tiers
+# -----------------------
+class TestChartCacheTiers:
+
+    def test_memory_tier_evicts_least_recently_used(self):
+        cache = ChartCache(max_entries=2)
+
+        async def use():
+            await cache.put("a", b"1")
+            await cache.put("b", b"2")
+            await cache.get("a")
+            await cache.put("c", b"3")
+            return [await cache.get(key) for key in "abc"]
+
+        assert asyncio.run(use()) == [b"1", None, b"3"]
+
+    def test_disk_tier_survives_memory_eviction(self, tmp_path):
+        cache = ChartCache(max_entries=1, directory=tmp_path, max_bytes=1024)
+
+        async def use():
+            await cache.put("a", b"1")
+            await cache.put("b", b"2")
+            assert "a" not in cache.memory
+            return await cache.get("a")
+
+        assert asyncio.run(use()) == b"1"
+
+    def test_disk_tier_respects_size_cap(self, tmp_path):
+        cache = ChartCache(max_entries=1, directory=tmp_path, max_bytes=250)
+
+        async def use():
+            for key in "abcd":
+                await cache.put(key, b"x" * 100)
+
+        asyncio.run(use())
+
+        files = list(tmp_path.glob("*.png"))
+        assert sum(path.stat().st_size for path in files) <= 250
+        assert (tmp_path / "d.png").exists()
+        assert cache.disk_used == sum(path.stat().st_size for path in files)
+
+    def test_disk_errors_only_skip_the_disk_tier(self, tmp_path):
+        directory = tmp_path / "charts"
+        cache = ChartCache(max_entries=1, directory=directory, max_bytes=1024)
+        # the directory went away and something else took its place
+        directory.rmdir()
+        directory.write_bytes(b"")
+
+        async def use():
+            await cache.put("a", b"1")
+            await cache.put("b", b"2")
+            return await cache.get("a"), await cache.get("b")
+
+        assert asyncio.run(use()) == (None, b"2")
+
+
+# -----------------------
+# ETag
+# -----------------------
+class TestEtagMatches:
+
+    @pytest.mark.parametrize(
+        "header,expected",
+        [
+            (None, False),
+            ('"abc"', True),
+            ('W/"abc"', True),
+            ('"x", "abc"', True),
+            ("*", True),
+            ('"other"', False),
+        ],
+    )
+    def test_etag_matches(self, header, expected):
+        assert etag_matches(header, '"abc"') is expected
+
+
+# -----------------------
+# Endpoint
+# -----------------------
+class TestVisualizationCache:
+
+    def test_repeated_request_is_served_from_cache(
+        self, client, auth_headers, test_expenses, year, month, render_calls
+    ):
+        url = f"/api/v1/expenses/visualization/{year}/{month}"
+
+        first = client.get(url, headers=auth_headers)
+        second = client.get(url, headers=auth_headers)
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assert len(render_calls) == 1
+
+    def test_if_none_match_returns_304(
+        self, client, auth_headers, test_expenses, year, month, render_calls
+    ):
+        url = f"/api/v1/expenses/visualization/{year}/{month}"
+
+        response = client.get(url, headers=auth_headers)
+        etag = response.headers["etag"]
+
+        response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert len(render_calls) == 1
+
+    def test_changed_data_changes_etag(
+        self, client, auth_headers, test_expenses, year, month, render_calls
+    ):
+        url = f"/api/v1/expenses/visualization/{year}/{month}"
+        expense1, expense2 = test_expenses
+
+        etag = client.get(url, headers=auth_headers).headers["etag"]
+
+        client.put(
+            f"/api/v1/expenses/{expense1.id}",
+            headers=auth_headers,
+            json={"price": 150}
+        )
+
+        response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert len(render_calls) == 2
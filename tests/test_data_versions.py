@@ -0,0 +1,179 @@
+# third party
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# local
+from app.core.security import create_access_token
+from app.models.models import User, UserDataVersion
+
+
+def version_of(db, user_id):
+    db.expire_all()
+    row = db.get(UserDataVersion, user_id)
+    return row.version if row else 0
+
+
+@pytest.fixture
+def expense_queries():
+    """Collect the statements reading expenses, on every engine."""
+    statements = []
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        if "FROM expenses" in statement:
+            statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+# -----------------------
+# Versions
+# -----------------------
+class TestDataVersions:
+
+    def test_every_write_bumps_the_version(
+        self, client, db, auth_headers, test_user, test_category
+    ):
+        assert version_of(db, test_user.id) == 0
+
+        response = client.post(
+            "/api/v1/expenses/",
+            headers=auth_headers,
+            json={"name": "coffee", "category_id": test_category.id, "price": 10}
+        )
+        expense_id = response.json()["id"]
+        assert version_of(db, test_user.id) == 1
+
+        url = f"/api/v1/expenses/{expense_id}"
+        client.put(url, headers=auth_headers, json={"price": 20})
+        assert version_of(db, test_user.id) == 2
+
+        client.delete(url, headers=auth_headers)
+        assert version_of(db, test_user.id) == 3
+
+    def test_batch_bumps_once(
+        self, client, db, auth_headers, test_user, test_category
+    ):
+        data = {"name": "coffee", "category_id": test_category.id, "price": 10}
+        response = client.post(
+            "/api/v1/expenses/batch",
+            headers=auth_headers,
+            json={"operations": [{"op": "create", "data": data} for _ in range(3)]}
+        )
+
+        assert response.status_code == 200
+        assert version_of(db, test_user.id) == 1
+
+    def test_import_bumps_the_version(
+        self, client, db, auth_headers, test_user, test_category
+    ):
+        response = client.post(
+            "/api/v1/expenses/import",
+            headers={**auth_headers, "Content-Type": "text/csv"},
+            content=b"name,category,price\nrent,Food,2000\n"
+        )
+
+        assert response.status_code == 200
+        assert version_of(db, test_user.id) == 1
+
+    def test_unchanged_expense_keeps_the_version(self, db, test_expense, test_user):
+        version = version_of(db, test_user.id)
+
+        test_expense.price = test_expense.price
+        db.commit()
+
+        assert version_of(db, test_user.id) == version
+
+
+# -----------------------
+# Conditional GET
+# -----------------------
+class TestConditionalGet:
+
+    def test_list_returns_304_without_querying_expenses(
+        self, client, auth_headers, test_expenses, expense_queries
+    ):
+        response = client.get("/api/v1/expenses/?limit=1", headers=auth_headers)
+        etag = response.headers["ETag"]
+
+        assert response.status_code == 200
+        assert etag.startswith('W/"')
+
+        expense_queries.clear()
+        headers = {**auth_headers, "If-None-Match": etag}
+        response = client.get("/api/v1/expenses/?limit=1", headers=headers)
+
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+        assert expense_queries == []
+
+    def test_list_etag_depends_on_the_query(self, client, auth_headers, test_expenses):
+        response = client.get("/api/v1/expenses/?limit=1", headers=auth_headers)
+        first = response.headers["ETag"]
+
+        headers = {**auth_headers, "If-None-Match": first}
+        response = client.get("/api/v1/expenses/?limit=2", headers=headers)
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != first
+
+    def test_list_etag_changes_after_a_write(
+        self, client, auth_headers, test_expenses, test_category
+    ):
+        etag = client.get("/api/v1/expenses/", headers=auth_headers).headers["ETag"]
+
+        client.post(
+            "/api/v1/expenses/",
+            headers=auth_headers,
+            json={"name": "coffee", "category_id": test_category.id, "price": 10}
+        )
+        headers = {**auth_headers, "If-None-Match": etag}
+        response = client.get("/api/v1/expenses/", headers=headers)
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 3
+
+    def test_other_users_writes_keep_the_etag(
+        self, client, db, auth_headers, test_expenses, test_category
+    ):
+        etag = client.get("/api/v1/expenses/", headers=auth_headers).headers["ETag"]
+
+        other = User(email="other@example.com", hashed_password="x")
+        db.add(other)
+        db.commit()
+        client.post(
+            "/api/v1/expenses/",
+            headers={"Authorization": f"Bearer {create_access_token(str(other.id))}"},
+            json={"name": "coffee", "category_id": test_category.id, "price": 10}
+        )
+
+        headers = {**auth_headers, "If-None-Match": etag}
+        response = client.get("/api/v1/expenses/", headers=headers)
+
+        assert response.status_code == 304
+
+    def test_single_expense(self, client, auth_headers, test_expense, expense_queries):
+        url = f"/api/v1/expenses/{test_expense.id}"
+        response = client.get(url, headers=auth_headers)
+        etag = response.headers["ETag"]
+        headers = {**auth_headers, "If-None-Match": etag}
+
+        assert response.status_code == 200
+        assert response.json()["name"] == "coffee"
+
+        expense_queries.clear()
+        response = client.get(url, headers=headers)
+
+        assert response.status_code == 304
+        assert expense_queries == []
+
+        client.put(url, headers=auth_headers, json={"price": 20})
+        response = client.get(url, headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["price"] == 20
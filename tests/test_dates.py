@@ -0,0 +1,61 @@
+# standard library
+from datetime import date, datetime
+
+# third party
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+# local
+from app.expenses.dates import bucket_range, date_part, in_bucket, month_range
+from app.models.models import Expense
+
+
+# -----------------------
+# Ranges
+# -----------------------
+class TestBucketRange:
+
+    @pytest.mark.parametrize(
+        "unit, moment, expected",
+        [
+            ("year", date(2025, 5, 10), (datetime(2025, 1, 1), datetime(2026, 1, 1))),
+            (
+                "month",
+                date(2025, 12, 31),
+                (datetime(2025, 12, 1), datetime(2026, 1, 1)),
+            ),
+            ("week", date(2025, 5, 11), (datetime(2025, 5, 5), datetime(2025, 5, 12))),
+            ("week", date(2025, 5, 12), (datetime(2025, 5, 12), datetime(2025, 5, 19))),
+            ("day", date(2024, 2, 29), (datetime(2024, 2, 29), datetime(2024, 3, 1))),
+        ],
+    )
+    def test_bucket_range(self, unit, moment, expected):
+        assert bucket_range(unit, moment) == expected
+
+    def test_month_range_matches_month_bucket(self):
+        assert month_range(2025, 2) == (datetime(2025, 2, 1), datetime(2025, 3, 1))
+
+    def test_unknown_unit_is_rejected(self):
+        with pytest.raises(ValueError):
+            bucket_range("quarter", date(2025, 1, 1))
+
+
+# -----------------------
+# SQL expressions
+# -----------------------
+class TestDateSQL:
+
+    def test_in_bucket_is_a_range_predicate(self):
+        predicate = in_bucket(Expense.created_at, "month", date(2025, 5, 10))
+        sql = str(predicate.compile(dialect=postgresql.dialect()))
+
+        assert "expenses.created_at >=" in sql
+        assert "expenses.created_at <" in sql
+
+    def test_date_part_returns_integers(self, db, test_expenses):
+        year = date_part(Expense.created_at, "year")
+        month = date_part(Expense.created_at, "month")
+        row = db.execute(select(year, month)).first()
+
+        assert tuple(row) == (2025, 5)
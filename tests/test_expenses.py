@@ -1,3 +1,14 @@
+# standard library
+from datetime import datetime
+
+# third party
+from fastapi.responses import JSONResponse
+
+# local
+from app.models.models import Expense
+from app.schemas.schemas import ExpenseDTO, PaginatedExpenseDTO
+
+
 # -----------------------
 # Authorization
 # -----------------------
@@ -184,6 +195,44 @@ class TestExpenseRead:
         assert "limit" in data
         assert "offset" in data
 
+    def test_get_expenses_json_matches_expense_dto(
+        self, client, db, auth_headers, test_user, test_category
+    ):
+        db.add_all([
+            Expense(
+                name=name,
+                price=price,
+                category_id=test_category.id,
+                user_id=test_user.id,
+                created_at=created_at
+            )
+            for name, price, created_at in [
+                ("café crème", 350, datetime(2025, 5, 10, 8, 30)),
+                ('"quoted" \\ name', 1, datetime(2025, 5, 10, 8, 30, 0, 120000)),
+                ("kaffee ☕", 99, datetime(2025, 5, 11, 23, 59, 59, 5)),
+            ]
+        ])
+        db.commit()
+
+        response = client.get("/api/v1/expenses/?limit=2", headers=auth_headers)
+
+        # what the endpoint returned when it validated Expense instances against
+        # response_model
+        order = (Expense.created_at.desc(), Expense.id.desc())
+        expenses = db.query(Expense).order_by(*order).all()
+        expected = PaginatedExpenseDTO(
+            items=[ExpenseDTO.model_validate(expense) for expense in expenses[:2]],
+            total=3,
+            limit=2,
+            offset=0,
+            next_cursor=response.json()["next_cursor"],
+            has_more=True,
+        )
+
+        assert response.status_code == 200
+        assert response.json()["next_cursor"] is not None
+        assert response.content == JSONResponse(expected.model_dump(mode="json")).body
+
 
 # -----------------------
 # Update
@@ -1,3 +1,12 @@
+# standard library
+import base64
+import json
+from datetime import datetime
+
+# third party
+import pytest
+
+
 # -----------------------
 # Filters
 # -----------------------
@@ -95,3 +104,224 @@ class TestExpensesPagination:
 
         assert len(items) == 1
         assert data["offset"] == 1
+
+    def test_pagination_returns_next_cursor(self, client, auth_headers, test_expenses):
+        response = client.get(
+            "/api/v1/expenses?limit=1",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["next_cursor"] is not None
+
+    def test_pagination_last_page_has_no_cursor(
+        self, client, auth_headers, test_expenses
+    ):
+        response = client.get(
+            "/api/v1/expenses?limit=2",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert len(data["items"]) == 2
+        assert data["next_cursor"] is None
+
+
+# -----------------------
+# Cursor pagination
+# -----------------------
+class TestExpensesCursorPagination:
+
+    @pytest.fixture
+    def many_expenses(self, db, test_category, test_user):
+        from app.models.models import Expense
+
+        expenses = [
+            Expense(
+                name=f"expense {i % 3}",
+                category_id=test_category.id,
+                price=(i % 4) * 10 + 10,
+                user_id=test_user.id,
+                created_at=datetime(2025, 5, 1 + i % 5)
+            )
+            for i in range(11)
+        ]
+
+        db.add_all(expenses)
+        db.commit()
+
+        return expenses
+
+    @pytest.mark.parametrize("sort_by", ["id", "name", "price", "created_at"])
+    @pytest.mark.parametrize("order", ["asc", "desc"])
+    def test_cursor_pages_match_offset_pages(
+        self, client, auth_headers, many_expenses, sort_by, order
+    ):
+        params = {"limit": 3, "sort_by": sort_by, "order": order}
+
+        offset_ids = []
+        for offset in range(0, len(many_expenses), 3):
+            response = client.get(
+                "/api/v1/expenses",
+                params={**params, "offset": offset},
+                headers=auth_headers
+            )
+            offset_ids += [item["id"] for item in response.json()["items"]]
+
+        cursor_ids = []
+        cursor = None
+        while True:
+            query = {**params, "cursor": cursor} if cursor else params
+            response = client.get(
+                "/api/v1/expenses", params=query, headers=auth_headers
+            )
+
+            assert response.status_code == 200
+
+            data = response.json()
+            cursor_ids += [item["id"] for item in data["items"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert cursor_ids == offset_ids
+        assert len(cursor_ids) == len(many_expenses)
+
+    def test_cursor_invalid(self, client, auth_headers, test_expenses):
+        response = client.get(
+            "/api/v1/expenses?cursor=not-a-cursor",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("payload", [
+        ["price", "asc", [1], 5],
+        ["price", "asc", {"a": 1}, 5],
+        ["price", "asc", 10 ** 30, 5],
+        ["price", "asc", True, 5],
+        ["name", "asc", 1, 5],
+        ["created_at", "asc", [1], 5],
+        ["price", "asc", 1, 10 ** 30],
+    ])
+    def test_cursor_with_forged_values(
+        self, client, auth_headers, test_expenses, payload
+    ):
+        sort_by, order = payload[0], payload[1]
+        encoded = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        cursor = encoded.rstrip("=")
+
+        response = client.get(
+            f"/api/v1/expenses?sort_by={sort_by}&order={order}&cursor={cursor}",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
+
+    def test_cursor_from_different_sorting(self, client, auth_headers, test_expenses):
+        response = client.get(
+            "/api/v1/expenses?limit=1&sort_by=price",
+            headers=auth_headers
+        )
+        cursor = response.json()["next_cursor"]
+
+        response = client.get(
+            f"/api/v1/expenses?limit=1&sort_by=name&cursor={cursor}",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
+
+    def test_cursor_with_offset(self, client, auth_headers, test_expenses):
+        response = client.get(
+            "/api/v1/expenses?limit=1",
+            headers=auth_headers
+        )
+        cursor = response.json()["next_cursor"]
+
+        response = client.get(
+            f"/api/v1/expenses?offset=1&cursor={cursor}",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
+
+
+# -----------------------
+# Totals
+# -----------------------
+class TestExpensesTotals:
+
+    def test_exact_total_by_default(self, client, auth_headers, test_expenses):
+        response = client.get(
+            "/api/v1/expenses?limit=1",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["total"] == 2
+        assert data["has_more"] is True
+
+    def test_without_total(self, client, auth_headers, test_expenses):
+        response = client.get(
+            "/api/v1/expenses?limit=2&include_total=false",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["total"] is None
+        assert len(data["items"]) == 2
+        assert data["has_more"] is False
+
+    @pytest.mark.parametrize("query", [
+        "",
+        "&start_date=2025-05-01&end_date=2025-05-31",
+        "&category_name=Food",
+    ])
+    def test_estimate_matches_exact_without_price_filters(
+        self, client, auth_headers, test_expenses, query
+    ):
+        url = f"/api/v1/expenses?limit=1{query}"
+        exact = client.get(url, headers=auth_headers).json()
+        url = f"/api/v1/expenses?limit=1&include_total=estimate{query}"
+        estimate = client.get(url, headers=auth_headers).json()
+
+        assert estimate["total"] == exact["total"]
+        assert estimate["items"] == exact["items"]
+
+    def test_estimate_ignores_price_filters(self, client, auth_headers, test_expenses):
+        response = client.get(
+            "/api/v1/expenses?min_price=150&include_total=estimate",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert len(data["items"]) == 1
+        assert data["total"] == 2
+
+    def test_estimate_outside_months(self, client, auth_headers, test_expenses):
+        response = client.get(
+            "/api/v1/expenses?start_date=2025-06-01&include_total=estimate",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 0
+
+    def test_invalid_include_total(self, client, auth_headers, test_expenses):
+        response = client.get(
+            "/api/v1/expenses?include_total=maybe",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 422
@@ -45,3 +45,125 @@ class TestExportResponse:
         data = response.json()
         assert data["detail"] == "No expenses found"
 
+
+# -----------------------
+# Content
+# -----------------------
+class TestExportContent:
+
+    def test_export_contains_rows_and_summary(
+        self, client, auth_headers, test_expenses
+    ):
+        import io
+        from openpyxl import load_workbook
+
+        response = client.get(
+            "/api/v1/expenses/export/",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+
+        wb = load_workbook(io.BytesIO(response.content))
+        assert wb.sheetnames == ["Data", "Summary"]
+
+        data = list(wb["Data"].iter_rows(values_only=True))
+        assert data[0] == ("ID", "Name", "Category", "Price", "Created At")
+        assert [row[1] for row in data[1:]] == ["fruits", "vegetables"]
+        assert wb["Data"]["D2"].number_format == "#,##0.00"
+
+        summary = wb["Summary"]
+        assert summary["A1"].value == "EXPENSE REPORT SUMMARY"
+        assert "A1:B1" in summary.merged_cells
+        assert summary["B4"].value == 300
+        assert summary["B5"].value == 150
+        assert summary["B6"].value == 200
+        assert summary["B7"].value == 2
+        assert summary["A11"].value == "Food"
+        assert summary["B11"].value == 300
+
+    def test_export_filters_by_category(self, client, auth_headers, test_expenses):
+        response = client.get(
+            "/api/v1/expenses/export/?category=Other",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 404
+
+
+# -----------------------
+# Raw formats
+# -----------------------
+class TestExportRawFormats:
+
+    def test_export_csv(self, client, auth_headers, test_expenses):
+        import csv
+        import io
+
+        response = client.get(
+            "/api/v1/expenses/export/?format=csv",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        disposition = response.headers["content-disposition"]
+        assert 'filename="expenses_report.csv"' in disposition
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["name"] for row in rows] == ["fruits", "vegetables"]
+        assert rows[0] == {
+            "id": str(test_expenses[0].id),
+            "name": "fruits",
+            "category": "Food",
+            "price": "100",
+            "created_at": "2025-05-10T00:00:00",
+        }
+
+    def test_export_ndjson(self, client, auth_headers, test_expenses):
+        import json
+
+        response = client.get(
+            "/api/v1/expenses/export/?format=ndjson",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["price"] for row in rows] == [100, 200]
+        assert rows[1]["category"] == "Food"
+
+    def test_export_ndjson_gzip(self, client, auth_headers, test_expenses):
+        import gzip
+        import json
+
+        response = client.get(
+            "/api/v1/expenses/export/?format=ndjson&gzip=true",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        disposition = response.headers["content-disposition"]
+        assert 'filename="expenses_report.ndjson.gz"' in disposition
+
+        lines = gzip.decompress(response.content).decode().splitlines()
+        assert [json.loads(line)["name"] for line in lines] == ["fruits", "vegetables"]
+
+    def test_export_csv_respects_filters(self, client, auth_headers, test_expenses):
+        response = client.get(
+            "/api/v1/expenses/export/?format=csv&start_date=2025-06-01",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 404
+
+    def test_export_invalid_format(self, client, auth_headers, test_expenses):
+        response = client.get(
+            "/api/v1/expenses/export/?format=pdf",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 422
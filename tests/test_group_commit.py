@@ -0,0 +1,214 @@
+# standard library
+import asyncio
+import sqlite3
+
+# third party
+import pytest
+from sqlalchemy.exc import OperationalError
+
+# local
+from app.core.exception import CategoryNotFoundException
+from app.core.security import Principal, create_access_token
+from app.expenses.group_commit import GroupCommitWriter, group_commit
+from app.models.models import Expense, UserRole
+from app.schemas.schemas import ExpenseCreateDTO
+
+
+@pytest.fixture
+def writer(db):
+    writer = GroupCommitWriter(
+        enabled=True,
+        max_batch=50,
+        max_delay_ms=20,
+        bind_for=lambda user_id, fresh=False: db.get_bind(),
+    )
+    yield writer
+    writer.shutdown()
+
+
+@pytest.fixture
+def group_commit_enabled(db, monkeypatch):
+    monkeypatch.setattr(group_commit, "enabled", True)
+    monkeypatch.setattr(
+        group_commit, "bind_for", lambda user_id, fresh=False: db.get_bind()
+    )
+    yield group_commit
+    group_commit.shutdown()
+
+
+# -----------------------
+# Writer
+# -----------------------
+class TestGroupCommitWriter:
+
+    def test_concurrent_creates_share_a_batch(
+        self, db, writer, test_user, test_category
+    ):
+        principal = Principal(id=test_user.id, role=UserRole.USER, token_version=0)
+
+        dtos = [
+            ExpenseCreateDTO(
+                name=f"coffee {i}", category_id=test_category.id, price=i + 1
+            )
+            for i in range(20)
+        ]
+
+        async def create_many():
+            creates = (writer.create(dto, principal) for dto in dtos)
+            return await asyncio.gather(*creates)
+
+        expenses = asyncio.run(create_many())
+
+        assert len({expense.id for expense in expenses}) == 20
+        assert all(expense.created_at is not None for expense in expenses)
+        assert db.query(Expense).count() == 20
+
+        stats = writer.stats()
+        assert stats["expenses"] == 20
+        assert stats["batches"] < 20
+        assert stats["max_batch_size"] > 1
+
+    def test_shutdown_flushes_queued_expenses(
+        self, db, writer, test_user, test_category
+    ):
+        principal = Principal(id=test_user.id, role=UserRole.USER, token_version=0)
+        dto = ExpenseCreateDTO(name="coffee", category_id=test_category.id, price=10)
+
+        async def create():
+            return await writer.create(dto, principal)
+
+        asyncio.run(create())
+        writer.shutdown()
+
+        assert writer.thread is None
+        assert db.query(Expense).count() == 1
+
+    def test_failed_batch_keeps_the_writer_running(
+        self, db, test_user, test_category
+    ):
+        principal = Principal(id=test_user.id, role=UserRole.USER, token_version=0)
+        dto = ExpenseCreateDTO(name="coffee", category_id=test_category.id, price=10)
+        binds = iter([RuntimeError("catalog unavailable")])
+
+        def bind_for(user_id, fresh=False):
+            error = next(binds, None)
+            if error is not None:
+                raise error
+            return db.get_bind()
+
+        writer = GroupCommitWriter(
+            enabled=True, max_batch=50, max_delay_ms=1, bind_for=bind_for
+        )
+
+        async def create():
+            return await writer.create(dto, principal)
+
+        try:
+            with pytest.raises(RuntimeError):
+                asyncio.run(create())
+
+            assert writer.thread.is_alive()
+            assert asyncio.run(create()).id is not None
+        finally:
+            writer.shutdown()
+
+    def test_lock_errors_are_retried(
+        self, db, writer, test_user, test_category, monkeypatch
+    ):
+        from app.expenses import group_commit as module
+
+        principal = Principal(id=test_user.id, role=UserRole.USER, token_version=0)
+        dto = ExpenseCreateDTO(name="coffee", category_id=test_category.id, price=10)
+        commit = writer.commit
+        locked = sqlite3.OperationalError("database is locked")
+        errors = iter([OperationalError("INSERT", {}, locked)])
+
+        def locked_once(bind, items):
+            error = next(errors, None)
+            if error is not None:
+                raise error
+            commit(bind, items)
+
+        monkeypatch.setattr(module, "backoff_delay", lambda attempt: 0)
+        monkeypatch.setattr(writer, "commit", locked_once)
+
+        async def create():
+            return await writer.create(dto, principal)
+
+        assert asyncio.run(create()).id is not None
+        assert db.query(Expense).count() == 1
+
+    def test_rejected_expenses_are_not_counted(
+        self, writer, test_user, test_category
+    ):
+        principal = Principal(id=test_user.id, role=UserRole.USER, token_version=0)
+        dto = ExpenseCreateDTO(name="coffee", category_id=test_category.id, price=10)
+        unknown = ExpenseCreateDTO(name="coffee", category_id=999, price=10)
+
+        async def create_both():
+            return await asyncio.gather(
+                writer.create(dto, principal),
+                writer.create(unknown, principal),
+                return_exceptions=True
+            )
+
+        expense, error = asyncio.run(create_both())
+
+        assert isinstance(error, CategoryNotFoundException)
+        assert writer.stats()["expenses"] == 1
+
+
+# -----------------------
+# Endpoint
+# -----------------------
+class TestGroupCommitEndpoint:
+
+    def test_create_expense(
+        self, client, db, auth_headers, test_category, group_commit_enabled
+    ):
+        response = client.post(
+            "/api/v1/expenses/",
+            headers=auth_headers,
+            json={"name": "coffee", "category_id": test_category.id, "price": 10}
+        )
+
+        assert response.status_code == 201
+        assert response.json()["name"] == "coffee"
+        assert response.json()["category"]["id"] == test_category.id
+        assert group_commit.stats()["expenses"] >= 1
+        assert db.query(Expense).count() == 1
+
+    def test_unknown_category_returns_400(
+        self, client, db, auth_headers, group_commit_enabled
+    ):
+        response = client.post(
+            "/api/v1/expenses/",
+            headers=auth_headers,
+            json={"name": "coffee", "category_id": 999, "price": 10}
+        )
+
+        assert response.status_code == 400
+        assert db.query(Expense).count() == 0
+
+
+# -----------------------
+# Metrics
+# -----------------------
+class TestMetrics:
+
+    def test_admin_gets_metrics(self, client, test_user):
+        token = create_access_token(str(test_user.id), role=UserRole.ADMIN.value)
+
+        headers = {"Authorization": f"Bearer {token}"}
+        response = client.get("/api/v1/metrics/", headers=headers)
+
+        assert response.status_code == 200
+        assert set(response.json()) == {
+            "group_commit", "password_hasher", "user_cache", "write_transactions"
+        }
+        assert "average_flush_ms" in response.json()["group_commit"]
+
+    def test_user_gets_403(self, client, auth_headers):
+        response = client.get("/api/v1/metrics/", headers=auth_headers)
+
+        assert response.status_code == 403
@@ -0,0 +1,147 @@
+# local
+from app.expenses.rollup import check_rollup
+from app.models.models import Expense
+
+
+def post_csv(client, headers, content: str):
+    return client.post(
+        "/api/v1/expenses/import",
+        headers={**headers, "Content-Type": "text/csv"},
+        content=content.encode()
+    )
+
+
+# -----------------------
+# Authorization
+# -----------------------
+class TestImportAuthorization:
+
+    def test_import_without_token(self, client):
+        response = client.post(
+            "/api/v1/expenses/import",
+            headers={"Content-Type": "text/csv"},
+            content=b"name,category,price\n"
+        )
+
+        assert response.status_code == 403
+
+
+# -----------------------
+# Import
+# -----------------------
+class TestImportExpenses:
+
+    def test_import_valid_rows(
+        self, client, auth_headers, db, test_category, test_user
+    ):
+        response = post_csv(
+            client,
+            auth_headers,
+            "name,category,price,created_at\n"
+            "rent,Food,2000,2025-05-01\n"
+            "coffee,Food,12,2025-05-02T08:30:00\n"
+            "lunch,Food,35,\n"
+        )
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data == {"imported": 3, "failed": 0, "errors": []}
+
+        expenses = (
+            db.query(Expense)
+            .filter(Expense.user_id == test_user.id)
+            .order_by(Expense.id)
+            .all()
+        )
+        assert [expense.name for expense in expenses] == ["rent", "coffee", "lunch"]
+        assert expenses[1].created_at.isoformat() == "2025-05-02T08:30:00"
+        assert check_rollup(db) == []
+
+    def test_import_reports_invalid_rows(self, client, auth_headers, db, test_category):
+        response = post_csv(
+            client,
+            auth_headers,
+            "name,category,price,created_at\n"
+            "ok,Food,10,2025-05-01\n"
+            "bad category,Unknown,10,2025-05-01\n"
+            "   ,Food,10,2025-05-01\n"
+            "negative,Food,-5,2025-05-01\n"
+            "bad date,Food,10,yesterday\n"
+        )
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["imported"] == 1
+        assert data["failed"] == 4
+        assert [error["row"] for error in data["errors"]] == [3, 4, 5, 6]
+        fields = [error["errors"][0]["field"] for error in data["errors"]]
+        assert fields == ["category", "name", "price", "created_at"]
+        assert data["errors"][1]["errors"][0]["message"] == "Name cannot be empty"
+
+        assert db.query(Expense).count() == 1
+
+    def test_import_in_multiple_chunks(
+        self, client, auth_headers, db, test_category, monkeypatch
+    ):
+        from app.expenses import crud
+
+        monkeypatch.setattr(crud, "IMPORT_CHUNK_SIZE", 3)
+        monkeypatch.setattr(crud, "IMPORT_INSERT_BATCH_SIZE", 2)
+
+        rows = "".join(
+            f"item {i},Food,{i + 1},2025-05-{i % 28 + 1:02}\n" for i in range(10)
+        )
+        response = post_csv(
+            client, auth_headers, "name,category,price,created_at\n" + rows
+        )
+
+        assert response.status_code == 200
+        assert response.json()["imported"] == 10
+        assert db.query(Expense).count() == 10
+        assert check_rollup(db) == []
+
+    def test_import_missing_columns(self, client, auth_headers, test_category):
+        response = post_csv(client, auth_headers, "name,price\ncoffee,10\n")
+
+        assert response.status_code == 400
+
+    def test_import_reports_invalid_utf8_rows(
+        self, client, auth_headers, db, test_category
+    ):
+        response = client.post(
+            "/api/v1/expenses/import",
+            headers={**auth_headers, "Content-Type": "text/csv"},
+            content=b"name,category,price\ncoffee,Food,10\ncaf\xff,Food,10\n"
+                    b"tea,Food,5\n"
+        )
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["imported"] == 2
+        assert data["errors"] == [
+            {"row": 3, "errors": [{"message": "Invalid UTF-8 text", "field": "name"}]}
+        ]
+        assert db.query(Expense).count() == 2
+
+    def test_import_reports_oversized_fields(
+        self, client, auth_headers, db, test_category
+    ):
+        response = post_csv(
+            client,
+            auth_headers,
+            "name,category,price\n"
+            f'"{"x" * 200_000}",Food,10\n'
+            "tea,Food,5\n"
+        )
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["imported"] == 1
+        assert data["errors"][0]["row"] == 2
+        message = data["errors"][0]["errors"][0]["message"]
+        assert "field larger than field limit" in message
+        assert db.query(Expense).count() == 1
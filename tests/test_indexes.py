@@ -0,0 +1,130 @@
+# standard library
+from contextlib import contextmanager
+from datetime import date
+
+# third party
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# local
+from app.expenses.crud import (
+    generate_report,
+    get_all_expenses,
+    get_expense_by_id,
+    statistics,
+    visualization_data,
+)
+
+
+# query plans are read with SQLite's EXPLAIN QUERY PLAN
+pytestmark = pytest.mark.sqlite_only
+
+
+@contextmanager
+def captured_expense_queries():
+    """Collect every SELECT on the expenses table run by any engine inside the block."""
+    queries = []
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        if statement.lstrip().upper().startswith("SELECT") and "expenses" in statement:
+            queries.append((statement, parameters))
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+def query_plans(db, queries):
+    connection = db.connection()
+    plans = []
+    for statement, parameters in queries:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plans.append([row[-1] for row in rows])
+    return plans
+
+
+def assert_uses_index(db, queries):
+    assert queries
+
+    for plan in query_plans(db, queries):
+        assert not any(step.startswith("SCAN expenses") for step in plan), plan
+        assert any("expenses USING" in step for step in plan), plan
+
+
+def list_kwargs(**overrides):
+    kwargs = {
+        "limit": 10,
+        "offset": 0,
+        "sort_by": "created_at",
+        "order": "desc",
+        "min_price": None,
+        "max_price": None,
+        "start_date": None,
+        "end_date": None,
+        "category_id": None,
+        "category_name": None,
+    }
+    kwargs.update(overrides)
+    return kwargs
+
+
+# -----------------------
+# Query plans
+# -----------------------
+class TestExpenseQueryPlans:
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {},
+            {"order": "asc"},
+            {"sort_by": "price"},
+            {"min_price": 50, "max_price": 150},
+            {"start_date": date(2025, 5, 1), "end_date": date(2025, 5, 31)},
+            {"category_id": 1},
+        ],
+    )
+    def test_get_all_expenses_uses_index(
+        self, db, run_async, test_user, test_expenses, overrides
+    ):
+        with captured_expense_queries() as queries:
+            run_async(get_all_expenses, test_user, **list_kwargs(**overrides))
+
+        assert_uses_index(db, queries)
+
+    def test_get_expense_by_id_uses_index(self, db, run_async, test_user, test_expense):
+        with captured_expense_queries() as queries:
+            run_async(get_expense_by_id, test_expense.id, test_user)
+
+        assert_uses_index(db, queries)
+
+    def test_statistics_does_not_read_expenses(
+        self, run_async, test_user, test_expenses, year, month
+    ):
+        with captured_expense_queries() as queries:
+            run_async(statistics, year, month, test_user)
+
+        assert queries == []
+
+    def test_generate_report_uses_index(self, db, test_user, test_expenses):
+        with captured_expense_queries() as queries:
+            report = generate_report(
+                db, None, date(2025, 1, 1), date(2025, 12, 31), test_user
+            )
+            b"".join(report)
+
+        assert_uses_index(db, queries)
+
+    def test_visualization_data_does_not_read_expenses(
+        self, run_async, test_user, test_expenses, year, month
+    ):
+        with captured_expense_queries() as queries:
+            labels, values = run_async(visualization_data, year, month, test_user)
+
+        assert (labels, values) == (["Food"], [300])
+        assert queries == []
@@ -0,0 +1,85 @@
+# third party
+import pytest
+from passlib.hash import bcrypt
+
+# local
+from app.core.password_hasher import password_hasher
+from app.core.security import BCRYPT_ROUNDS, verify_password
+
+
+# -----------------------
+# Rehash on login
+# -----------------------
+class TestRehashOnLogin:
+
+    def test_login_rehashes_password_with_other_cost(self, client, db, test_user):
+        slower = bcrypt.using(rounds=BCRYPT_ROUNDS + 1)
+        test_user.hashed_password = slower.hash("Aaaaaa12")
+        db.commit()
+
+        response = client.post(
+            "/api/v1/auth/login",
+            json={"email": "test@example.com", "password": "Aaaaaa12"}
+        )
+
+        assert response.status_code == 200
+
+        db.refresh(test_user)
+        assert bcrypt.from_string(test_user.hashed_password).rounds == BCRYPT_ROUNDS
+        assert verify_password("Aaaaaa12", test_user.hashed_password)
+
+    def test_login_keeps_password_with_current_cost(self, client, db, test_user):
+        hashed_password = test_user.hashed_password
+
+        response = client.post(
+            "/api/v1/auth/login",
+            json={"email": "test@example.com", "password": "Aaaaaa12"}
+        )
+
+        assert response.status_code == 200
+
+        db.refresh(test_user)
+        assert test_user.hashed_password == hashed_password
+
+
+# -----------------------
+# Executor
+# -----------------------
+class TestPasswordHasher:
+
+    def test_busy_hasher_returns_503(self, client, test_user, monkeypatch):
+        monkeypatch.setattr(password_hasher, "max_pending", 0)
+
+        response = client.post(
+            "/api/v1/auth/login",
+            json={"email": "test@example.com", "password": "Aaaaaa12"}
+        )
+
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+
+    def test_stats_count_completed_hashes(self, client):
+        completed = password_hasher.stats()["completed"]
+
+        response = client.post(
+            "/api/v1/auth/register",
+            json={"email": "new@example.com", "password": "Aaaaaa12"}
+        )
+
+        assert response.status_code == 201
+        assert password_hasher.stats()["completed"] == completed + 1
+
+    def test_stats_count_failed_hashes_separately(self, run_async):
+        stats = password_hasher.stats()
+
+        def broken():
+            raise ValueError("bad hash")
+
+        async def run(_):
+            with pytest.raises(ValueError):
+                await password_hasher.run(broken)
+
+        run_async(run)
+
+        assert password_hasher.stats()["completed"] == stats["completed"]
+        assert password_hasher.stats()["failed"] == stats["failed"] + 1
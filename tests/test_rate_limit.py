@@ -0,0 +1,135 @@
+# standard library
+import multiprocessing
+import os
+import tempfile
+
+# third party
+import pytest
+
+# local
+from app.core.exception import RateLimitExceededException
+from app.core.rate_limit import (
+    MemoryBackend,
+    RateLimiter,
+    SQLiteBackend,
+    database_dir,
+    rate_limiter,
+)
+from app.db.session import BASE_DIR
+
+
+def take_from_shared_bucket(path, results):
+    limiter = RateLimiter(
+        backend=SQLiteBackend(path), limits={"export": (5, 0.001)}, enabled=True
+    )
+    allowed = 0
+    for _ in range(5):
+        try:
+            limiter.check("export", "1:127.0.0.1")
+            allowed += 1
+        except RateLimitExceededException:
+            pass
+    results.put(allowed)
+
+
+# -----------------------
+# Token bucket
+# -----------------------
+class TestRateLimiter:
+
+    def test_bucket_allows_burst_then_rejects(self):
+        limiter = RateLimiter(
+            backend=MemoryBackend(), limits={"login": (3, 1.0)}, enabled=True
+        )
+
+        for _ in range(3):
+            limiter.check("login", "127.0.0.1")
+
+        with pytest.raises(RateLimitExceededException) as exc_info:
+            limiter.check("login", "127.0.0.1")
+
+        assert 0 < exc_info.value.retry_after <= 1
+
+    def test_clients_have_separate_buckets(self):
+        limiter = RateLimiter(
+            backend=MemoryBackend(), limits={"login": (1, 1.0)}, enabled=True
+        )
+
+        limiter.check("login", "10.0.0.1")
+        limiter.check("login", "10.0.0.2")
+
+    def test_bucket_refills_over_time(self):
+        backend = MemoryBackend()
+
+        assert backend.take("login:ip", 1, 1.0, now=100.0) == 0
+        assert backend.take("login:ip", 1, 1.0, now=100.5) == pytest.approx(0.5)
+        assert backend.take("login:ip", 1, 1.0, now=101.0) == 0
+
+    def test_sqlite_backend_is_shared_between_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rate_limits.db")
+            context = multiprocessing.get_context("spawn")
+            results = context.Queue()
+
+            processes = [
+                context.Process(target=take_from_shared_bucket, args=(path, results))
+                for _ in range(3)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+
+            assert sum(results.get() for _ in processes) == 5
+
+    def test_sqlite_file_sits_next_to_the_database(self, tmp_path):
+        assert database_dir(f"sqlite:///{tmp_path / 'app.sqlite'}") == tmp_path
+        assert database_dir("sqlite://") == BASE_DIR
+        assert database_dir("postgresql://user@localhost/app") == BASE_DIR
+
+
+# -----------------------
+# Endpoints
+# -----------------------
+class TestRateLimitedEndpoints:
+
+    def test_login_returns_429_with_retry_after(self, client, test_user, monkeypatch):
+        monkeypatch.setitem(rate_limiter.limits, "login", (2, 0.1))
+
+        for _ in range(2):
+            response = client.post(
+                "/api/v1/auth/login",
+                json={"email": "test@example.com", "password": "wrong_password"}
+            )
+            assert response.status_code == 401
+
+        response = client.post(
+            "/api/v1/auth/login",
+            json={"email": "test@example.com", "password": "Aaaaaa12"}
+        )
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "10"
+        assert response.json() == {"detail": "Too many requests, try again later"}
+
+    def test_export_is_limited_per_user(
+        self, client, auth_headers, test_expense, monkeypatch
+    ):
+        monkeypatch.setitem(rate_limiter.limits, "export", (1, 0.1))
+
+        response = client.get(
+            "/api/v1/expenses/export/?format=csv", headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        response = client.get(
+            "/api/v1/expenses/export/?format=csv", headers=auth_headers
+        )
+        assert response.status_code == 429
+
+    def test_rate_limit_runs_after_authentication(self, client, monkeypatch):
+        monkeypatch.setitem(rate_limiter.limits, "export", (0, 0.1))
+
+        response = client.get("/api/v1/expenses/export/")
+
+        assert response.status_code in (401, 403)
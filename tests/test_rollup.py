@@ -0,0 +1,145 @@
+# standard library
+from datetime import datetime
+
+# third party
+import pytest
+
+# local
+from app.expenses.rollup import check_rollup, rebuild_rollup
+from app.models.models import Category, Expense, MonthlyCategoryTotal
+
+
+@pytest.fixture
+def second_category(db):
+    category = Category(name="Transport")
+
+    db.add(category)
+    db.commit()
+    db.refresh(category)
+
+    return category
+
+
+def rollup_rows(db):
+    return {
+        (row.year, row.month, row.category_id): (row.total, row.count, row.max)
+        for row in db.query(MonthlyCategoryTotal).populate_existing().all()
+    }
+
+
+# -----------------------
+# Maintenance
+# -----------------------
+class TestRollupMaintenance:
+
+    def test_rollup_tracks_inserted_expenses(self, db, test_expenses, test_category):
+        assert rollup_rows(db) == {(2025, 5, test_category.id): (300, 2, 200)}
+        assert check_rollup(db) == []
+
+    def test_rollup_tracks_created_expense(
+        self, client, auth_headers, db, test_category
+    ):
+        response = client.post(
+            "/api/v1/expenses/",
+            headers=auth_headers,
+            json={"name": "coffee", "category_id": test_category.id, "price": 10}
+        )
+
+        assert response.status_code == 201
+        assert check_rollup(db) == []
+        assert list(rollup_rows(db).values()) == [(10, 1, 10)]
+
+    def test_rollup_tracks_price_update(
+        self, client, auth_headers, db, test_expenses, test_category
+    ):
+        expense1, expense2 = test_expenses
+
+        response = client.put(
+            f"/api/v1/expenses/{expense2.id}",
+            headers=auth_headers,
+            json={"price": 50}
+        )
+
+        assert response.status_code == 200
+        assert rollup_rows(db) == {(2025, 5, test_category.id): (150, 2, 100)}
+        assert check_rollup(db) == []
+
+    def test_rollup_tracks_category_update(
+        self, client, auth_headers, db, test_expenses, test_category, second_category
+    ):
+        expense1, expense2 = test_expenses
+
+        response = client.put(
+            f"/api/v1/expenses/{expense2.id}",
+            headers=auth_headers,
+            json={"category_id": second_category.id}
+        )
+
+        assert response.status_code == 200
+        assert rollup_rows(db) == {
+            (2025, 5, test_category.id): (100, 1, 100),
+            (2025, 5, second_category.id): (200, 1, 200),
+        }
+        assert check_rollup(db) == []
+
+    def test_rollup_tracks_delete(
+        self, client, auth_headers, db, test_expenses, test_category
+    ):
+        expense1, expense2 = test_expenses
+
+        response = client.delete(
+            f"/api/v1/expenses/{expense2.id}",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 204
+        assert rollup_rows(db) == {(2025, 5, test_category.id): (100, 1, 100)}
+
+        response = client.delete(
+            f"/api/v1/expenses/{expense1.id}",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 204
+        assert rollup_rows(db) == {}
+
+
+# -----------------------
+# Rebuild and check
+# -----------------------
+class TestRollupRebuild:
+
+    def test_check_reports_missing_and_stale_buckets(
+        self, db, test_expenses, test_category, test_user
+    ):
+        db.query(MonthlyCategoryTotal).delete()
+        db.add(MonthlyCategoryTotal(
+            user_id=test_user.id, year=2024, month=1, category_id=test_category.id,
+            total=5, count=1, max=5
+        ))
+        db.commit()
+
+        mismatches = check_rollup(db)
+
+        assert len(mismatches) == 2
+        assert {(m["year"], m["month"]) for m in mismatches} == {(2024, 1), (2025, 5)}
+
+    def test_rebuild_restores_rollup(self, db, test_expenses, test_category, test_user):
+        db.query(MonthlyCategoryTotal).delete()
+        db.commit()
+
+        db.add(Expense(
+            name="other month", category_id=test_category.id, price=7,
+            user_id=test_user.id, created_at=datetime(2025, 6, 1)
+        ))
+        db.commit()
+
+        written = rebuild_rollup(db)
+        db.commit()
+
+        assert written == 2
+        assert check_rollup(db) == []
+        assert rollup_rows(db) == {
+            (2025, 5, test_category.id): (300, 2, 200),
+            (2025, 6, test_category.id): (7, 1, 7),
+        }
@@ -0,0 +1,145 @@
+# standard library
+import os
+import tempfile
+
+# third party
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+# local
+from app.db.routing import ReadYourWrites, RoutingSession, read_your_writes
+from app.db.session import create_app_engine
+from app.models.models import Base, Category
+
+
+@pytest.fixture
+def routing_session():
+    with tempfile.TemporaryDirectory() as directory:
+        primary = create_app_engine(
+            f"sqlite:///{os.path.join(directory, 'primary.sqlite')}"
+        )
+        replica = create_app_engine(
+            f"sqlite:///{os.path.join(directory, 'replica.sqlite')}"
+        )
+        Base.metadata.create_all(primary)
+        Base.metadata.create_all(replica)
+
+        # a row only the replica has shows where a read was routed
+        with replica.begin() as conn:
+            conn.execute(Category.__table__.insert(), [{"name": "Replica"}])
+
+        read_your_writes.clear()
+        session_factory = sessionmaker(
+            class_=RoutingSession, primary=primary, replica=replica
+        )
+        try:
+            yield session_factory
+        finally:
+            read_your_writes.clear()
+            primary.dispose()
+            replica.dispose()
+
+
+def category_names(db):
+    return [category.name for category in db.query(Category).order_by(Category.name)]
+
+
+# -----------------------
+# Routing
+# -----------------------
+class TestRoutingSession:
+
+    def test_reads_go_to_replica(self, routing_session):
+        with routing_session() as db:
+            assert category_names(db) == ["Replica"]
+
+    def test_writes_go_to_primary_and_session_sticks_to_it(self, routing_session):
+        with routing_session() as db:
+            db.add(Category(name="Primary"))
+            db.commit()
+
+            assert category_names(db) == ["Primary"]
+
+    def test_user_reads_from_primary_after_commit(self, routing_session):
+        with routing_session(info={"user_id": 1}) as db:
+            db.add(Category(name="Primary"))
+            db.commit()
+
+        with routing_session(info={"user_id": 1}) as db:
+            assert category_names(db) == ["Primary"]
+
+        with routing_session(info={"user_id": 2}) as db:
+            assert category_names(db) == ["Replica"]
+
+    def test_export_session_follows_routing(self, routing_session):
+        with routing_session() as db:
+            assert db.get_bind() is db.replica
+
+        read_your_writes.mark(1)
+
+        with routing_session(info={"user_id": 1}) as db:
+            assert db.get_bind() is db.primary
+
+
+# -----------------------
+# Read-your-writes window
+# -----------------------
+class TestReadYourWrites:
+
+    def test_window_expires(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("app.db.routing.time.monotonic", lambda: now[0])
+        window = ReadYourWrites(window=5)
+
+        window.mark(1)
+        assert window.is_recent(1)
+
+        now[0] = 106.0
+        assert not window.is_recent(1)
+
+    def test_anonymous_sessions_are_never_recent(self):
+        assert not ReadYourWrites().is_recent(None)
+
+    def test_request_sessions_are_routing_sessions(self):
+        from app.db.session import AsyncSessionLocal, RequestSession
+
+        assert isinstance(RequestSession(), RoutingSession)
+        assert isinstance(AsyncSessionLocal().sync_session, RoutingSession)
+
+
+# -----------------------
+# Endpoints
+# -----------------------
+def expense_reads(statements):
+    return [statement for statement in statements if "FROM expenses" in statement]
+
+
+class TestRoutedEndpoints:
+
+    def test_listing_reads_from_replica(
+        self, client, auth_headers, test_expenses, replica_statements
+    ):
+        response = client.get("/api/v1/expenses/", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 2
+        assert expense_reads(replica_statements)
+
+    def test_listing_after_a_write_reads_from_primary(
+            self, client, auth_headers, test_category, replica_statements
+    ):
+        response = client.post(
+            "/api/v1/expenses/",
+            headers=auth_headers,
+            json={"name": "coffee", "category_id": test_category.id, "price": 10}
+        )
+
+        # expire_on_commit=False keeps the committed expense serializable
+        assert response.status_code == 201
+        assert response.json()["category"]["name"] == "Food"
+
+        replica_statements.clear()
+        response = client.get("/api/v1/expenses/", headers=auth_headers)
+
+        assert [item["name"] for item in response.json()["items"]] == ["coffee"]
+        assert expense_reads(replica_statements) == []
@@ -0,0 +1,170 @@
+# standard library
+from datetime import datetime
+
+# third party
+import pytest
+
+# local
+from app.expenses.search import fts_query, search_terms
+from app.models.models import Category, Expense
+
+
+GARAGE_RENT = "Garage rent for the spot downtown near the office"
+
+
+@pytest.fixture
+def named_expenses(db, test_user, test_category):
+    transport = Category(name="Transport")
+    db.add(transport)
+    db.flush()
+
+    expenses = [
+        Expense(
+            name=name,
+            price=price,
+            category_id=category.id,
+            user_id=test_user.id,
+            created_at=created_at
+        )
+        for name, price, category, created_at in [
+            ("Uber to the airport", 40, transport, datetime(2025, 3, 1)),
+            ("uber eats", 25, test_category, datetime(2025, 3, 2)),
+            ("Rent March", 900, test_category, datetime(2025, 3, 3)),
+            ("Rent April", 900, test_category, datetime(2025, 4, 3)),
+            ("Café crème", 4, test_category, datetime(2025, 4, 4)),
+            ("rent", 50, transport, datetime(2025, 4, 5)),
+            (GARAGE_RENT, 120, transport, datetime(2025, 4, 6)),
+        ]
+    ]
+    db.add_all(expenses)
+    db.commit()
+
+    return expenses
+
+
+def search(client, auth_headers, query):
+    response = client.get(f"/api/v1/expenses?{query}", headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def names(data):
+    return [item["name"] for item in data["items"]]
+
+
+# -----------------------
+# Query building
+# -----------------------
+class TestSearchTerms:
+
+    def test_operators_and_quotes_are_dropped(self):
+        assert search_terms('uber" OR (rent*') == ["uber", "OR", "rent"]
+
+    def test_terms_are_quoted_prefixes(self):
+        assert fts_query(["rent", "march"]) == '"rent"* "march"*'
+
+
+# -----------------------
+# Search
+# -----------------------
+class TestExpenseSearch:
+
+    def test_matches_words_case_insensitively(
+        self, client, auth_headers, named_expenses
+    ):
+        data = search(client, auth_headers, "q=UBER")
+
+        assert set(names(data)) == {"Uber to the airport", "uber eats"}
+        assert data["total"] == 2
+
+    def test_prefix_matching(self, client, auth_headers, named_expenses):
+        data = search(client, auth_headers, "q=airp")
+
+        assert set(names(data)) == {"Uber to the airport"}
+
+    def test_every_term_must_match(self, client, auth_headers, named_expenses):
+        assert names(search(client, auth_headers, "q=rent march")) == ["Rent March"]
+
+    @pytest.mark.sqlite_only
+    def test_ignores_diacritics(self, client, auth_headers, named_expenses):
+        assert names(search(client, auth_headers, "q=cafe")) == ["Café crème"]
+
+    def test_combines_with_filters(self, client, auth_headers, named_expenses):
+        data = search(
+            client, auth_headers, "q=rent&max_price=200&category_name=Transport"
+        )
+
+        assert set(names(data)) == {"rent", GARAGE_RENT}
+        assert data["total"] == 2
+
+    def test_combines_with_date_range(self, client, auth_headers, named_expenses):
+        data = search(
+            client, auth_headers, "q=rent&start_date=2025-04-01&end_date=2025-04-03"
+        )
+
+        assert names(data) == ["Rent April"]
+
+    def test_query_syntax_is_not_interpreted(
+        self, client, auth_headers, named_expenses
+    ):
+        assert search(client, auth_headers, 'q=rent" NOT march')["items"] == []
+        assert search(client, auth_headers, "q=***")["items"] == []
+
+    def test_index_follows_updates_and_deletes(
+        self, client, auth_headers, named_expenses
+    ):
+        uber, eats = named_expenses[:2]
+
+        response = client.put(
+            f"/api/v1/expenses/{uber.id}",
+            headers=auth_headers,
+            json={"name": "Taxi to the airport"}
+        )
+        assert response.status_code == 200
+
+        response = client.delete(f"/api/v1/expenses/{eats.id}", headers=auth_headers)
+        assert response.status_code == 204
+
+        assert names(search(client, auth_headers, "q=uber")) == []
+        assert names(search(client, auth_headers, "q=taxi")) == ["Taxi to the airport"]
+
+
+# -----------------------
+# Ranking
+# -----------------------
+@pytest.mark.sqlite_only
+class TestSearchRanking:
+
+    def test_sort_by_relevance(self, client, auth_headers, named_expenses):
+        data = search(client, auth_headers, "q=rent&sort_by=relevance")
+
+        # the shortest name is the best match, the long one the worst
+        assert names(data)[0] == "rent"
+        assert names(data)[-1] == GARAGE_RENT
+
+    def test_relevance_pages_use_offset(self, client, auth_headers, named_expenses):
+        first = search(client, auth_headers, "q=rent&sort_by=relevance&limit=2")
+        second = search(
+            client, auth_headers, "q=rent&sort_by=relevance&limit=2&offset=2"
+        )
+
+        assert first["has_more"] is True
+        assert first["next_cursor"] is None
+        assert len(set(names(first)) | set(names(second))) == 4
+
+    def test_relevance_requires_q(self, client, auth_headers, named_expenses):
+        response = client.get(
+            "/api/v1/expenses?sort_by=relevance", headers=auth_headers
+        )
+
+        assert response.status_code == 400
+
+    def test_relevance_rejects_cursor(self, client, auth_headers, named_expenses):
+        cursor = search(client, auth_headers, "limit=1")["next_cursor"]
+
+        response = client.get(
+            f"/api/v1/expenses?q=rent&sort_by=relevance&cursor={cursor}",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
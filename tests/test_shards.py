@@ -0,0 +1,440 @@
+# standard library
+import os
+import tempfile
+
+# third party
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload, sessionmaker
+from sqlalchemy.pool import NullPool
+
+# local
+from app.main import app
+from app.db.routing import RoutingSession
+from app.db.session import (
+    async_database_url,
+    configure_sqlite,
+    create_app_engine,
+    get_async_session,
+    get_session,
+    sqlite_pragmas,
+)
+from app.db.transactions import begin_write
+from app.db.shards import (
+    SHARD_ID_SPAN,
+    ShardSet,
+    hash_shard,
+    move_user,
+    placements,
+    rebalance,
+    user_override,
+)
+from app.models.models import (
+    Base,
+    Category,
+    Expense,
+    MonthlyCategoryTotal,
+    User,
+    UserDataVersion,
+    UserShard,
+)
+
+
+@pytest.fixture
+def sharded():
+    with tempfile.TemporaryDirectory() as directory:
+        catalog_path = os.path.join(directory, "catalog.sqlite")
+        catalog = create_app_engine(f"sqlite:///{catalog_path}")
+        Base.metadata.create_all(catalog)
+
+        with catalog.begin() as conn:
+            conn.execute(Category.__table__.insert(), [{"id": 1, "name": "Food"}])
+            conn.execute(
+                User.__table__.insert(),
+                [
+                    {
+                        "id": i,
+                        "email": f"user{i}@example.com",
+                        "hashed_password": "x",
+                        "role": "USER",
+                    }
+                    for i in range(1, 9)
+                ],
+            )
+
+        shards = ShardSet(
+            2, os.path.join(directory, "shards"), catalog_path, create_app_engine
+        )
+
+        def user_engine(user_id, fresh=False):
+            return shards.engine(
+                shards.shard_of(user_id, user_override(catalog, user_id))
+            )
+
+        session_factory = sessionmaker(
+            class_=RoutingSession, primary=catalog, shards=user_engine
+        )
+        try:
+            yield shards, catalog, session_factory
+        finally:
+            shards.dispose()
+            catalog.dispose()
+
+
+@pytest.fixture
+def sharded_client(client, db):
+    """The test client with expenses spread over two shards, using the test database
+    as catalog.
+    """
+    engine = db.get_bind()
+
+    def create_async_shard_engine(url):
+        # every TestClient runs its own event loop, so connections are not pooled
+        async_engine = create_async_engine(url, poolclass=NullPool)
+        configure_sqlite(async_engine.sync_engine, sqlite_pragmas())
+        return async_engine
+
+    async_engine = create_async_shard_engine(async_database_url(str(engine.url)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        shards = ShardSet(
+            2,
+            directory,
+            engine.url.database,
+            create_app_engine,
+            create_async_shard_engine,
+        )
+
+        def user_engine(user_id, fresh=False):
+            return shards.engine(
+                shards.shard_of(user_id, placements.override(engine, user_id, fresh))
+            )
+
+        def async_user_engine(user_id, fresh=False):
+            override = placements.override(engine, user_id, fresh)
+            return shards.async_engine(shards.shard_of(user_id, override)).sync_engine
+
+        session_factory = sessionmaker(
+            class_=RoutingSession, primary=engine, shards=user_engine
+        )
+        async_session_factory = async_sessionmaker(
+            sync_session_class=RoutingSession,
+            primary=async_engine.sync_engine,
+            shards=async_user_engine,
+            expire_on_commit=False
+        )
+
+        def override_get_db():
+            with session_factory() as sharded_db:
+                yield sharded_db
+
+        async def override_get_async_db():
+            async with async_session_factory() as async_db:
+                yield async_db
+
+        app.dependency_overrides[get_session] = override_get_db
+        app.dependency_overrides[get_async_session] = override_get_async_db
+        placements.clear()
+        try:
+            yield client, shards
+        finally:
+            placements.clear()
+            shards.dispose()
+
+
+def add_expense(session_factory, user_id, price=10):
+    with session_factory(info={"user_id": user_id}) as db:
+        expense = Expense(name="coffee", price=price, category_id=1, user_id=user_id)
+        db.add(expense)
+        db.commit()
+        return expense.id
+
+
+def expense_count(shards, shard, user_id):
+    with shards.engine(shard).connect() as conn:
+        return conn.execute(
+            select(func.count()).where(Expense.user_id == user_id)
+        ).scalar()
+
+
+# -----------------------
+# Placement
+# -----------------------
+class TestShardPlacement:
+
+    def test_hash_is_stable_and_in_range(self):
+        placements = [hash_shard(user_id, 4) for user_id in range(1, 1001)]
+
+        assert placements == [hash_shard(user_id, 4) for user_id in range(1, 1001)]
+        assert set(placements) == {0, 1, 2, 3}
+
+    def test_expenses_are_written_to_the_users_shard(self, sharded):
+        shards, catalog, session_factory = sharded
+
+        for user_id in (1, 2, 3):
+            add_expense(session_factory, user_id)
+
+        for user_id in (1, 2, 3):
+            shard = hash_shard(user_id, 2)
+            assert expense_count(shards, shard, user_id) == 1
+            assert expense_count(shards, 1 - shard, user_id) == 0
+
+    def test_shards_allocate_disjoint_ids(self, sharded):
+        shards, catalog, session_factory = sharded
+        user_by_shard = {hash_shard(user_id, 2): user_id for user_id in range(1, 9)}
+
+        for shard, user_id in user_by_shard.items():
+            expense_id = add_expense(session_factory, user_id)
+            assert shard * SHARD_ID_SPAN < expense_id <= (shard + 1) * SHARD_ID_SPAN
+
+    def test_shard_queries_join_catalog_tables(self, sharded):
+        shards, catalog, session_factory = sharded
+        add_expense(session_factory, 1)
+
+        with session_factory(info={"user_id": 1}) as db:
+            expense = db.scalars(
+                select(Expense).options(joinedload(Expense.category))
+            ).one()
+            totals = db.query(Category.name, MonthlyCategoryTotal.total).join(
+                MonthlyCategoryTotal, MonthlyCategoryTotal.category_id == Category.id
+            ).all()
+
+        assert expense.category.name == "Food"
+        assert [tuple(row) for row in totals] == [("Food", 10)]
+
+    def test_shards_commit_at_the_same_time(self, sharded):
+        shards, catalog, session_factory = sharded
+        users = {hash_shard(user_id, 2): user_id for user_id in range(1, 9)}
+
+        with (
+            session_factory(info={"user_id": users[0]}) as first,
+            session_factory(info={"user_id": users[1]}) as second
+        ):
+            begin_write(first)
+            first.add(Expense(name="coffee", price=10, category_id=1, user_id=users[0]))
+            first.flush()
+
+            # neither the other shard nor the catalog wait for the first writer
+            begin_write(second)
+            second.add(Expense(name="tea", price=5, category_id=1, user_id=users[1]))
+            second.commit()
+            with catalog.begin() as conn:
+                conn.execute(Category.__table__.insert(), [{"id": 2, "name": "Travel"}])
+
+            first.commit()
+
+        assert expense_count(shards, 0, users[0]) == 1
+        assert expense_count(shards, 1, users[1]) == 1
+
+    def test_shards_index_expense_names(self, sharded):
+        shards, catalog, session_factory = sharded
+        add_expense(session_factory, 1)
+
+        with shards.engine(hash_shard(1, 2)).connect() as conn:
+            matches = conn.exec_driver_sql(
+                "SELECT count(*) FROM expenses_fts WHERE expenses_fts MATCH 'coffee'"
+            ).scalar()
+
+        assert matches == 1
+
+
+# -----------------------
+# Placement cache
+# -----------------------
+class TestPlacementCache:
+
+    def test_lookups_are_cached_until_the_user_moves(self, sharded):
+        shards, catalog, session_factory = sharded
+        source = hash_shard(1, 2)
+        statements = []
+
+        def before_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+        ):
+            if "FROM user_shards" in statement:
+                statements.append(statement)
+
+        placements.clear()
+        event.listen(catalog, "before_cursor_execute", before_cursor_execute)
+        try:
+            assert placements.override(catalog, 1) is None
+            assert placements.override(catalog, 1) is None
+            assert len(statements) == 1
+
+            move_user(shards, 1, source, 1 - source)
+
+            assert placements.override(catalog, 1) == 1 - source
+            assert placements.override(catalog, 1, fresh=True) == 1 - source
+            assert len(statements) == 3
+        finally:
+            event.remove(catalog, "before_cursor_execute", before_cursor_execute)
+            placements.clear()
+
+
+# -----------------------
+# Rebalancing
+# -----------------------
+class TestRebalance:
+
+    def test_move_user_keeps_ids_and_rollup(self, sharded):
+        shards, catalog, session_factory = sharded
+        source = hash_shard(1, 2)
+        target = 1 - source
+        expense_id = add_expense(session_factory, 1, price=25)
+
+        assert move_user(shards, 1, source, target) == 1
+
+        assert user_override(catalog, 1) == target
+        assert expense_count(shards, source, 1) == 0
+
+        with session_factory(info={"user_id": 1}) as db:
+            assert db.get(Expense, expense_id).price == 25
+            assert db.query(MonthlyCategoryTotal.total).scalar() == 25
+
+    def test_interrupted_move_can_be_repeated(self, sharded):
+        shards, catalog, session_factory = sharded
+        source = hash_shard(1, 2)
+        target = 1 - source
+        expense_id = add_expense(session_factory, 1, price=25)
+
+        # the copy of a move that crashed before the source was cleaned up
+        source_engine, target_engine = shards.engine(source), shards.engine(target)
+        with source_engine.connect() as src, target_engine.begin() as dst:
+            for table in (Expense.__table__, MonthlyCategoryTotal.__table__):
+                rows = [dict(row._mapping) for row in src.execute(select(table))]
+                dst.execute(table.insert(), rows)
+
+        assert move_user(shards, 1, source, target) == 1
+
+        with session_factory(info={"user_id": 1}) as db:
+            assert db.get(Expense, expense_id).price == 25
+            assert db.query(MonthlyCategoryTotal.total).scalar() == 25
+
+    def test_move_user_keeps_data_version(self, sharded):
+        shards, catalog, session_factory = sharded
+        source = hash_shard(1, 2)
+        add_expense(session_factory, 1)
+        add_expense(session_factory, 1)
+
+        move_user(shards, 1, source, 1 - source)
+
+        with shards.engine(source).connect() as conn:
+            count = select(func.count()).select_from(UserDataVersion)
+            assert conn.execute(count).scalar() == 0
+        with session_factory(info={"user_id": 1}) as db:
+            assert db.get(UserDataVersion, 1).version == 2
+
+    def test_writes_follow_a_concurrent_move(self, sharded):
+        shards, catalog, session_factory = sharded
+        source = hash_shard(1, 2)
+
+        with session_factory(info={"user_id": 1}) as db:
+            # placement looked up before the move committed
+            assert db.get_bind() is shards.engine(source)
+
+            move_user(shards, 1, source, 1 - source)
+
+            begin_write(db)
+            db.add(Expense(name="coffee", price=10, category_id=1, user_id=1))
+            db.commit()
+
+        assert expense_count(shards, source, 1) == 0
+        assert expense_count(shards, 1 - source, 1) == 1
+
+    def test_moving_back_to_hash_placement_drops_override(self, sharded):
+        shards, catalog, session_factory = sharded
+        source = hash_shard(1, 2)
+        add_expense(session_factory, 1)
+
+        move_user(shards, 1, source, 1 - source)
+        move_user(shards, 1, 1 - source, source)
+
+        with catalog.connect() as conn:
+            count = conn.execute(select(func.count()).select_from(UserShard)).scalar()
+            assert count == 0
+
+    def test_rebalance_after_adding_shards(self, sharded):
+        shards, catalog, session_factory = sharded
+        for user_id in range(1, 9):
+            add_expense(session_factory, user_id)
+
+        shards.count = 4
+        moves = rebalance(shards, catalog)
+
+        assert moves
+        for user_id in range(1, 9):
+            assert expense_count(shards, hash_shard(user_id, 4), user_id) == 1
+        assert rebalance(shards, catalog) == []
+
+
+# -----------------------
+# API
+# -----------------------
+@pytest.mark.sqlite_only
+class TestShardedApi:
+
+    def test_expenses_live_in_the_users_shard(
+        self, sharded_client, auth_headers, db, test_user, test_category
+    ):
+        client, shards = sharded_client
+
+        response = client.post(
+            "/api/v1/expenses/",
+            headers=auth_headers,
+            json={"name": "coffee", "category_id": test_category.id, "price": 10}
+        )
+        expense_id = response.json()["id"]
+
+        assert response.status_code == 201
+        assert db.query(Expense).count() == 0
+        assert expense_count(shards, hash_shard(test_user.id, 2), test_user.id) == 1
+
+        response = client.put(
+            f"/api/v1/expenses/{expense_id}", headers=auth_headers, json={"price": 20}
+        )
+        assert response.status_code == 200
+
+        response = client.get("/api/v1/expenses/", headers=auth_headers)
+        items = response.json()["items"]
+        assert [(item["id"], item["price"]) for item in items] == [(expense_id, 20)]
+        assert items[0]["category"]["name"] == "Food"
+
+        response = client.delete(f"/api/v1/expenses/{expense_id}", headers=auth_headers)
+        assert response.status_code == 204
+        assert expense_count(shards, hash_shard(test_user.id, 2), test_user.id) == 0
+
+    def test_catalog_writes_go_to_the_catalog(
+        self, sharded_client, auth_headers, db, test_user
+    ):
+        client, shards = sharded_client
+
+        response = client.post("/api/v1/auth/revoke", headers=auth_headers)
+
+        assert response.status_code == 204
+        db.refresh(test_user)
+        assert test_user.token_version == 1
+
+    def test_requests_follow_a_moved_user(
+        self, sharded_client, auth_headers, test_user, test_category
+    ):
+        client, shards = sharded_client
+        source = hash_shard(test_user.id, 2)
+
+        client.post(
+            "/api/v1/expenses/",
+            headers=auth_headers,
+            json={"name": "coffee", "category_id": test_category.id, "price": 10}
+        )
+        move_user(shards, test_user.id, source, 1 - source)
+
+        response = client.post(
+            "/api/v1/expenses/",
+            headers=auth_headers,
+            json={"name": "tea", "category_id": test_category.id, "price": 5}
+        )
+
+        assert response.status_code == 201
+        assert expense_count(shards, 1 - source, test_user.id) == 2
+        response = client.get("/api/v1/expenses/", headers=auth_headers)
+        assert len(response.json()["items"]) == 2
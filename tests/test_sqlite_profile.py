@@ -0,0 +1,66 @@
+# standard library
+import os
+import tempfile
+
+# third party
+import pytest
+
+# local
+from app.db.session import create_app_engine, sqlite_pragmas
+
+
+@pytest.fixture
+def database_url():
+    with tempfile.TemporaryDirectory() as directory:
+        yield f"sqlite:///{os.path.join(directory, 'profile.sqlite')}"
+
+
+def pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+# -----------------------
+# Profiles
+# -----------------------
+class TestSQLiteProfile:
+
+    def test_tuned_profile_sets_pragmas(self, database_url):
+        engine = create_app_engine(database_url, profile="tuned")
+        try:
+            assert pragma(engine, "journal_mode") == "wal"
+            assert pragma(engine, "synchronous") == 1
+            assert pragma(engine, "busy_timeout") == 5000
+            assert pragma(engine, "temp_store") == 2
+            assert pragma(engine, "cache_size") == -65536
+        finally:
+            engine.dispose()
+
+    def test_default_profile_keeps_sqlite_defaults(self, database_url):
+        engine = create_app_engine(database_url, profile="default")
+        try:
+            assert pragma(engine, "journal_mode") == "delete"
+            assert pragma(engine, "synchronous") == 2
+        finally:
+            engine.dispose()
+
+    def test_unknown_profile_is_rejected(self):
+        with pytest.raises(ValueError):
+            sqlite_pragmas("fastest")
+
+    def test_async_engine_uses_same_profile(self, database_url):
+        import asyncio
+
+        from app.db.session import create_async_app_engine
+
+        async def journal_mode():
+            engine = create_async_app_engine(
+                database_url.replace("sqlite://", "sqlite+aiosqlite://")
+            )
+            try:
+                async with engine.connect() as conn:
+                    return (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar()
+            finally:
+                await engine.dispose()
+
+        assert asyncio.run(journal_mode()) == "wal"
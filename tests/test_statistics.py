@@ -144,3 +144,40 @@ class TestStatisticsSecurity:
         assert data["total"] == 0
         assert data["count"] == 0
         assert data["by_category"] == []
+
+
+# -----------------------
+# Month boundaries
+# -----------------------
+class TestStatisticsMonthBoundaries:
+
+    def test_get_statistics_includes_whole_month_only(
+        self, client, auth_headers, db, test_category, test_user
+    ):
+        from app.models.models import Expense
+        from datetime import datetime
+
+        db.add_all([
+            Expense(name="first", category_id=test_category.id, price=1,
+                    user_id=test_user.id, created_at=datetime(2025, 12, 1)),
+            Expense(name="last", category_id=test_category.id, price=2,
+                    user_id=test_user.id,
+                    created_at=datetime(2025, 12, 31, 23, 59, 59, 999999)),
+            Expense(name="before", category_id=test_category.id, price=100,
+                    user_id=test_user.id,
+                    created_at=datetime(2025, 11, 30, 23, 59, 59)),
+            Expense(name="after", category_id=test_category.id, price=1000,
+                    user_id=test_user.id, created_at=datetime(2026, 1, 1)),
+        ])
+        db.commit()
+
+        response = client.get(
+            "/api/v1/expenses/statistics/2025/12",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["total"] == 3
+        assert data["count"] == 2
@@ -0,0 +1,104 @@
+# third party
+import pytest
+
+# local
+from app.core.token_versions import token_versions
+from app.core.user_cache import UserCache, user_cache
+from app.models.models import User, UserRole
+
+
+@pytest.fixture
+def count_user_queries(db):
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    # the endpoints run on the async engine, so listen on every engine
+    engine = Engine
+    statements = []
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        is_select = statement.lstrip().upper().startswith("SELECT")
+        if is_select and "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+# -----------------------
+# Cache
+# -----------------------
+class TestUserCache:
+
+    def test_get_returns_cached_identity(self):
+        cache = UserCache(enabled=True, max_size=10, ttl=60)
+        cache.put(User(id=1, email="a@example.com", role=UserRole.ADMIN))
+
+        user = cache.get(1)
+
+        assert (user.id, user.email, user.role) == (1, "a@example.com", UserRole.ADMIN)
+        assert cache.stats()["hits"] == 1
+
+    def test_entries_expire(self):
+        cache = UserCache(enabled=True, max_size=10, ttl=-1)
+        cache.put(User(id=1, email="a@example.com", role=UserRole.USER))
+
+        assert cache.get(1) is None
+        assert cache.stats()["misses"] == 1
+
+    def test_least_recently_used_is_evicted(self):
+        cache = UserCache(enabled=True, max_size=1, ttl=60)
+        cache.put(User(id=1, email="a@example.com", role=UserRole.USER))
+        cache.put(User(id=2, email="b@example.com", role=UserRole.USER))
+
+        assert cache.get(1) is None
+        assert cache.get(2) is not None
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = UserCache(enabled=False, max_size=10, ttl=60)
+        cache.put(User(id=1, email="a@example.com", role=UserRole.USER))
+
+        assert cache.get(1) is None
+
+
+# -----------------------
+# get_current_user
+# -----------------------
+class TestCurrentUserCache:
+
+    def test_authenticated_requests_skip_users_query(
+        self, client, auth_headers, db, test_user, count_user_queries
+    ):
+        # the token version is read once per user and TTL, not per request
+        token_versions.load(db, test_user.id)
+        count_user_queries.clear()
+
+        for _ in range(3):
+            response = client.get("/api/v1/auth/me", headers=auth_headers)
+            assert response.status_code == 200
+            assert response.json()["email"] == "test@example.com"
+
+        assert len(count_user_queries) == 1
+        assert user_cache.stats()["hits"] == 2
+
+    def test_role_change_invalidates_entry(self, client, auth_headers, db, test_user):
+        client.get("/api/v1/auth/me", headers=auth_headers)
+        assert user_cache.get(test_user.id).role == UserRole.USER
+
+        test_user.role = UserRole.ADMIN
+        db.commit()
+
+        assert user_cache.get(test_user.id) is None
+
+    def test_deleted_user_is_rejected(self, client, auth_headers, db, test_user):
+        client.get("/api/v1/auth/me", headers=auth_headers)
+
+        db.delete(test_user)
+        db.commit()
+
+        response = client.get("/api/v1/auth/me", headers=auth_headers)
+
+        assert response.status_code == 401
@@ -54,4 +54,43 @@ class TestVisualizationResponse:
         assert response.headers["content-type"] == "image/png"
 
         # verify PNG file signature
-        assert response.content.startswith(b"\x89PNG\r\n\x1a\n")
\ No newline at end of file
+        assert response.content.startswith(b"\x89PNG\r\n\x1a\n")
+
+
+# -----------------------
+# Rendering pool
+# -----------------------
+class TestVisualizationRenderingPool:
+
+    def test_get_visualization_renderer_busy(
+        self, client, auth_headers, test_expenses, year, month, monkeypatch
+    ):
+        from app.expenses.chart_cache import chart_cache
+        from app.expenses.charts import chart_renderer
+
+        chart_cache.clear()
+        monkeypatch.setattr(chart_renderer, "max_pending", 0)
+
+        response = client.get(
+            f"/api/v1/expenses/visualization/{year}/{month}",
+            headers=auth_headers
+        )
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert "detail" in response.json()
+
+    def test_process_pool_renders_png(self):
+        import asyncio
+        from app.expenses.charts import ChartRenderer
+
+        renderer = ChartRenderer(workers=1, max_pending=2)
+        renderer.start()
+
+        try:
+            image = asyncio.run(renderer.render(["Food", "Rent"], [100, 200], 2025, 5))
+        finally:
+            renderer.shutdown()
+
+        assert image.startswith(b"\x89PNG\r\n\x1a\n")
+        assert renderer.pending == 0
@@ -0,0 +1,158 @@
+# standard library
+import sqlite3
+
+# third party
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+# local
+from app.core.exception import CategoryNotFoundException, DatabaseException
+from app.db import transactions
+from app.db.transactions import is_lock_error, write_stats, write_transaction
+from app.models.models import Category
+from scripts.stress_sqlite_writes import run_stress
+
+
+def locked_error() -> OperationalError:
+    locked = sqlite3.OperationalError("database is locked")
+    return OperationalError("INSERT", {}, locked)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(transactions, "backoff_delay", lambda attempt: 0)
+    write_stats.clear()
+
+
+# -----------------------
+# Lock errors
+# -----------------------
+class TestIsLockError:
+
+    def test_locked_database(self):
+        assert is_lock_error(locked_error())
+
+    def test_other_operational_error(self):
+        error = sqlite3.OperationalError("no such table: x")
+        assert not is_lock_error(OperationalError("SELECT", {}, error))
+
+    def test_integrity_error(self):
+        error = sqlite3.IntegrityError("UNIQUE constraint failed")
+        assert not is_lock_error(IntegrityError("INSERT", {}, error))
+
+
+# -----------------------
+# Write transaction
+# -----------------------
+class TestWriteTransaction:
+
+    def test_commits_work(self, db, run_async):
+
+        async def create(async_db):
+            async def work():
+                async_db.add(Category(name="Books"))
+                return "done"
+
+            return await write_transaction(async_db, work)
+
+        assert run_async(create) == "done"
+        assert db.query(Category).filter(Category.name == "Books").count() == 1
+        assert write_stats.stats()["transactions"] == 1
+
+    def test_retries_lock_errors(self, db, run_async):
+        calls = []
+
+        async def create(async_db):
+            async def work():
+                calls.append(1)
+                async_db.add(Category(name=f"Books {len(calls)}"))
+                if len(calls) < 3:
+                    raise locked_error()
+
+            await write_transaction(async_db, work)
+
+        run_async(create)
+
+        # the failed attempts were rolled back
+        assert [category.name for category in db.query(Category)] == ["Books 3"]
+        assert write_stats.stats()["retries"] == 2
+        assert write_stats.stats()["failures"] == 0
+
+    def test_lock_wait_counts_each_attempt_once(self, db, run_async, monkeypatch):
+        clock = iter(range(100))
+        monkeypatch.setattr(transactions.time, "perf_counter", lambda: next(clock))
+        calls = []
+
+        async def create(async_db):
+            async def work():
+                calls.append(1)
+                if len(calls) == 1:
+                    raise locked_error()
+
+            await write_transaction(async_db, work)
+
+        run_async(create)
+
+        # 2 s for the whole failed attempt, 1 s to take the lock on the retry
+        assert write_stats.stats()["average_lock_wait_ms"] == 3000
+
+    def test_gives_up_after_attempts(self, db, run_async):
+
+        async def create(async_db):
+            async def work():
+                raise locked_error()
+
+            await write_transaction(async_db, work, attempts=3)
+
+        with pytest.raises(DatabaseException):
+            run_async(create)
+
+        assert write_stats.stats()["retries"] == 2
+        assert write_stats.stats()["failures"] == 1
+
+    def test_other_errors_are_not_retried(self, db, run_async):
+        calls = []
+
+        async def create(async_db):
+            async def work():
+                calls.append(1)
+                async_db.add(Category(name=None))
+
+            await write_transaction(async_db, work)
+
+        with pytest.raises(DatabaseException):
+            run_async(create)
+
+        assert len(calls) == 1
+        assert write_stats.stats()["retries"] == 0
+
+    def test_other_exceptions_roll_back(self, db, run_async):
+
+        async def create(async_db):
+            async def work():
+                async_db.add(Category(name="Books"))
+                raise CategoryNotFoundException()
+
+            try:
+                await write_transaction(async_db, work)
+            finally:
+                # the write lock is released right away, not when the session closes
+                assert not async_db.in_transaction()
+
+        with pytest.raises(CategoryNotFoundException):
+            run_async(create)
+
+        assert db.query(Category).count() == 0
+        assert write_stats.stats()["failures"] == 1
+
+
+# -----------------------
+# Several processes
+# -----------------------
+@pytest.mark.sqlite_only
+def test_concurrent_processes_lose_no_writes(tmp_path):
+    totals = run_stress(tmp_path / "stress.sqlite", processes=4, writes=20)
+
+    # every third expense is also updated and deleted
+    assert totals["failed"] == 0
+    assert totals["writes"] == 4 * (20 + 2 * 7)